@@ -1,16 +1,22 @@
+from circos_scaling import scale_sizes
+
 # bornes
 old_min, old_max = 1, 53
 new_min, new_max = 70, 400
 
+# stratégie : "linear", "log", "sqrt", "quantile" ou "capped"
+strategy = "linear"
 
-# fonction de rééchelonnage
-def rescale(x):
-    return new_min + (x - old_min) * (new_max - new_min) / (old_max - old_min)
-
-
-# exemple d'utilisation
-list_to_rescale = list(range(1, 54))
-scaled_values = [int(rescale(v)) for v in list_to_rescale]
+# exemple d'utilisation (même moteur que main.py)
+list_to_rescale = list(range(old_min, old_max + 1))
+# old_min/old_max bornent l'échelle, quelle que soit la liste
+scaled_values = scale_sizes(
+    list_to_rescale,
+    reference=[old_min, old_max],
+    strategy=strategy,
+    vmin=new_min,
+    vmax=new_max,
+).tolist()
 
 for original, scaled in zip(list_to_rescale, scaled_values):
     print(original, scaled)
@@ -0,0 +1,306 @@
+"""
+================================================================================
+SECTION AUTO-CODING FROM TITLES AND ABSTRACTS
+================================================================================
+
+Description:
+This script pre-fills the section columns of the main Excel sheet (EMG, IMU,
+Running, Spastic...) from the titles, abstracts and keywords of the `.bib`
+exports. The result is only a suggestion for the reviewers: it is written to
+a separate file, in the same column layout as the main sheet, so that the
+confirmed values can be copied back.
+
+Key Features:
+1. Synonym Dictionary: Every `Section` of every track in `AUTOCODE_TRACKS` is
+   searched through the synonyms listed in `SYNONYMS` (e.g., "EMG" ->
+   "electromyography"), and through its own name (e.g., "Force-plate" ->
+   "force plate") only if it is listed in `NAME_SEARCHED`: generic names
+   ("Mixed", "Score", "Game"...) are common words of any abstract.
+2. Single Pass per Document (Aho-Corasick): All synonyms of all sections are
+   compiled once into one automaton. Each document (title + abstract +
+   keywords, normalized like the extractor titles: case, accents and
+   punctuation ignored) is then scanned once, whatever the number of
+   synonyms, instead of running one regex per keyword. Only whole words or
+   whole phrases match.
+3. Same Layout as the Main Sheet: One row per reference (short references and
+   duplicates handled exactly as in `circos_extract_name_bibfile.py`), one
+   column per `Section.excel_col` with 1 (found) or 0. For tracks with a
+   `special_na` section, rows where no section of the track was found get
+   "???" (unspecified), as in the main sheet.
+
+Output:
+An Excel (or `.csv`) file of suggested codes, with the `ArtNb` column left
+empty for the reviewers.
+================================================================================
+"""
+
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+import pandas as pd
+
+import circos_extract_name_bibfile as bib
+from main import (
+    EXCEL_PATH,
+    COL_ART,
+    COL_REF,
+    gmfcs_config,
+    cp_type_config,
+    laterality_config,
+    tools_config,
+    assessment_type_config,
+    tasks_config,
+)
+
+# =================
+# TO CUSTOMIZE:
+# =================
+BIB_PATHS = bib.BIB_PATHS  # Same exports as the extractor (same references)
+OUT_PATH = str(Path(EXCEL_PATH).with_name("autocode_suggestions.xlsx"))
+TEXT_FIELDS = ("title", "abstract", "keywords")
+
+AUTOCODE_TRACKS = [
+    gmfcs_config,
+    cp_type_config,
+    laterality_config,
+    tools_config,
+    assessment_type_config,
+    tasks_config,
+]
+
+# Columns whose own name is also searched (specific terms only: generic names
+# like "Mixed", "Score", "Game", "Stability" or "Metabolic" would match almost
+# any abstract and are only searched through their SYNONYMS)
+NAME_SEARCHED = {
+    "Spastic",
+    "Dyskinetic",
+    "Ataxic",
+    "Hemiplegic",
+    "Diplegic",
+    "Quadriplegic",
+    "Optoelectronic",
+    "Force-plate",
+    "EMG",
+    "Heart-rate-monitor",
+    "Metabolic-cart",
+    "IMU",
+    "Wii-fit",
+    "Spatiotemporal",
+    "Kinematic",
+    "Kinetic",
+    "Electromyographic",
+    "Sit-to-stand",
+    "Running",
+    "Cycling",
+    "Stair-negotiation",
+    "Obstacle-clearance",
+    "Jumping",
+    "Time-Up-and-Go",
+    "One-leg-standing",
+    "Stepping-target",
+    "Hopping",
+    "Squat",
+    "Kicking-a-ball",
+}
+
+# GMFCS ranges ("GMFCS I-III", "levels II to V") code every level they cover
+ROMAN = ["i", "ii", "iii", "iv", "v"]
+GMFCS_RANGES = {
+    ROMAN[k]: [
+        f"{prefix} {ROMAN[lo]}{sep}{ROMAN[hi]}"
+        for prefix in ("gmfcs", "gmfcs level", "gmfcs levels")
+        for sep in (" ", " to ")
+        for lo in range(k + 1)
+        for hi in range(max(k, lo + 1), len(ROMAN))
+    ]
+    for k in range(len(ROMAN))
+}
+
+# Phrases searched per Excel column (multi-word or specific terms only: single
+# common words like "run", "hop" or "balance" match ordinary prose)
+SYNONYMS = {
+    "GMFCS-I": ["gmfcs i", "gmfcs level i", "gmfcs levels i"] + GMFCS_RANGES["i"],
+    "GMFCS-II": ["gmfcs ii", "gmfcs level ii", "gmfcs levels ii"] + GMFCS_RANGES["ii"],
+    "GMFCS-III": ["gmfcs iii", "gmfcs level iii", "gmfcs levels iii"]
+    + GMFCS_RANGES["iii"],
+    "GMFCS-IV": ["gmfcs iv", "gmfcs level iv", "gmfcs levels iv"] + GMFCS_RANGES["iv"],
+    "Spastic": ["spasticity", "spastic cerebral palsy"],
+    "Dyskinetic": ["dyskinesia", "dystonic", "dystonia", "athetoid"],
+    "Ataxic": ["ataxia"],
+    "Mixed": ["mixed type"],
+    "Hemiplegic": ["hemiplegia", "hemiparetic", "hemiparesis", "unilateral cp"],
+    "Diplegic": ["diplegia", "bilateral spastic"],
+    "Quadriplegic": ["quadriplegia", "tetraplegic", "tetraplegia"],
+    "Optoelectronic": ["motion capture", "vicon", "optoelectronic system"],
+    "Force-plate": ["force plates", "forceplate", "ground reaction force"],
+    "EMG": ["electromyography", "electromyographic", "semg", "surface emg"],
+    "Heart-rate-monitor": ["heart rate", "heart rate monitor"],
+    "Metabolic-cart": ["indirect calorimetry", "oxygen consumption", "vo2"],
+    "IMU": [
+        "imus",
+        "inertial measurement unit",
+        "inertial measurement units",
+        "inertial sensor",
+        "inertial sensors",
+        "accelerometer",
+        "accelerometers",
+        "gyroscope",
+    ],
+    "Wii-fit": ["wii", "nintendo wii", "wii balance board"],
+    "Spatiotemporal": ["spatio temporal", "gait speed", "walking speed", "cadence"],
+    "Kinematic": ["kinematics", "joint angles"],
+    "Kinetic": ["kinetics", "joint moments", "joint power"],
+    "Stability": [
+        "balance control",
+        "standing balance",
+        "balance test",
+        "postural control",
+        "postural sway",
+        "postural stability",
+    ],
+    "Electromyographic": ["electromyography", "muscle activity", "emg"],
+    "Metabolic": ["energy expenditure", "energy cost", "oxygen cost"],
+    "Score": ["gross motor function measure", "gmfm", "gait deviation index"],
+    "Sit-to-stand": ["sit to stand", "chair rise"],
+    "Running": ["running test", "treadmill running", "running speed", "sprint test"],
+    "Cycling": ["cycle ergometer", "bicycle", "pedaling", "pedalling"],
+    "Stair-negotiation": ["stair", "stairs", "stair climbing", "stair ascent"],
+    "Obstacle-clearance": ["obstacle", "obstacles", "obstacle crossing"],
+    "Game": ["video game", "exergame", "exergames", "serious game"],
+    "Jumping": ["jump test", "vertical jump", "countermovement jump", "long jump"],
+    "Time-Up-and-Go": ["timed up and go", "tug test"],
+    "One-leg-standing": ["single leg stance", "one leg stance", "single limb stance"],
+    "Stepping-target": ["target stepping", "stepping targets"],
+    "Hopping": ["single leg hop", "hop test", "hopping test"],
+    "Squat": ["squats", "squatting"],
+    "Kicking-a-ball": ["kicking", "ball kicking", "kick a ball"],
+}
+
+# =================================
+# Nothing to modify below this line
+# =================================
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over normalized phrases. Each phrase is padded
+    with spaces, so a match always covers whole words of the (space padded)
+    normalized text.
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[str, int]]):
+        """phrases: (phrase, label id); several phrases may share a label."""
+        self.goto: List[Dict[str, int]] = [{}]
+        self.out: List[Set[int]] = [set()]
+
+        # 1. Trie of all phrases
+        for phrase, label in phrases:
+            norm = bib.normalize_title(phrase)
+            if not norm:
+                continue
+            state = 0
+            for ch in f" {norm} ":
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.out.append(set())
+                state = nxt
+            self.out[state].add(label)
+
+        # 2. Failure links (breadth-first), outputs merged along them
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] |= self.out[self.fail[nxt]]
+
+    def labels(self, text: str) -> Set[int]:
+        """Label ids of all phrases found in the text (one pass)."""
+        goto, fail, out = self.goto, self.fail, self.out
+        found: Set[int] = set()
+        state = 0
+        for ch in f" {bib.normalize_title(text)} ":
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+def section_columns(tracks: Sequence) -> List[str]:
+    """Excel columns of all sections, in track order (each column once)."""
+    return list(dict.fromkeys(s.excel_col for t in tracks for s in t.sections))
+
+
+def build_matcher(columns: Sequence[str]) -> PhraseMatcher:
+    """Compiles the synonyms (and the NAME_SEARCHED names) into one automaton."""
+    phrases = []
+    for i, col in enumerate(columns):
+        if col in NAME_SEARCHED:
+            phrases.append((col, i))
+        phrases += [(syn, i) for syn in SYNONYMS.get(col, [])]
+    return PhraseMatcher(phrases)
+
+
+def autocode(bib_paths: Sequence[Path], tracks: Sequence) -> pd.DataFrame:
+    """Returns the suggested codes, one row per reference of the .bib files."""
+    columns = section_columns(tracks)
+    matcher = build_matcher(columns)
+    col_idx = {col: i for i, col in enumerate(columns)}
+    na_groups = [
+        [col_idx[s.excel_col] for s in t.sections] for t in tracks if t.special_na
+    ]
+
+    rows = []
+    for _, f in bib.iter_all_entries(bib_paths):
+        ref, title, doi, key = bib.entry_row(f)
+        text = " \n ".join(f.get(name, "") for name in TEXT_FIELDS)
+        rows.append((ref, title, doi, key, matcher.labels(text)))
+    if bib.DEDUPLICATE:
+        rows = list(bib.drop_duplicates(rows))
+
+    records = []
+    for ref, title, found in bib.assign_suffixes([(r[0], r[1], r[4]) for r in rows]):
+        codes: List = [1 if i in found else 0 for i in range(len(columns))]
+        for group in na_groups:
+            if not any(codes[i] for i in group):
+                for i in group:
+                    codes[i] = "???"
+        records.append(["", ref, title] + codes)
+
+    return pd.DataFrame(records, columns=[COL_ART, COL_REF, "title"] + columns)
+
+
+def main():
+    bib_paths = [Path(p) for p in BIB_PATHS]
+    for bib_path in bib_paths:
+        if not bib_path.exists():
+            raise FileNotFoundError(f"Bib file not found: {bib_path}")
+
+    df = autocode(bib_paths, AUTOCODE_TRACKS)
+
+    out_path = Path(OUT_PATH)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if out_path.suffix.lower() == ".csv":
+        df.to_csv(out_path, index=False, encoding="utf-8")
+    else:
+        df.to_excel(out_path, index=False, engine="openpyxl")
+
+    codes = df.iloc[:, 3:]
+    n_coded = int((codes == 1).any(axis=1).sum())
+    print(f"✅ {len(df)} references auto-coded ({n_coded} with at least one match)")
+    print(f"📄 Suggestions written to: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+================================================================================
+PIPELINE BENCHMARK SUITE
+================================================================================
+
+Description:
+This script measures how the pipeline scales with the size of the dataset.
+It generates synthetic Excel workbooks (and matching `.bib` files) of
+increasing size, runs each pipeline phase on them and records the wall time
+and peak memory, so that an optimization (or a regression) can be measured
+instead of guessed.
+
+Key Features:
+1. Synthetic Dataset Generator: Workbooks with the same columns as the real
+   sheet (`ArtNb`, `ref` and every `Section.excel_col` of the tracks), with a
+   configurable number of articles, share of "present" cells (`SPARSITY`),
+   NA tokens (`NA_RATE`), `???` cells (`UNKNOWN_RATE`), empty article IDs and
+   duplicated rows. The `.bib` file holds one entry per article.
+2. Phase Timing: The real `main.run_pipeline` runs on the synthetic sheet
+   (same calls as a user run, e.g. one `ArticleIndex` shared by the
+   karyotype and the tracks), followed by the BibTeX extractor; the times of
+   its phase spans (see `circos_metrics.py`) are recorded. Every size runs in
+   a fresh process.
+3. Memory per Phase: Two different measures, in two columns.
+   - Peak RSS (resident memory of the process: Python objects, NumPy/pandas
+     buffers, interpreter) while each phase ran, recorded during the timing
+     run itself (`circos_metrics.py` resident memory mode, Linux only). On
+     other systems only the peak RSS of the whole process is reported.
+   - Peak traced memory (`MEASURE_MEMORY`): a second process runs the same
+     phases under `tracemalloc` and records the peak of memory allocated
+     through Python while each phase ran. It is a separate run because
+     tracing slows the code down.
+4. Regression Check: Results are saved as JSON and compared with a stored
+   baseline; phases slower than the baseline by more than
+   `REGRESSION_TOLERANCE` are flagged (exit code 1).
+
+Usage:
+    python circos_benchmark.py                      # default sizes
+    python circos_benchmark.py --sizes 100 10000 1000000
+    python circos_benchmark.py --save-baseline      # store as the reference
+
+Output:
+`benchmark_runs/results.json` (and `baseline.json` with --save-baseline),
+plus a summary table in the console.
+================================================================================
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from openpyxl import Workbook
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# =================
+# TO CUSTOMIZE:
+# =================
+BENCH_DIR = Path(__file__).resolve().with_name("benchmark_runs")
+SIZES = [100, 10_000]  # Articles per workbook (1_000_000 for the full-scale run)
+SEED = 0
+
+SPARSITY = 0.3  # Share of cells marked as present (1)
+NA_RATE = 0.05  # Share of NA tokens ("n/a", "NA", "-", empty)
+UNKNOWN_RATE = 0.03  # Share of "???" cells
+EMPTY_ART_RATE = 0.01  # Share of rows without article ID
+DUPLICATE_RATE = 0.01  # Share of rows repeated (same article)
+
+MEASURE_MEMORY = True  # Extra run per size under tracemalloc (per-phase memory)
+
+REGRESSION_TOLERANCE = 0.25  # Flag phases more than 25% slower than baseline
+MIN_COMPARED_TIME = 0.05  # Phases faster than this (s) are too noisy to compare
+
+# =================================
+# Nothing to modify below this line
+# =================================
+
+RESULTS_FILE = "results.json"
+BASELINE_FILE = "baseline.json"
+AUTHORS = ["Smith", "Doe", "Lee", 'M{\\"u}ller', "Garc{\\'i}a", "Brown", "Nguyen"]
+PRESENT_VALUES = [1, 1, 1, "1", "x"]
+ZERO_VALUES = [0, 0, 0, "0", "0,0"]
+NA_VALUES = ["n/a", "NA", "-", None]
+
+
+def bench_tracks():
+    """The tracks of main.py, in their usual order."""
+    import main
+
+    return [
+        main.gmfcs_config,
+        main.cp_type_config,
+        main.laterality_config,
+        main.tools_config,
+        main.assessment_type_config,
+        main.tasks_config,
+    ]
+
+
+def section_columns(tracks) -> List[str]:
+    return list(dict.fromkeys(s.excel_col for t in tracks for s in t.sections))
+
+
+def _cell(rng: random.Random):
+    x = rng.random()
+    if x < UNKNOWN_RATE:
+        return "???"
+    if x < UNKNOWN_RATE + NA_RATE:
+        return rng.choice(NA_VALUES)
+    if x < UNKNOWN_RATE + NA_RATE + SPARSITY:
+        return rng.choice(PRESENT_VALUES)
+    return rng.choice(ZERO_VALUES)
+
+
+def _art_id(rng: random.Random, i: int):
+    if rng.random() < EMPTY_ART_RATE:
+        return None
+    return rng.choice([f"Art {i}", i, f"art{i}", str(i)])
+
+
+def _ref(i: int) -> str:
+    return f"{AUTHORS[i % len(AUTHORS)]} et al. {2000 + i % 25}"
+
+
+def generate_workbook(path: Path, n_articles: int, tracks, seed: int = SEED) -> None:
+    """Writes a synthetic main sheet (streamed, so 1M rows fit in memory)."""
+    rng = random.Random(seed)
+    columns = section_columns(tracks)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(["ArtNb", "ref", "title"] + columns)
+    for i in range(1, n_articles + 1):
+        row = [_art_id(rng, i), _ref(i), f"Synthetic study {i}"]
+        row += [_cell(rng) for _ in columns]
+        ws.append(row)
+        if rng.random() < DUPLICATE_RATE:
+            ws.append(row)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(str(path))
+
+
+def generate_bib(path: Path, n_articles: int, seed: int = SEED) -> None:
+    """Writes one BibTeX entry per synthetic article."""
+    rng = random.Random(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="\n") as fw:
+        for i in range(1, n_articles + 1):
+            authors = " and ".join(
+                f"{rng.choice(AUTHORS)}, {chr(65 + rng.randrange(26))}."
+                for _ in range(rng.randint(1, 5))
+            )
+            fw.write(
+                f"@article{{art{i},\n"
+                f"  title = {{{{Gait}} analysis in {{CP}}: synthetic study {i}}},\n"
+                f"  author = {{{authors}}},\n"
+                f"  year = {{{2000 + i % 25}}},\n"
+                f"  doi = {{10.0000/synthetic.{i}}},\n"
+                f"  abstract = {{Treadmill walking with IMU and EMG, GMFCS I-III, "
+                f"n={rng.randint(5, 90)}.}},\n"
+                f"}}\n\n"
+            )
+
+
+def _peak_rss_mb() -> float | None:
+    """High-water mark of the resident memory of the whole process (fallback)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_phases(data_dir: Path, trace_memory: bool = False) -> Dict:
+    """
+    Runs the pipeline and the extractor on the dataset of data_dir (called in
+    a worker process). Returns the times and per-phase peak RSS, or with
+    trace_memory the per-phase peaks of traced memory instead.
+    """
+    import main
+    import circos_extract_name_bibfile as bib
+
+    out_dir = data_dir / "out"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    main.EXCEL_PATH = str(data_dir / "sheet.xlsx")
+    main.OUTPUT_DIR = str(out_dir)
+    main.RUN_RENDER = False
+    metrics = main.METRICS
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rss = not trace_memory and metrics.start_rss()
+        if trace_memory:
+            metrics.start_memory()
+        main.run_pipeline(bench_tracks())  # Resets the metrics first
+        with metrics.span("bib_extract"):
+            bib.main(
+                [
+                    str(data_dir / "refs.bib"),
+                    "-o",
+                    str(out_dir / "refs.csv"),
+                    "--no-cache",
+                ]
+            )
+        if trace_memory:
+            metrics.stop_memory()
+        if rss:
+            metrics.stop_rss()
+
+    spans = metrics.root.children
+    if trace_memory:
+        return {"peak_traced_mb": {s.name: _mb(s.peak_bytes) for s in spans}}
+    phases = {s.name: round(s.seconds, 4) for s in spans}
+    run = {"phases": phases, "total": round(sum(phases.values()), 4)}
+    if rss:
+        run["peak_rss_mb"] = {s.name: _mb(s.peak_rss_bytes) for s in spans}
+        run["peak_rss_mb"]["TOTAL"] = _mb(metrics.root.peak_rss_bytes)
+    else:
+        run["process_peak_rss_mb"] = _peak_rss_mb()
+    return run
+
+
+def _mb(n: int) -> float:
+    return round(n / (1024 * 1024), 1)
+
+
+def _run_worker(data_dir: Path, *flags: str) -> Dict | None:
+    proc = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--worker", str(data_dir)]
+        + list(flags),
+        capture_output=True,
+        text=True,
+        cwd=str(Path(__file__).resolve().parent),
+    )
+    if proc.returncode != 0:
+        print(f"[ERROR Benchmark] {data_dir.name} failed:\n{proc.stderr[-2000:]}")
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def prepare_dataset(n_articles: int, regenerate: bool = False) -> Path:
+    """Generates (once) the workbook and .bib of a size."""
+    data_dir = BENCH_DIR / f"data_{n_articles}"
+    sheet, bib_file = data_dir / "sheet.xlsx", data_dir / "refs.bib"
+    if regenerate or not sheet.exists() or not bib_file.exists():
+        t0 = time.perf_counter()
+        generate_workbook(sheet, n_articles, bench_tracks())
+        generate_bib(bib_file, n_articles)
+        print(f"📄 Dataset {n_articles}: generated in {time.perf_counter() - t0:.1f} s")
+    return data_dir
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Returns one message per phase slower than the baseline."""
+    regressions = []
+    for size, run in results["runs"].items():
+        base_run = baseline.get("runs", {}).get(size)
+        if not base_run:
+            continue
+        for name, t in run["phases"].items():
+            t_base = base_run["phases"].get(name)
+            if t_base is None or t_base < MIN_COMPARED_TIME:
+                continue
+            if t > t_base * (1 + tolerance):
+                regressions.append(
+                    f"{size} rows / {name}: {t:.3f} s vs {t_base:.3f} s "
+                    f"(x{t / t_base:.2f})"
+                )
+    return regressions
+
+
+def print_table(results: Dict, baseline: Dict | None) -> None:
+    print(
+        f"\n{'rows':>9} {'phase':<17} {'time (s)':>10} {'baseline':>10} {'ratio':>7}"
+        f" {'peak RSS MB':>12} {'peak traced MB':>15}"
+    )
+    for size, run in results["runs"].items():
+        base_run = (baseline or {}).get("runs", {}).get(size, {})
+        rss = run.get("peak_rss_mb", {})
+        memory = run.get("peak_traced_mb", {})
+        for name, t in list(run["phases"].items()) + [("TOTAL", run["total"])]:
+            t_base = (
+                base_run.get("total")
+                if name == "TOTAL"
+                else base_run.get("phases", {}).get(name)
+            )
+            base_txt = f"{t_base:10.3f}" if t_base else f"{'-':>10}"
+            ratio = f"{t / t_base:7.2f}" if t_base else f"{'-':>7}"
+            mem = memory.get(name)
+            mem_txt = f"{mem:15.1f}" if mem is not None else f"{'-':>15}"
+            rss_txt = f"{rss[name]:12.1f}" if name in rss else f"{'-':>12}"
+            print(
+                f"{size:>9} {name:<17} {t:10.3f} {base_txt} {ratio} {rss_txt} {mem_txt}"
+            )
+        if run.get("process_peak_rss_mb"):
+            peak = run["process_peak_rss_mb"]
+            print(f"{size:>9} {'process peak RSS':<17} {peak:>7.1f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the pipeline phases.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store the results as baseline"
+    )
+    parser.add_argument(
+        "--regenerate", action="store_true", help="Regenerate the synthetic data"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=REGRESSION_TOLERANCE, help="e.g. 0.25"
+    )
+    parser.add_argument("--worker", help=argparse.SUPPRESS)  # Internal: data dir
+    parser.add_argument("--trace-memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_phases(Path(args.worker), args.trace_memory)))
+        return
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "seed": SEED,
+            "sparsity": SPARSITY,
+            "na_rate": NA_RATE,
+            "unknown_rate": UNKNOWN_RATE,
+            "empty_art_rate": EMPTY_ART_RATE,
+            "duplicate_rate": DUPLICATE_RATE,
+        },
+        "runs": {},
+    }
+    for n in args.sizes:
+        data_dir = prepare_dataset(n, args.regenerate)
+        print(f"Running: {n} rows...")
+        run = _run_worker(data_dir)
+        if run is None:
+            continue
+        if MEASURE_MEMORY:
+            print(f"Running: {n} rows (memory)...")
+            run.update(_run_worker(data_dir, "--trace-memory") or {})
+        results["runs"][str(n)] = run
+
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    baseline_path = BENCH_DIR / BASELINE_FILE
+    baseline = None
+    if baseline_path.exists() and not args.save_baseline:
+        with baseline_path.open(encoding="utf-8") as fr:
+            baseline = json.load(fr)
+
+    print_table(results, baseline)
+
+    out_path = baseline_path if args.save_baseline else BENCH_DIR / RESULTS_FILE
+    with out_path.open("w", encoding="utf-8") as fw:
+        json.dump(results, fw, indent=2)
+    print(f"\n📄 Results written to: {out_path}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for msg in regressions:
+            print(f"[WARN Regression] {msg}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regression against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+================================================================================
+BIBTEX FULL-TEXT SCREENING INDEX
+================================================================================
+
+Description:
+This script builds a persistent inverted index over the titles, abstracts and
+keywords of the `.bib` exports, so that screening searches ("treadmill",
+"IMU", "GMFCS") return the matching short references in milliseconds instead
+of grepping the `.bib` files.
+
+Key Features:
+1. Inverted Index (SQLite, standard library only): token -> entries, with the
+   position of each token, stored in a single `.sqlite` file. Tokens are
+   normalized like the titles of the extractor (case and accents ignored).
+2. Incremental Updates: Entries are identified by the hash of their raw
+   BibTeX block (same as the parse cache of `circos_extract_name_bibfile.py`).
+   When a `.bib` changes, only new or modified entries are parsed and indexed,
+   and removed entries are deleted. The index is refreshed automatically
+   before a search if the `.bib` files changed.
+3. Same References as the Extractor: Every exported entry is indexed (a
+   block exported twice gives two entries, as in the extractor), then
+   duplicates are merged with the same setting (`DEDUPLICATE`,
+   `--keep-duplicates`) and a/b/c suffixes are assigned exactly as in
+   `circos_extract_name_bibfile.py`.
+4. Query Syntax:
+   - `treadmill IMU`            -> both terms (AND)
+   - `treadmill OR running`     -> either term (AND binds tighter than OR)
+   - `"spastic gait" GMFCS`     -> exact phrase and a term
+
+Usage:
+    python circos_bib_index.py "treadmill IMU OR \"spastic gait\""
+    python circos_bib_index.py --rebuild
+
+Output:
+The matching short references and titles, in `.bib` order.
+================================================================================
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+import circos_extract_name_bibfile as bib
+
+# =================
+# TO CUSTOMIZE:
+# =================
+BIB_PATHS = bib.BIB_PATHS  # Same exports as the extractor (same references)
+INDEX_PATH = str(Path(bib.OUT_XLSX).with_suffix(".index.sqlite"))
+INDEXED_FIELDS = ("title", "abstract", "keywords")
+MAX_RESULTS = 50  # Results printed per query (--limit)
+
+# =================================
+# Nothing to modify below this line
+# =================================
+
+INDEX_VERSION = 1
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+TOKEN_RE = re.compile(r"[0-9a-z]+")
+SQL_VARS = 900  # Maximum number of parameters per "IN (...)" query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    hash TEXT UNIQUE NOT NULL,
+    ord INTEGER,
+    base_ref TEXT,
+    ref TEXT,
+    title TEXT,
+    doi TEXT,
+    paper_key TEXT,
+    dup INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    entry INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (token, entry)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_entry ON postings (entry);
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """'Treadmill-based IMU gait' -> ['treadmill', 'based', 'imu', 'gait']"""
+    if text.isascii():  # Same result as normalize_title, without the NFKD pass
+        return TOKEN_RE.findall(text.lower())
+    return bib.normalize_title(text).split()
+
+
+def entry_postings(f: Dict[str, str]) -> Dict[str, array]:
+    """Token -> positions over the indexed fields (a phrase never spans two fields)."""
+    postings: Dict[str, array] = {}
+    pos = 0
+    for name in INDEXED_FIELDS:
+        for token in tokenize(f.get(name, "")):
+            postings.setdefault(token, array("I")).append(pos)
+            pos += 1
+        pos += 1
+    return postings
+
+
+def _signature(bib_paths: Sequence[Path], deduplicate: bool) -> str:
+    """Changes whenever one of the .bib files or the duplicate setting changes."""
+    return json.dumps(
+        [
+            deduplicate,
+            [[str(p), p.stat().st_size, p.stat().st_mtime_ns] for p in bib_paths],
+        ]
+    )
+
+
+def _meta(conn: sqlite3.Connection, key: str) -> str | None:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def open_index(index_path: Path, rebuild: bool = False) -> sqlite3.Connection:
+    """Opens (or creates) the index; it is rebuilt if its format is outdated."""
+    version = f"{INDEX_VERSION}.{bib.PARSE_CACHE_VERSION}"
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(index_path))
+    conn.executescript(SCHEMA)
+    if rebuild or _meta(conn, "version") != version:
+        conn.executescript(
+            "DELETE FROM postings; DELETE FROM entries; DELETE FROM meta;"
+        )
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (version,))
+        conn.commit()
+    return conn
+
+
+def _in_chunks(ids: Sequence[int]) -> Iterable[Tuple[str, Sequence[int]]]:
+    for i in range(0, len(ids), SQL_VARS):
+        chunk = ids[i : i + SQL_VARS]
+        yield ",".join("?" * len(chunk)), chunk
+
+
+def update_index(
+    conn: sqlite3.Connection,
+    bib_paths: Sequence[Path],
+    deduplicate: bool = bib.DEDUPLICATE,
+) -> Tuple[int, int]:
+    """
+    Brings the index in line with the .bib files: new or modified entries are
+    parsed and indexed, removed ones are deleted, then the order, duplicates
+    (merged only if `deduplicate`, as in the extractor) and a/b/c suffixes
+    are recomputed over all entries.
+
+    Returns:
+        tuple: (entries added, entries removed)
+    """
+    known = dict(conn.execute("SELECT hash, id FROM entries"))
+    order: Dict[str, int] = {}
+    occurrences: Dict[str, int] = {}
+    added = 0
+
+    for block in bib.iter_all_blocks(bib_paths):
+        block_hash = bib.block_key(block)
+        # Same block exported twice: one entry per copy, as in the extractor
+        n = occurrences.get(block_hash, 0)
+        occurrences[block_hash] = n + 1
+        key = block_hash if n == 0 else f"{block_hash}#{n}"
+        order[key] = len(order)
+        if key in known:
+            continue
+        f = bib.parse_fields(block)
+        base_ref, title, doi, paper_key = bib.entry_row(f)
+        cur = conn.execute(
+            "INSERT INTO entries (hash, base_ref, title, doi, paper_key) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, base_ref, title, doi, paper_key),
+        )
+        entry_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?)",
+            ((tok, entry_id, pos.tobytes()) for tok, pos in entry_postings(f).items()),
+        )
+        added += 1
+
+    removed = [entry_id for key, entry_id in known.items() if key not in order]
+    for marks, chunk in _in_chunks(removed):
+        conn.execute(f"DELETE FROM postings WHERE entry IN ({marks})", chunk)
+        conn.execute(f"DELETE FROM entries WHERE id IN ({marks})", chunk)
+
+    # Order, duplicates and suffixes depend on all entries: recomputed here
+    conn.executemany(
+        "UPDATE entries SET ord = ? WHERE hash = ?",
+        ((i, key) for key, i in order.items()),
+    )
+    rows = conn.execute(
+        "SELECT base_ref, title, doi, paper_key, id FROM entries ORDER BY ord"
+    ).fetchall()
+    unique = list(bib.drop_duplicates(rows)) if deduplicate else rows
+    kept = {row[4] for row in unique}
+    refs = {
+        row[1]: row[0] for row in bib.assign_suffixes([(r[0], r[4]) for r in unique])
+    }
+    conn.executemany(
+        "UPDATE entries SET ref = ?, dup = ? WHERE id = ?",
+        ((refs.get(r[4], ""), int(r[4] not in kept), r[4]) for r in rows),
+    )
+
+    conn.execute(
+        "INSERT OR REPLACE INTO meta VALUES ('signature', ?)",
+        (_signature(bib_paths, deduplicate),),
+    )
+    conn.commit()
+    return added, len(removed)
+
+
+def ensure_fresh(
+    conn: sqlite3.Connection,
+    bib_paths: Sequence[Path],
+    deduplicate: bool = bib.DEDUPLICATE,
+) -> None:
+    """Updates the index only if the .bib files changed since the last update."""
+    if _meta(conn, "signature") == _signature(bib_paths, deduplicate):
+        return
+    t0 = time.perf_counter()
+    added, removed = update_index(conn, bib_paths, deduplicate)
+    print(
+        f"📄 Index updated: {added} entries added, {removed} removed "
+        f"({time.perf_counter() - t0:.1f} s)"
+    )
+
+
+def parse_query(query: str) -> List[List[List[str]]]:
+    """
+    'a b OR "c d"' -> [[['a'], ['b']], [['c', 'd']]]
+    (OR of AND-groups; each clause is a token sequence, i.e. a phrase).
+    """
+    groups: List[List[List[str]]] = [[]]
+    for m in QUERY_RE.finditer(query):
+        phrase, word = m.groups()
+        if word == "OR":
+            groups.append([])
+            continue
+        if word == "AND":
+            continue
+        tokens = tokenize(phrase if phrase is not None else word)
+        if tokens:
+            groups[-1].append(tokens)
+    return [g for g in groups if g]
+
+
+def match_clause(conn: sqlite3.Connection, tokens: List[str]) -> Set[int]:
+    """Entries containing the token sequence (consecutive positions)."""
+    if len(tokens) == 1:
+        cur = conn.execute("SELECT entry FROM postings WHERE token = ?", tokens)
+        return {row[0] for row in cur}
+
+    per_token = []
+    for token in dict.fromkeys(tokens):
+        rows = conn.execute(
+            "SELECT entry, positions FROM postings WHERE token = ?", (token,)
+        )
+        per_token.append((token, dict(rows)))
+    postings = dict(per_token)
+    candidates = set.intersection(*(set(p) for _, p in per_token))
+
+    matches = set()
+    for entry in candidates:
+        positions = {}
+        for token, blobs in postings.items():
+            pos = array("I")
+            pos.frombytes(blobs[entry])
+            positions[token] = set(pos)
+        first = positions[tokens[0]]
+        if any(
+            all(p + i in positions[t] for i, t in enumerate(tokens[1:], 1))
+            for p in first
+        ):
+            matches.add(entry)
+    return matches
+
+
+def search(conn: sqlite3.Connection, query: str) -> List[Tuple[str, str]]:
+    """Returns the (short ref, title) of the matching entries, in .bib order."""
+    ids: Set[int] = set()
+    for group in parse_query(query):
+        group_ids = None
+        for clause in group:
+            found = match_clause(conn, clause)
+            group_ids = found if group_ids is None else group_ids & found
+            if not group_ids:
+                break
+        ids |= group_ids or set()
+
+    rows = []
+    if len(ids) > 10 * SQL_VARS:  # Broad query: one scan beats many IN lookups
+        cur = conn.execute("SELECT ord, ref, title, id FROM entries WHERE dup = 0")
+        rows = [row[:3] for row in cur if row[3] in ids]
+    else:
+        for marks, chunk in _in_chunks(sorted(ids)):
+            rows += conn.execute(
+                f"SELECT ord, ref, title FROM entries "
+                f"WHERE dup = 0 AND id IN ({marks})",
+                chunk,
+            ).fetchall()
+    rows.sort()
+    return [(ref, title) for _, ref, title in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Searches the titles, abstracts and keywords of the .bib files."
+    )
+    parser.add_argument("query", nargs="?", help='e.g. treadmill IMU OR "spastic gait"')
+    parser.add_argument(
+        "--bib",
+        nargs="+",
+        default=BIB_PATHS,
+        help="BibTeX exports (default: BIB_PATHS)",
+    )
+    parser.add_argument("--index", default=INDEX_PATH, help="Index file")
+    parser.add_argument(
+        "--limit", type=int, default=MAX_RESULTS, help="Results printed (0: all)"
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Rebuild the index from scratch"
+    )
+    parser.add_argument(
+        "--keep-duplicates",
+        action="store_true",
+        help="Same as the extractor: keep the same paper once per export",
+    )
+    args = parser.parse_args(argv)
+    deduplicate = bib.DEDUPLICATE and not args.keep_duplicates
+
+    bib_paths = [Path(p) for p in args.bib]
+    for bib_path in bib_paths:
+        if not bib_path.exists():
+            raise FileNotFoundError(f"Bib file not found: {bib_path}")
+
+    conn = open_index(Path(args.index), rebuild=args.rebuild)
+    try:
+        ensure_fresh(conn, bib_paths, deduplicate)
+        if not args.query:
+            n = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            print(f"✅ Index ready: {n} entries in {args.index}")
+            return
+
+        t0 = time.perf_counter()
+        results = search(conn, args.query)
+        elapsed = (time.perf_counter() - t0) * 1000
+        shown = results if args.limit <= 0 else results[: args.limit]
+        for ref, title in shown:
+            print(f"{ref or '(no author/year)'}\t{title}")
+        more = f", {len(shown)} shown" if len(shown) < len(results) else ""
+        print(f"✅ {len(results)} matches{more} ({elapsed:.1f} ms)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
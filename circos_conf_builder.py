@@ -29,9 +29,45 @@ A ready-to-use `circos.conf` file saved in the specified output directory.
 import os
 from pathlib import Path
 
+# Ideogram scaling: article ideograms (any id matching /art/) are shrunk
+CHROMOSOMES_SCALE = "/art/:0.85"
+IMAGE_RADIUS = 1500  # Pixels (<image> radius)
+
+
+def spacing_pairs(active_tracks, boundary_map):
+    """
+    Returns the (current, next) block pairs that must be separated by a large
+    gap: the end of each block (articles, then tracks in the order defined in
+    main) faces the start of the next one, looping back to the first block.
+    """
+    # Build an ordered list of blocks for the circle
+    ordered_boundaries = []
+
+    # 1. Articles (Always first if present)
+    if "articles" in boundary_map:
+        start, end = boundary_map["articles"]
+        ordered_boundaries.append({"name": "articles", "end": end, "start": start})
+
+    # 2. Tracks (in the order defined in main)
+    for t in active_tracks:
+        if t.subdir in boundary_map:
+            start, end = boundary_map[t.subdir]
+            ordered_boundaries.append({"name": t.subdir, "end": end, "start": start})
+
+    # 3. Circular loop: end of current -> start of next (modulo to loop back)
+    if len(ordered_boundaries) <= 1:
+        return []
+    return [
+        (current, ordered_boundaries[(i + 1) % len(ordered_boundaries)])
+        for i, current in enumerate(ordered_boundaries)
+    ]
+
 
 def generate_circos_conf(
-    output_dir, active_tracks, boundary_map, main_article_file="articles.data.txt"
+    output_dir,
+    active_tracks,
+    boundary_map,
+    main_article_file="articles.data.txt",
 ):
     """
     Generates the circos.conf file with automatic spacing based on
@@ -79,29 +115,8 @@ def generate_circos_conf(
 
     spacing_block = "default = 0.003r\n"
 
-    # Build an ordered list of blocks for the circle
-    ordered_boundaries = []
-
-    # 4.1. Articles (Always first if present)
-    if "articles" in boundary_map:
-        start, end = boundary_map["articles"]
-        ordered_boundaries.append({"name": "articles", "end": end, "start": start})
-
-    # 4.2. Tracks (in the order defined in main)
-    for t in valid_tracks:
-        if t.subdir in boundary_map:
-            start, end = boundary_map[t.subdir]
-            ordered_boundaries.append({"name": t.subdir, "end": end, "start": start})
-
-    # 4.3. Creation of Pairwise rules (Circular loop)
-    if len(ordered_boundaries) > 1:
-        for i in range(len(ordered_boundaries)):
-            current = ordered_boundaries[i]
-            # The next one (with modulo to loop back to the first at the end)
-            next_block = ordered_boundaries[(i + 1) % len(ordered_boundaries)]
-
-            # Rule: End of current -> Start of next
-            spacing_block += f"""
+    for current, next_block in spacing_pairs(valid_tracks, boundary_map):
+        spacing_block += f"""
         # Space between {current['name']} and {next_block['name']}
         <pairwise {current['end']},{next_block['start']}>
             spacing = 5r
@@ -113,7 +128,7 @@ def generate_circos_conf(
 # ----------------------------------------------
 <image> 
     dir* = . 
-    radius* = 1500p 
+    radius* = {IMAGE_RADIUS}p 
     svg* = yes 
     angle_orientation* = counterclockwise 
     <<include etc/image.conf>> 
@@ -127,7 +142,7 @@ data_out_of_range* = trim
 karyotype = {karyotype_string}
 chromosomes_units           = 1
 chromosomes_display_default = yes
-chromosomes_scale           = /art/:0.85
+chromosomes_scale           = {CHROMOSOMES_SCALE}
 
 # ----------------------------------------------
 # IDEOGRAM
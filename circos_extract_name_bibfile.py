@@ -11,54 +11,111 @@ to their full article titles.
 Key Features:
 1. Custom Parsing: Robustly parses BibTeX syntax without requiring heavy external
    dependencies like `bibtexparser`. It handles encoding fallbacks automatically.
+   Large exports can be streamed: the file is memory-mapped, its encoding is
+   detected once from a byte sample, and entries are decoded and parsed one
+   at a time (`STREAM_READ`). With `--jobs N`, the field parsing is spread
+   over N worker processes while the main process only finds the entry
+   boundaries; results are merged back in file order.
+   Parsed entries are kept in a cache file keyed by a hash of each raw entry
+   block (`PARSE_CACHE`): on the next run, only new or modified entries are
+   parsed again, then suffixes and sorting are redone on the full list.
+   Several exports (PubMed, Scopus, Web of Science...) can be merged in one
+   streaming pass: `BIB_PATHS`, or the .bib files given on the command line.
 2. Smart Author Formatting:
    - 1 author: "Author YYYY" (e.g., Smith 2020)
    - 2 authors: "A1 & A2 YYYY" (e.g., Doe & Lee 2021)
    - 3+ authors: "FirstAuthor et al. YYYY" (e.g., Brown et al. 2019)
-3. Duplicate Handling: If multiple papers share the exact same author(s) and year,
-   the script automatically appends suffixes ('a', 'b', 'c', etc.) to distinguish
-   them (e.g., "Smith 2020a", "Smith 2020b").
-4. Text Cleanup: Strips stray BibTeX formatting brackets (e.g., `{title}`) and
-   normalizes excessive whitespace.
+3. Duplicate Handling:
+   - The same paper exported by several sources is kept once (`DEDUPLICATE`).
+     Duplicates are found through hash indexes on the DOI and on the
+     normalized title + year + first author, so the cost stays linear.
+     Entries sharing a title/year/first author but with different DOIs are
+     distinct papers and are all kept.
+   - If multiple different papers share the exact same author(s) and year,
+     the script automatically appends suffixes ('a', 'b', 'c', etc.) to
+     distinguish them (e.g., "Smith 2020a", "Smith 2020b").
+4. Text Cleanup: Decodes LaTeX accents and symbols to Unicode (e.g., `M{\"u}ller`
+   -> "Müller", `Garc{\'i}a` -> "García", `\\ss` -> "ß") with a table built
+   once at import and a single regex pass per text field (`LATEX_FIELDS`:
+   DOIs, URLs and file paths are kept verbatim), strips stray BibTeX
+   formatting brackets (e.g., `{title}`) and normalizes excessive whitespace.
 
 Output:
-An Excel (`.xlsx`) file containing two columns:
+A table with two columns, streamed to the sink chosen from the output file
+extension (or `--format`):
   - ref: The short citation reference.
   - title: The cleaned article title.
+Sinks: `.csv`, `.jsonl` (one JSON object per line), `.parquet` (requires
+`pyarrow`) and `.xlsx` (requires `openpyxl`, slowest on large exports).
 ================================================================================
 """
 
+import argparse
+import codecs
+import csv
+import hashlib
+import json
+import mmap
+import os
 import re
+import string
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
 
 # =================
 # TO CUSTOMIZE:
 # =================
 BIB_PATH = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Review_code\Exported Items.bib"
 OUT_XLSX = r"C:\Users\bourgema\OneDrive - Université de Genève\Documents\ENABLE\Review\Review_code\short_refs_with_titles.xlsx"
+BIB_PATHS = [BIB_PATH]  # Several exports are merged (overridden by the command line)
 
+DEDUPLICATE = True  # Keep the same paper once across exports (--keep-duplicates)
 SORT_OUTPUT = True  # Final alphabetical sort (based on 'ref')
 DROP_MISSING = True  # Ignore entries without author or year
-
-# ================
-# XLSX Dependency:
-# ================
+STREAM_READ = True  # Memory-map the .bib and parse entries lazily (huge exports)
+JOBS = 1  # Worker processes for field parsing (overridden by --jobs)
+CHUNK_SIZE = 2000  # Entries sent to a worker at a time
+OUT_FORMAT = None  # "xlsx", "csv", "jsonl" or "parquet" (None: from OUT_XLSX suffix)
+PARQUET_ROW_GROUP = 100_000  # Rows per Parquet row group
+PARSE_CACHE = True  # Reuse the entries parsed by the previous run (--no-cache)
+PARSE_CACHE_PATH = None  # None: next to the output file (<output>.parse_cache.json)
+
+# ==========================
+# Optional Sink Dependencies:
+# ==========================
 try:
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font
-except ImportError as e:
-    raise SystemExit(
-        "The 'openpyxl' module is required to write .xlsx files.\n"
-        "Install it in your PyCharm environment:\n"
-        "    pip install openpyxl"
-    )
+except ImportError:
+    Workbook = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 
 # =================================
 # Nothing to modify below this line
 # =================================
 
 ENTRY_START_RE = re.compile(r"@\s*(\w+)\s*\{\s*([^,]+)\s*,", re.UNICODE)
+DELIM_RE = re.compile(r'[{}",]')
+BRACE_RE = re.compile(r"[{}]")
+
+# Byte-level brace walk on the memory-mapped file: braces, "@" and "," are
+# ASCII, single bytes in every supported encoding, and never part of a
+# multi-byte UTF-8 sequence. Entry headers (\w, \s) are matched on decoded text.
+BRACE_BRE = re.compile(rb"[{}]")
+ENCODING_SAMPLE_SIZE = 1 << 20  # 1 MB
+NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+DOI_PREFIX_RE = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+PARSE_CACHE_VERSION = 4  # Bump when the parsing/formatting rules change
+HEADER = ("ref", "title")
 
 
 def read_text_smart(path: Path) -> str:
@@ -71,6 +128,116 @@ def read_text_smart(path: Path) -> str:
     return path.read_text(encoding="utf-8", errors="replace")
 
 
+def detect_encoding(sample: bytes) -> str:
+    """Detects the encoding of the .bib from a byte sample (same fallbacks)."""
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # Incremental: the sample may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+# LaTeX accent macro -> Unicode combining mark
+LATEX_ACCENTS = {
+    "`": "\u0300",
+    "'": "\u0301",
+    "^": "\u0302",
+    "~": "\u0303",
+    "=": "\u0304",
+    "u": "\u0306",
+    ".": "\u0307",
+    '"': "\u0308",
+    "r": "\u030a",
+    "H": "\u030b",
+    "v": "\u030c",
+    "d": "\u0323",
+    "c": "\u0327",
+    "k": "\u0328",
+    "b": "\u0331",
+}
+# (macro, letter) -> precomposed character, e.g. ('"', 'u') -> 'ü'
+LATEX_ACCENTED = {
+    (acc, ch): unicodedata.normalize("NFC", ch + mark)
+    for acc, mark in LATEX_ACCENTS.items()
+    for ch in string.ascii_letters
+}
+# Displayed or indexed text fields: identifiers and paths (doi, url, file...)
+# are kept verbatim, their backslashes and tildes are not LaTeX
+LATEX_FIELDS = {
+    "author",
+    "editor",
+    "title",
+    "booktitle",
+    "journal",
+    "abstract",
+    "keywords",
+    "publisher",
+    "series",
+    "school",
+    "institution",
+    "organization",
+    "address",
+    "note",
+}
+LATEX_SYMBOLS = {
+    "ss": "ß",
+    "ae": "æ",
+    "AE": "Æ",
+    "oe": "œ",
+    "OE": "Œ",
+    "aa": "å",
+    "AA": "Å",
+    "o": "ø",
+    "O": "Ø",
+    "l": "ł",
+    "L": "Ł",
+    "i": "ı",
+    "j": "ȷ",
+    "&": "&",
+    "%": "%",
+    "$": "$",
+    "#": "#",
+    "_": "_",
+}
+# One alternation for all macros: symbol accents (\'e, \"{u}, \'{}e), letter
+# accents (\c{c}, \v s), named symbols (\ss, \o) and escaped characters (\&).
+# Like any control word, \i, \j and the named symbols absorb one space or {}.
+LATEX_RE = re.compile(
+    r"\\(?:"
+    r"(?P<acc>[`'^~=.\"])\s*(?P<a>\{\s*(?:\\[ij]|[A-Za-z])\s*\}|\{\}[A-Za-z]"
+    r"|\\[ij](?![A-Za-z])(?:\{\}|\s)?|[A-Za-z])"
+    r"|(?P<lacc>[udrHvckb])(?:\s*\{\s*(?P<b>\\[ij]|[A-Za-z])\s*\}"
+    r"|\s+(?P<c>\\[ij](?![A-Za-z])(?:\{\}|\s)?|[A-Za-z]))"
+    r"|(?P<sym>ss|ae|AE|oe|OE|aa|AA|o|O|l|L|i|j)(?![A-Za-z])(?:\{\}|\s)?"
+    r"|(?P<esc>[&%$#_])"
+    r")"
+)
+
+
+def _latex_repl(m: re.Match) -> str:
+    acc = m.group("acc") or m.group("lacc")
+    if acc:
+        base = m.group("a") or m.group("b") or m.group("c")
+        return LATEX_ACCENTED.get((acc, base.strip("{} ")[-1]), m.group(0))
+    sym = m.group("sym") or m.group("esc")
+    return LATEX_SYMBOLS[sym]
+
+
+def decode_latex(s: str) -> str:
+    """'M{\\"u}ller' -> 'M{ü}ller' (braces are left to the callers)."""
+    if "\\" not in s:
+        return s
+    return LATEX_RE.sub(_latex_repl, s)
+
+
 def _strip_outer_quotes_or_braces(val: str) -> str:
     if not val:
         return ""
@@ -83,7 +250,9 @@ def _strip_outer_quotes_or_braces(val: str) -> str:
 
 
 def _norm_ws(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "")).strip()
+    # Same as re.sub(r"\s+", " ", s).strip(): str.split() uses the same
+    # whitespace definition as \s, without the regex overhead
+    return " ".join((s or "").split())
 
 
 def _remove_outer_braces_from_name(name: str) -> str:
@@ -99,32 +268,239 @@ def clean_title(title: str) -> str:
     return t
 
 
-def parse_entries(text: str) -> List[str]:
-    """Returns the list of text blocks for each BibTeX entry."""
-    entries: List[str] = []
-    i, n = 0, len(text)
+def _scan_body(
+    text: str, pos: int, depth: int | None, end: int | None = None
+) -> Tuple[int, List[str]]:
+    """
+    Splits the fields of an entry body starting at `pos`, jumping from one
+    delimiter ({ } " ,) to the next instead of walking every character.
+
+    `depth` is the number of entry braces still open at `pos`: the walk stops
+    on the brace that closes the entry and returns its index. With depth=None
+    the walk runs up to `end` and returns -1.
+
+    Field commas are only those outside braces and quotes; quotes only count
+    outside braces (same rules as BibTeX).
+    """
+    parts: List[str] = []
+    seg = pos
+    fdepth = 0
+    inq = False
+    for m in DELIM_RE.finditer(text, pos, len(text) if end is None else end):
+        ch = m.group()
+        if ch == "{":
+            if depth is not None:
+                depth += 1
+            if not inq:
+                fdepth += 1
+        elif ch == "}":
+            if depth is not None:
+                depth -= 1
+                if depth == 0:
+                    parts.append(text[seg : m.start()].strip())
+                    return m.start(), parts
+            if not inq:
+                fdepth = max(0, fdepth - 1)
+        elif ch == '"':
+            if fdepth == 0:
+                inq = not inq
+        elif fdepth == 0 and not inq:
+            s = text[seg : m.start()].strip()
+            if s:
+                parts.append(s)
+            seg = m.end()
+    if depth is None:
+        parts.append(text[seg:end].strip())
+    return -1, parts
+
+
+def _fields_from_parts(parts: List[str]) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for p in parts:
+        if "=" in p:
+            k, v = p.split("=", 1)
+            key = _norm_ws(k).lower()
+            val = _strip_outer_quotes_or_braces(_norm_ws(v))
+            out[key] = decode_latex(val) if key in LATEX_FIELDS else val
+    return out
+
+
+def iter_entries(text: str) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    Single-pass BibTeX tokenizer: yields (entry block, field dict) for each
+    entry, in file order. The entry boundaries and the field split are found
+    in the same walk.
+    """
+    i = 0
     while True:
         m = ENTRY_START_RE.search(text, i)
         if not m:
-            break
+            return
         start = m.start()
         j = text.find("{", start)
+
+        # Braces of the entry header (type and key)
         depth = 0
-        end = None
-        for k in range(j, n):
-            ch = text[k]
-            if ch == "{":
-                depth += 1
-            elif ch == "}":
-                depth -= 1
-                if depth == 0:
-                    end = k + 1
-                    break
-        if end is None:
-            break
-        entries.append(text[start:end])
+        close = -1
+        for b in BRACE_RE.finditer(text, j, m.end()):
+            depth += 1 if b.group() == "{" else -1
+            if depth == 0:
+                close = b.start()
+                break
+
+        if close >= 0:
+            parts: List[str] = []  # Entry closed before its first field
+        else:
+            close, parts = _scan_body(text, m.end(), depth)
+            if close < 0:
+                return  # Unbalanced braces: stop, as BibTeX would
+        yield text[start : close + 1], _fields_from_parts(parts)
+        i = close + 1
+
+
+def _find_entry_start(mm, pos: int, enc: str) -> Tuple[int, int] | None:
+    """
+    Byte span of the next entry header at or after `pos`, exactly as
+    ENTRY_START_RE finds it on the decoded text: each "@" is checked by
+    decoding its header (up to the first comma, where a match always ends).
+    """
+    at = mm.find(b"@", pos)
+    while at >= 0:
+        comma = mm.find(b",", at)
+        if comma < 0:
+            return None
+        if ENTRY_START_RE.match(mm[at : comma + 1].decode(enc, errors="replace")):
+            return at, comma + 1
+        at = mm.find(b"@", at + 1)
+    return None
+
+
+def iter_entries_mmap(path: Path) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    Streaming version of iter_entries for huge exports: the file is
+    memory-mapped, entry boundaries are found on the raw bytes, and only one
+    entry at a time is decoded and parsed. Memory stays flat whatever the
+    size of the file.
+    """
+    with open(path, "rb") as fb:
+        try:
+            mm = mmap.mmap(fb.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            return
+        with mm:
+            enc = detect_encoding(mm[:ENCODING_SAMPLE_SIZE])
+            size = len(mm)
+            m = _find_entry_start(mm, 0, enc)
+            while m:
+                start = m[0]
+                nxt = _find_entry_start(mm, m[1], enc)
+
+                # Fast path: the entry usually ends on the last brace before
+                # the next entry; the parser confirms it on the decoded block.
+                end = mm.rfind(b"}", start, nxt[0] if nxt else size) + 1
+                raw = mm[start:end] if end > 0 else b""
+                entry = None
+                if raw and raw.count(b"{") == raw.count(b"}"):
+                    block = raw.decode(enc, errors="replace")
+                    entry = next(iter_entries(block), None)
+                    if entry and len(entry[0]) != len(block):
+                        entry = None
+
+                if entry is None:
+                    # Slow path: walk the braces on the raw bytes
+                    depth = 0
+                    end = -1
+                    for b in BRACE_BRE.finditer(mm, start):
+                        depth += 1 if b.group() == b"{" else -1
+                        if depth == 0:
+                            end = b.end()
+                            break
+                    if end < 0:
+                        return  # Unbalanced braces
+                    block = mm[start:end].decode(enc, errors="replace")
+                    # No match on its own: the entry closed inside its header
+                    entry = next(iter_entries(block), (block, {}))
+
+                yield entry
+                # Reuse the look-ahead match if nothing was skipped before it
+                if nxt and end >= m[1] and nxt[0] >= end:
+                    m = nxt
+                else:
+                    m = _find_entry_start(mm, end, enc)
+
+
+def iter_blocks(text: str) -> Iterator[str]:
+    """
+    Yields the raw entry blocks only (same boundaries as iter_entries),
+    walking the braces without splitting the fields.
+    """
+    i = 0
+    while True:
+        m = ENTRY_START_RE.search(text, i)
+        if not m:
+            return
+        start = m.start()
+        depth = 0
+        end = -1
+        for b in BRACE_RE.finditer(text, text.find("{", start)):
+            depth += 1 if b.group() == "{" else -1
+            if depth == 0:
+                end = b.end()
+                break
+        if end < 0:
+            return
+        yield text[start:end]
         i = end
-    return entries
+
+
+def iter_blocks_mmap(path: Path) -> Iterator[str]:
+    """Streaming version of iter_blocks on the memory-mapped file."""
+    with open(path, "rb") as fb:
+        try:
+            mm = mmap.mmap(fb.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            return
+        with mm:
+            enc = detect_encoding(mm[:ENCODING_SAMPLE_SIZE])
+            i = 0
+            while True:
+                m = _find_entry_start(mm, i, enc)
+                if not m:
+                    return
+                depth = 0
+                end = -1
+                for b in BRACE_BRE.finditer(mm, m[0]):
+                    depth += 1 if b.group() == b"{" else -1
+                    if depth == 0:
+                        end = b.end()
+                        break
+                if end < 0:
+                    return
+                yield mm[m[0] : end].decode(enc, errors="replace")
+                i = end
+
+
+def iter_all_blocks(paths: Iterable[Path]) -> Iterator[str]:
+    """Entry blocks of several .bib files, one file after the other."""
+    for path in paths:
+        if STREAM_READ:
+            yield from iter_blocks_mmap(path)
+        else:
+            yield from iter_blocks(read_text_smart(path))
+
+
+def iter_all_entries(paths: Iterable[Path]) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Parsed entries of several .bib files, one file after the other."""
+    for path in paths:
+        if STREAM_READ:
+            yield from iter_entries_mmap(path)
+        else:
+            yield from iter_entries(read_text_smart(path))
+
+
+def parse_entries(text: str) -> List[str]:
+    """Returns the list of text blocks for each BibTeX entry."""
+    return [block for block, _ in iter_entries(text)]
 
 
 def parse_fields(entry_text: str) -> Dict[str, str]:
@@ -135,39 +511,11 @@ def parse_fields(entry_text: str) -> Dict[str, str]:
     comma = entry_text.find(",", start)
     if comma < 0:
         return {}
-    body = entry_text[comma + 1 : entry_text.rfind("}")]
-    parts: List[str] = []
-    buf: List[str] = []
-    depth = 0
-    inq = False
-    for ch in body:
-        if ch == "{" and not inq:
-            depth += 1
-            buf.append(ch)
-        elif ch == "}" and not inq:
-            depth = max(0, depth - 1)
-            buf.append(ch)
-        elif ch == '"' and depth == 0:
-            inq = not inq
-            buf.append(ch)
-        elif ch == "," and depth == 0 and not inq:
-            s = "".join(buf).strip()
-            if s:
-                parts.append(s)
-            buf = []
-        else:
-            buf.append(ch)
-    if buf:
-        parts.append("".join(buf).strip())
-
-    out: Dict[str, str] = {}
-    for p in parts:
-        if "=" in p:
-            k, v = p.split("=", 1)
-            key = _norm_ws(k).lower()
-            val = _strip_outer_quotes_or_braces(_norm_ws(v))
-            out[key] = val
-    return out
+    end = entry_text.rfind("}")
+    if end < 0:
+        end = len(entry_text) - 1  # Same bound as the slice [comma + 1 : -1]
+    _, parts = _scan_body(entry_text, comma + 1, None, end)
+    return _fields_from_parts(parts)
 
 
 def split_authors(s: str) -> List[str]:
@@ -180,7 +528,7 @@ def split_authors(s: str) -> List[str]:
 def display_surname(author: str) -> str:
     """
     Returns the 'displayed' surname (accents preserved).
-    Handles 'Last, First' or 'First Last' and removes enclosing braces.
+    Handles 'Last, First' or 'First Last' and removes the braces.
     """
     a = _remove_outer_braces_from_name(author)
     if "," in a:
@@ -188,7 +536,7 @@ def display_surname(author: str) -> str:
     else:
         parts = a.split(" ")
         sur = parts[-1] if parts else ""
-    return _norm_ws(sur)
+    return _norm_ws(BRACE_RE.sub("", sur))
 
 
 def year_from_fields(f: Dict[str, str]) -> str:
@@ -223,67 +571,82 @@ def short_ref_and_title(f: Dict[str, str]) -> Tuple[str, str]:
     return ref, title
 
 
-def write_excel(rows: List[Tuple[str, str]], out_path: Path) -> None:
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "refs"
-
-    # Headers
-    ws.append(["ref", "title"])
-    bold = Font(bold=True)
-    ws["A1"].font = bold
-    ws["B1"].font = bold
-
-    # Rows
-    for ref, title in rows:
-        ws.append([ref, title])
-
-    # Simple auto column width
-    for col in ("A", "B"):
-        max_len = max(
-            (len(str(ws[f"{col}{r}"].value)) for r in range(1, ws.max_row + 1)),
-            default=0,
-        )
-        ws.column_dimensions[col].width = min(max(12, max_len + 2), 80)
+def normalize_title(title) -> str:
+    """'The {CP} Gait: a Study.' -> 'the cp gait a study'"""
+    if title is None:
+        return ""
+    s = unicodedata.normalize("NFKD", str(title))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch)).casefold()
+    return " ".join(NON_ALNUM_RE.sub(" ", s).split())
 
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    wb.save(str(out_path))
 
+def normalize_doi(doi) -> str:
+    """'https://doi.org/10.1000/ABC ' -> '10.1000/abc'"""
+    if doi is None:
+        return ""
+    return DOI_PREFIX_RE.sub("", str(doi).strip()).lower()
 
-def main():
-    bib_path = Path(BIB_PATH)
-    out_path = Path(OUT_XLSX)
 
-    if not bib_path.exists():
-        raise FileNotFoundError(f"Bib file not found: {bib_path}")
+def entry_row(f: Dict[str, str]) -> Tuple[str, str, str, str]:
+    """
+    Returns (base ref, title, DOI key, paper key) for an entry. The two keys
+    identify the same paper across exports ("" when unavailable); the paper
+    key is the normalized title + year + first author surname.
+    """
+    ref, title = short_ref_and_title(f)
+    doi = normalize_doi(f.get("doi", ""))
+    norm = normalize_title(title)
+    year = year_from_fields(f)
+    key = ""
+    if norm and year:
+        authors = split_authors(f.get("author", ""))
+        first = normalize_title(display_surname(authors[0])) if authors else ""
+        key = f"{norm}|{year}|{first}"
+    return ref, title, doi, key
 
-    text = read_text_smart(bib_path)
 
-    # Parse and count entries
-    entry_blocks = parse_entries(text)
-    print(f"📄 Entries read from the .bib: {len(entry_blocks)}")
+def drop_duplicates(rows: Iterable[tuple]) -> Iterator[tuple]:
+    """
+    Yields the first occurrence of each paper (rows from entry_row). A row is
+    a duplicate if its DOI was already seen, or if its paper key was already
+    seen and the DOIs do not tell the papers apart (one of them is missing):
+    two rows with the same title/year/first author but different DOIs (an
+    editorial, conference and journal versions) are distinct papers. The keys
+    of every row are recorded, so a copy without DOI still links the others.
+    """
+    seen_doi: set = set()
+    seen_key: Dict[str, set] = {}  # paper key -> DOIs seen with it ("" if none)
+    for row in rows:
+        doi, key = row[2], row[3]
+        dup = (doi and doi in seen_doi) or (
+            key in seen_key and (not doi or "" in seen_key[key])
+        )
+        if doi:
+            seen_doi.add(doi)
+        if key:
+            seen_key.setdefault(key, set()).add(doi)
+        if not dup:
+            yield row
 
-    # Build base refs + titles
-    base_rows: List[Tuple[str, str]] = []  # (ref_base, title)
-    for block in entry_blocks:
-        f = parse_fields(block)
-        ref, title = short_ref_and_title(f)
-        if ref:
-            base_rows.append((ref, title))
-        elif not DROP_MISSING:
-            base_rows.append(("", title))
 
+def assign_suffixes(base_rows: List[tuple]) -> List[tuple]:
+    """
+    Assigns a/b/c suffixes to all occurrences of a base ref (first item of
+    each row; other items are carried along). Rows without ref are dropped.
+    """
     # Total count per base ref
     totals: Dict[str, int] = {}
-    for ref, _ in base_rows:
+    for row in base_rows:
+        ref = row[0]
         if not ref:
             continue
         totals[ref] = totals.get(ref, 0) + 1
 
     # Assign a/b/c suffixes for all occurrences of a base ref
     seen_index: Dict[str, int] = {}
-    final_rows: List[Tuple[str, str]] = []
-    for ref, title in base_rows:
+    final_rows: List[tuple] = []
+    for row in base_rows:
+        ref = row[0]
         if not ref:
             continue
         if totals.get(ref, 0) >= 2:
@@ -295,17 +658,327 @@ def main():
                 first = chr(ord("a") + (idx // 26) - 1)
                 second = chr(ord("a") + (idx % 26))
                 suffix = f"{first}{second}"
-            final_rows.append((f"{ref}{suffix}", title))
+            final_rows.append((f"{ref}{suffix}",) + tuple(row[1:]))
             seen_index[ref] = idx + 1
         else:
-            final_rows.append((ref, title))
+            final_rows.append(tuple(row))
+    return final_rows
+
+
+def _rows_from_blocks(blocks: List[str]) -> List[Tuple[str, str, str, str]]:
+    """Worker task: entry_row of each entry block of a chunk."""
+    return [entry_row(parse_fields(block)) for block in blocks]
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    chunk: List = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_rows_parallel(
+    blocks: Iterable[str], jobs: int, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Tuple[str, str, str, str]]:
+    """
+    Parses the entry blocks in a process pool and yields the entry_row
+    results in the original order (the a/b/c suffixes depend on it).
+    At most 2 chunks per worker are in flight, so memory stays bounded.
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for chunk in _chunks(blocks, chunk_size):
+            pending.append(pool.submit(_rows_from_blocks, chunk))
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def block_key(block: str) -> str:
+    """Hash of a raw entry block (any edit of the entry changes it)."""
+    return hashlib.blake2b(
+        block.encode("utf-8", "surrogatepass"), digest_size=16
+    ).hexdigest()
+
+
+class ParseCache:
+    """
+    Persistent map: entry block hash -> entry_row (base ref, title, keys).
+    Only the entries seen during the run are saved back, so entries removed
+    from the .bib do not accumulate in the file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, List[str]] = {}
+        self.seen: Dict[str, List[str]] = {}
+        self.hits = 0
+        if not path.exists():
+            return
+        try:
+            with path.open(encoding="utf-8") as fr:
+                data = json.load(fr)
+        except (OSError, ValueError) as e:
+            print(f"[WARN Cache] Unreadable parse cache, ignored: {e}")
+            return
+        if data.get("version") == PARSE_CACHE_VERSION:
+            self.entries = data.get("entries", {})
+
+    def get(self, key: str):
+        row = self.entries.get(key)
+        if row is not None:
+            self.hits += 1
+            self.seen[key] = row
+        return row
+
+    def put(self, key: str, row: tuple) -> None:
+        self.seen[key] = list(row)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fw:
+            json.dump({"version": PARSE_CACHE_VERSION, "entries": self.seen}, fw)
+        os.replace(tmp, self.path)
+
+
+def parse_rows_cached(
+    blocks: Iterable[str], cache: ParseCache, jobs: int = 1
+) -> List[Tuple[str, str, str, str]]:
+    """
+    Returns the entry_row of each entry block, in file order.
+    Cached blocks are not parsed; the others are parsed (in a process pool
+    if jobs > 1) and added to the cache.
+    """
+    rows: List = []
+    missing: List[Tuple[int, str, str]] = []  # (row index, key, block)
+    for block in blocks:
+        key = block_key(block)
+        row = cache.get(key)
+        if row is not None:
+            rows.append(tuple(row))
+        elif jobs > 1:
+            rows.append(None)
+            missing.append((len(rows) - 1, key, block))
+        else:
+            row = entry_row(parse_fields(block))
+            cache.put(key, row)
+            rows.append(row)
+
+    if missing:
+        parsed = parse_rows_parallel((block for _, _, block in missing), jobs)
+        for (i, key, _), row in zip(missing, parsed):
+            cache.put(key, row)
+            rows[i] = row
+    return rows
+
+
+def write_excel(rows: Sequence[Tuple[str, str]], out_path: Path) -> None:
+    """
+    Streams the rows into a write-only workbook: cells are written to disk as
+    they are appended instead of being kept as objects. Column widths must be
+    set before the first row in this mode, so they are computed first, in a
+    single pass over the values.
+    """
+    if Workbook is None:
+        raise SystemExit(
+            "The 'openpyxl' module is required to write .xlsx files.\n"
+            "Install it in your PyCharm environment:\n"
+            "    pip install openpyxl\n"
+            "or choose another output format (.csv, .jsonl, .parquet)."
+        )
+    header = HEADER
+
+    # Simple auto column width
+    max_a, max_b = len(header[0]), len(header[1])
+    for ref, title in rows:
+        if len(ref) > max_a:
+            max_a = len(ref)
+        if len(title) > max_b:
+            max_b = len(title)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("refs")
+    for col, max_len in (("A", max_a), ("B", max_b)):
+        ws.column_dimensions[col].width = min(max(12, max_len + 2), 80)
+
+    # Headers
+    bold = Font(bold=True)
+    cells = []
+    for name in header:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = bold
+        cells.append(cell)
+    ws.append(cells)
+
+    # Rows
+    for ref, title in rows:
+        ws.append([ref, title])
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(str(out_path))
+
+
+def write_csv(rows: Iterable[Tuple[str, str]], out_path: Path) -> None:
+    """Streams the rows to a UTF-8 CSV file."""
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8", newline="") as fw:
+        writer = csv.writer(fw)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def write_jsonl(rows: Iterable[Tuple[str, str]], out_path: Path) -> None:
+    """Streams the rows to a JSON Lines file ({"ref": ..., "title": ...})."""
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8", newline="\n") as fw:
+        for ref, title in rows:
+            fw.write(json.dumps({"ref": ref, "title": title}, ensure_ascii=False))
+            fw.write("\n")
+
+
+def write_parquet(rows: Iterable[Tuple[str, str]], out_path: Path) -> None:
+    """Streams the rows to a Parquet file, one row group at a time."""
+    if pa is None:
+        raise SystemExit(
+            "The 'pyarrow' module is required to write .parquet files.\n"
+            "    pip install pyarrow"
+        )
+    schema = pa.schema([(name, pa.string()) for name in HEADER])
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with pq.ParquetWriter(str(out_path), schema) as writer:
+        for chunk in _chunks(rows, PARQUET_ROW_GROUP):
+            refs, titles = zip(*chunk)
+            writer.write_table(pa.table([list(refs), list(titles)], schema=schema))
+
+
+SINKS = {
+    "xlsx": write_excel,
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+    "parquet": write_parquet,
+}
+
+
+def sink_for(out_path: Path, fmt: str | None = None):
+    """Returns the writer for an explicit format or the output file extension."""
+    fmt = (fmt or out_path.suffix.lstrip(".")).lower()
+    if fmt not in SINKS:
+        raise SystemExit(
+            f"[ERROR Output] Unknown output format '{fmt}' (use {', '.join(SINKS)})"
+        )
+    return SINKS[fmt]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Extracts short references and titles from .bib files."
+    )
+    parser.add_argument(
+        "bib",
+        nargs="*",
+        help="BibTeX exports to merge (default: BIB_PATHS)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=JOBS,
+        help="Number of worker processes used to parse the fields",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every entry again and do not update the parse cache",
+    )
+    parser.add_argument(
+        "--keep-duplicates",
+        action="store_true",
+        help="Keep the same paper once per export instead of merging it",
+    )
+    parser.add_argument(
+        "-o",
+        "--out",
+        default=OUT_XLSX,
+        help="Output file (default: OUT_XLSX)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(SINKS),
+        default=OUT_FORMAT,
+        help="Output format (default: from the output file extension)",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Also update the full-text search index (circos_bib_index.py)",
+    )
+    args = parser.parse_args(argv)
+
+    bib_paths = [Path(p) for p in (args.bib or BIB_PATHS)]
+    out_path = Path(args.out)
+    write_rows = sink_for(out_path, args.format)
+
+    for bib_path in bib_paths:
+        if not bib_path.exists():
+            raise FileNotFoundError(f"Bib file not found: {bib_path}")
+
+    cache = None
+    if PARSE_CACHE and not args.no_cache:
+        cache_path = (
+            Path(PARSE_CACHE_PATH)
+            if PARSE_CACHE_PATH
+            else out_path.with_suffix(".parse_cache.json")
+        )
+        cache = ParseCache(cache_path)
+        parsed = parse_rows_cached(iter_all_blocks(bib_paths), cache, args.jobs)
+    elif args.jobs > 1:
+        parsed = parse_rows_parallel(iter_all_blocks(bib_paths), args.jobs)
+    else:
+        parsed = (entry_row(f) for _, f in iter_all_entries(bib_paths))
+
+    # Parse entries of all files (single streaming pass), then merge duplicates
+    rows = list(parsed)
+    n_entries = len(rows)
+    print(f"📄 Entries read from {len(bib_paths)} .bib file(s): {n_entries}")
+    if cache is not None:
+        print(f"📄 Parse cache: {cache.hits} reused, {n_entries - cache.hits} parsed")
+        cache.save()
+    if DEDUPLICATE and not args.keep_duplicates:
+        rows = list(drop_duplicates(rows))
+        print(f"📄 Duplicate papers removed: {n_entries - len(rows)}")
+
+    base_rows: List[Tuple[str, str]] = []  # (ref_base, title)
+    for ref, title, _, _ in rows:
+        if ref:
+            base_rows.append((ref, title))
+        elif not DROP_MISSING:
+            base_rows.append(("", title))
+
+    final_rows = assign_suffixes(base_rows)
 
     if SORT_OUTPUT:
         final_rows = sorted(final_rows, key=lambda x: x[0].lower())
 
-    write_excel(final_rows, out_path)
+    write_rows(final_rows, out_path)
     print(f"✅ {len(final_rows)} rows written to: {out_path}")
 
+    if args.index:
+        import circos_bib_index
+
+        conn = circos_bib_index.open_index(Path(circos_bib_index.INDEX_PATH))
+        try:
+            circos_bib_index.ensure_fresh(
+                conn, bib_paths, DEDUPLICATE and not args.keep_duplicates
+            )
+        finally:
+            conn.close()
+
 
 if __name__ == "__main__":
     main()
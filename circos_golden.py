@@ -0,0 +1,336 @@
+"""
+================================================================================
+GOLDEN-OUTPUT EQUIVALENCE HARNESS
+================================================================================
+
+Description:
+This script checks that an optimized generation engine writes exactly the
+same files as the reference implementation (`circos_reference_engine.py`, a
+frozen copy of the original `build_track` / `get_counts_for_config` logic).
+Both engines run on the same corpus of workbooks, their output directories
+are compared byte for byte, and the time of each engine is reported side by
+side with the speedup.
+
+Key Features:
+1. Corpus: Synthetic workbooks of increasing size (same generator as
+   `circos_benchmark.py`) and small hand-written edge cases: empty or blank
+   `ArtNb`, `???` in tracks with and without `special_na`, zero-like strings
+   ("0,0", " 0 ", "0.0", "-0"), booleans, NA tokens, duplicated articles
+   under different IDs ("Art 3", 3, "3"), non-numeric IDs, a track without
+   any article, a single article, an empty sheet, an all-numeric sheet and
+   missing section columns.
+2. Byte-for-Byte Diff: Every file written by either engine
+   (`articles.data.txt`, `*.links.txt`, `*.numbers.txt`, `*.data.txt`,
+   `*.validation.txt`, `circos.conf`, `preview.svg`, label files) must exist
+   on both sides with identical bytes. The first differing line of each file
+   is printed.
+3. Pluggable Engines: An engine is a function `(excel_path, output_dir,
+   tracks)` running Phases 0 to 3; add alternatives to `ENGINES`. The
+   default candidate, "current", is `main.run_pipeline` itself (rendering
+   off), so it covers the label layout and the preview as configured.
+
+Usage:
+    python circos_golden.py                     # "current" vs reference
+    python circos_golden.py --engine current --sizes 100 20000
+    python circos_golden.py --cases zero_like duplicates
+
+Output:
+A comparison table in the console (exit code 1 if any output differs).
+Outputs are kept in `golden_runs/<case>/<engine>/` for inspection.
+================================================================================
+"""
+
+import argparse
+import contextlib
+import io
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from openpyxl import Workbook
+
+import circos_benchmark as benchmark
+import circos_reference_engine as reference
+import main as pipeline
+
+# =================
+# TO CUSTOMIZE:
+# =================
+GOLDEN_DIR = Path(__file__).resolve().with_name("golden_runs")
+SIZES = [200, 2_000]  # Articles of the synthetic workbooks
+REPEAT = 1  # Timed runs per engine and workbook (the best one is kept)
+
+# =================================
+# Nothing to modify below this line
+# =================================
+
+
+def golden_tracks():
+    """The tracks of main.py, in their usual order."""
+    return benchmark.bench_tracks()
+
+
+def run_current(excel_path: str, output_dir: str, tracks) -> None:
+    """The real pipeline of main.py (without rendering) on another workbook."""
+    saved = pipeline.EXCEL_PATH, pipeline.OUTPUT_DIR, pipeline.RUN_RENDER
+    pipeline.EXCEL_PATH, pipeline.OUTPUT_DIR = excel_path, output_dir
+    pipeline.RUN_RENDER = False
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            pipeline.run_pipeline(tracks)
+    finally:
+        pipeline.EXCEL_PATH, pipeline.OUTPUT_DIR, pipeline.RUN_RENDER = saved
+
+
+ENGINES: Dict[str, Callable] = {
+    "reference": reference.run,
+    "current": run_current,
+}
+
+
+# ==========================================
+#           EDGE-CASE CORPUS
+# ==========================================
+# Each case returns the sheet rows as {column: value}; missing columns are 0.
+# Column names are those of main.py (gmfcs: special_na, tools: no special_na).
+
+
+def _rows(*rows: Dict) -> List[Dict]:
+    return list(rows)
+
+
+EDGE_CASES: Dict[str, Callable[[], List[Dict]]] = {
+    "empty_art": lambda: _rows(
+        {"ArtNb": None, "ref": "No id", "GMFCS-I": 1, "EMG": 1},
+        {"ArtNb": "", "ref": "Empty id", "GMFCS-II": 1},
+        {"ArtNb": "   ", "ref": "Blank id", "EMG": 1},
+        {"ArtNb": 1, "ref": "Smith 2020", "GMFCS-I": 1, "EMG": 1},
+        {"ArtNb": 2, "ref": "Lee 2021", "GMFCS-II": 1, "IMU": 1},
+    ),
+    "unknown": lambda: _rows(
+        {"ArtNb": 1, "ref": "A 2001", "GMFCS-I": "???", "EMG": "???"},
+        {"ArtNb": 2, "ref": "B 2002", "GMFCS-II": " ??? ", "Spastic": "???"},
+        {"ArtNb": 3, "ref": "C 2003", "GMFCS-I": 1, "GMFCS-III": "???", "IMU": 1},
+        {"ArtNb": 4, "ref": "D 2004", "Hemiplegic": "???", "Diplegic": "???"},
+        {"ArtNb": 5, "ref": "E 2005", "Kinematic": "???", "Running": 1},
+    ),
+    "zero_like": lambda: _rows(
+        {"ArtNb": 1, "ref": "A", "GMFCS-I": "0", "EMG": "0,0", "IMU": 0.0},
+        {"ArtNb": 2, "ref": "B", "GMFCS-I": " 0 ", "EMG": "0.0", "IMU": "-0"},
+        {"ArtNb": 3, "ref": "C", "GMFCS-I": "0e0", "EMG": "00", "IMU": "1,0"},
+        {"ArtNb": 4, "ref": "D", "GMFCS-I": False, "EMG": True, "IMU": "x"},
+        {"ArtNb": 5, "ref": "E", "GMFCS-I": "yes", "EMG": 2, "IMU": "0,5"},
+    ),
+    "na_tokens": lambda: _rows(
+        {"ArtNb": 1, "ref": "A", "GMFCS-I": "n/a", "EMG": "NA", "IMU": "-"},
+        {"ArtNb": 2, "ref": "B", "GMFCS-I": "--", "EMG": "?", "IMU": "??"},
+        {"ArtNb": 3, "ref": "C", "GMFCS-I": "NaN", "EMG": "N/A", "IMU": None},
+        {"ArtNb": 4, "ref": "D", "GMFCS-I": 1, "EMG": 1, "IMU": 1},
+    ),
+    "duplicates": lambda: _rows(
+        {"ArtNb": "Art 3", "ref": "Smith 2020", "GMFCS-I": 1, "EMG": 1},
+        {"ArtNb": 3, "ref": "Smith 2020", "GMFCS-I": 1, "EMG": 1},
+        {"ArtNb": "3", "ref": "Smith 2020", "GMFCS-II": 1},
+        {"ArtNb": "art3", "ref": "Smith 2020", "GMFCS-I": 1},
+        {"ArtNb": 1, "ref": "Lee 2019", "GMFCS-I": 1, "EMG": 1},
+        {"ArtNb": 1, "ref": "Lee 2019", "GMFCS-I": 1, "EMG": 1},
+    ),
+    "non_numeric_ids": lambda: _rows(
+        {"ArtNb": "Art 12b", "ref": "Review (2018)", "GMFCS-I": 1, "EMG": 1},
+        {"ArtNb": "review", "ref": "Müller & Co.", "GMFCS-I": 1},
+        {"ArtNb": "art007", "ref": "O'Neil 2001", "EMG": 1},
+        {"ArtNb": 10, "ref": "Ten 2010", "GMFCS-I": 1, "EMG": 1},
+        {"ArtNb": 2.0, "ref": "Two 2002", "GMFCS-I": 1},
+        {"ArtNb": "Art 2", "ref": "Two bis", "IMU": 1},
+    ),
+    "empty_track": lambda: _rows(
+        {"ArtNb": 1, "ref": "A", "GMFCS-I": 1},
+        {"ArtNb": 2, "ref": "B", "GMFCS-II": 1},
+    ),
+    "single_article": lambda: _rows(
+        {"ArtNb": 1, "ref": "Only 2024", "GMFCS-IV": 1, "Squat": 1},
+    ),
+    "empty_sheet": lambda: _rows(),
+    # No text cell at all: pandas gives every value as a float (1 -> 1.0)
+    "numeric_only": lambda: _rows(
+        {"ArtNb": 1, "GMFCS-I": 1, "EMG": None, "IMU": 0},
+        {"ArtNb": 2, "GMFCS-I": 0, "EMG": 1, "IMU": 2},
+        {"ArtNb": None, "GMFCS-I": 1, "EMG": 1, "IMU": 1},
+    ),
+    # Integer IDs in an all-numeric sheet: rows give 1.0, the column gives 1
+    "numeric_int_ids": lambda: _rows(
+        {"ArtNb": 3, "GMFCS-I": 1, "EMG": None},
+        {"ArtNb": 1, "GMFCS-I": None, "EMG": 1},
+        {"ArtNb": 2, "GMFCS-II": 1, "EMG": 0},
+    ),
+    "missing_columns": lambda: _rows(
+        {"ArtNb": 1, "ref": "A", "GMFCS-I": 1, "IMU": 1},
+        {"ArtNb": 2, "ref": "B", "GMFCS-II": "???", "Force-plate": 1},
+    ),
+}
+
+# Columns left out of the workbook of a case
+EDGE_OMITTED_COLUMNS = {
+    "numeric_only": ["ref"],
+    "numeric_int_ids": ["ref"],
+    "missing_columns": ["EMG", "GMFCS-IV", "Spastic"],
+}
+
+
+def write_edge_workbook(
+    path: Path, rows: List[Dict], tracks, omitted: List[str] = ()
+) -> None:
+    columns = ["ArtNb", "ref"] + benchmark.section_columns(tracks)
+    columns = [c for c in columns if c not in omitted]
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(columns)
+    for row in rows:
+        ws.append(
+            [row.get(c, 0 if c not in ("ArtNb", "ref") else None) for c in columns]
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(str(path))
+
+
+def prepare_corpus(sizes: List[int], cases: List[str], tracks) -> Dict[str, Path]:
+    """Writes the workbooks of the corpus; returns {case name: workbook}."""
+    corpus = {}
+    for case in cases:
+        path = GOLDEN_DIR / case / "sheet.xlsx"
+        write_edge_workbook(
+            path, EDGE_CASES[case](), tracks, EDGE_OMITTED_COLUMNS.get(case, [])
+        )
+        corpus[case] = path
+    for n in sizes:
+        path = GOLDEN_DIR / f"synthetic_{n}" / "sheet.xlsx"
+        if not path.exists():
+            benchmark.generate_workbook(path, n, tracks)
+        corpus[f"synthetic_{n}"] = path
+    return corpus
+
+
+# ==========================================
+#           RUN & DIFF
+# ==========================================
+
+
+def run_engine(engine: Callable, excel_path: Path, out_dir: Path, tracks) -> Dict:
+    """Best time of REPEAT runs, or the error raised by the engine."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        shutil.rmtree(out_dir, ignore_errors=True)
+        out_dir.mkdir(parents=True)
+        t0 = time.perf_counter()
+        try:
+            engine(str(excel_path), str(out_dir), tracks)
+        except Exception as e:
+            return {"time": None, "error": f"{type(e).__name__}: {e}"}
+        best = min(best, time.perf_counter() - t0)
+    return {"time": best, "error": None}
+
+
+def first_difference(a: bytes, b: bytes) -> str:
+    lines_a, lines_b = a.splitlines(), b.splitlines()
+    for i, (la, lb) in enumerate(zip(lines_a, lines_b), 1):
+        if la != lb:
+            return f"line {i}: {la[:70]!r} != {lb[:70]!r}"
+    if len(lines_a) != len(lines_b):
+        return f"{len(lines_a)} lines != {len(lines_b)} lines"
+    return "line endings differ"
+
+
+def diff_dirs(ref_dir: Path, cand_dir: Path) -> List[str]:
+    """Byte-for-byte comparison of two output directories."""
+    files_ref = {p.relative_to(ref_dir) for p in ref_dir.rglob("*") if p.is_file()}
+    files_cand = {p.relative_to(cand_dir) for p in cand_dir.rglob("*") if p.is_file()}
+    problems = []
+    for rel in sorted(files_ref | files_cand):
+        if rel not in files_cand:
+            problems.append(f"{rel}: missing in the candidate output")
+        elif rel not in files_ref:
+            problems.append(f"{rel}: not written by the reference")
+        else:
+            a, b = (ref_dir / rel).read_bytes(), (cand_dir / rel).read_bytes()
+            if a != b:
+                problems.append(f"{rel}: {first_difference(a, b)}")
+    return problems
+
+
+def compare_case(case: str, excel_path: Path, engine_name: str, tracks) -> Dict:
+    ref_dir = GOLDEN_DIR / case / "reference"
+    cand_dir = GOLDEN_DIR / case / engine_name
+    ref = run_engine(ENGINES["reference"], excel_path, ref_dir, tracks)
+    cand = run_engine(ENGINES[engine_name], excel_path, cand_dir, tracks)
+
+    if ref["error"] or cand["error"]:
+        # Failing the same way is also equivalent behavior
+        same = ref["error"] == cand["error"]
+        problems = (
+            []
+            if same
+            else [f"reference: {ref['error']}", f"candidate: {cand['error']}"]
+        )
+        n_files = 0
+    else:
+        problems = diff_dirs(ref_dir, cand_dir)
+        n_files = sum(1 for p in ref_dir.rglob("*") if p.is_file())
+    return {"files": n_files, "problems": problems, "ref": ref, "cand": cand}
+
+
+def _fmt_time(t: float | None) -> str:
+    return "error" if t is None else f"{t:.3f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Golden-output equivalence harness.")
+    parser.add_argument(
+        "--engine",
+        default="current",
+        choices=[e for e in ENGINES if e != "reference"],
+        help="Engine compared with the reference (default: current)",
+    )
+    parser.add_argument("--sizes", type=int, nargs="*", default=SIZES)
+    parser.add_argument(
+        "--cases",
+        nargs="*",
+        default=list(EDGE_CASES),
+        help=f"Edge cases to run (default: all of {', '.join(EDGE_CASES)})",
+    )
+    args = parser.parse_args(argv)
+
+    unknown = [c for c in args.cases if c not in EDGE_CASES]
+    if unknown:
+        raise SystemExit(f"[ERROR Golden] Unknown case(s): {', '.join(unknown)}")
+
+    tracks = golden_tracks()
+    corpus = prepare_corpus(args.sizes, args.cases, tracks)
+
+    print(
+        f"{'case':<18} {'files':>5} {'result':>8} "
+        f"{'reference (s)':>14} {args.engine + ' (s)':>14} {'speedup':>8}"
+    )
+    n_failed = 0
+    for case, excel_path in corpus.items():
+        r = compare_case(case, excel_path, args.engine, tracks)
+        t_ref, t_cand = r["ref"]["time"], r["cand"]["time"]
+        speedup = f"{t_ref / t_cand:.2f}x" if t_ref and t_cand else "-"
+        result = "FAIL" if r["problems"] else "SAME"
+        print(
+            f"{case:<18} {r['files']:>5} {result:>8} "
+            f"{_fmt_time(t_ref):>14} {_fmt_time(t_cand):>14} {speedup:>8}"
+        )
+        for problem in r["problems"]:
+            print(f"    [DIFF] {problem}")
+        n_failed += bool(r["problems"])
+
+    if n_failed:
+        print(f"\n[ERROR Golden] {n_failed} case(s) differ from the reference.")
+        sys.exit(1)
+    print(f"\n✅ All {len(corpus)} cases are identical to the reference.")
+
+
+if __name__ == "__main__":
+    main()
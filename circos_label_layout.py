@@ -0,0 +1,188 @@
+"""
+================================================================================
+PRECOMPUTED LABEL LAYOUT
+================================================================================
+
+Description:
+This script computes where the text labels of the Circos figure should go, so
+that crowded labels can be moved apart explicitly instead of being drawn on
+top of each other. It is off by default in `main.py` (`PRECOMPUTE_LABELS`),
+and its positions are only written to separate label files: `circos.conf`
+and the track files do not use them until they have been compared with a
+real Circos render.
+
+Key Features:
+1. Same Geometry as Circos: The angle of each label is derived from the
+   karyotype and the spacing rules of `circos.conf` (shared with the preview).
+2. Collision Avoidance (vectorized): Labels are radial, so two neighbours
+   collide when their angular extents (the font height at the label radius)
+   overlap, including across 0/360 degrees. Overlapping neighbours form a
+   run; each run gets the few radial tiers it needs and its labels take them
+   in turn, so that two labels of the same tier never overlap. Labels without
+   any overlap stay on the first tier. All steps are NumPy operations over
+   the whole circle (one pass per tier, none per label). Offsets are capped
+   so that every label ends inside the image radius.
+3. Explicit Positions: Article names and section totals are written as Circos
+   text tracks, with one `rpadding` offset per label.
+
+Output:
+`articles.labels.txt` and `numbers.labels.txt` in the output directory.
+================================================================================
+"""
+
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from circos_conf_builder import IMAGE_RADIUS
+from circos_preview import ideogram_layout, read_karyotype
+
+# Geometry of circos.conf (pixels)
+ARTICLE_LABEL_RADIUS = 760  # dims(ideogram,radius) + 10p
+ARTICLE_LABEL_SIZE = 17
+NUMBER_LABEL_RADIUS = 710
+NUMBER_LABEL_SIZE = 20
+
+N_TIERS = 3  # Number of radial tiers used to separate crowded labels
+CHAR_WIDTH = 0.6  # Approximate glyph width, as a fraction of the font size
+TIER_PADDING = 8  # Pixels between two tiers
+
+ARTICLE_LABELS_FILE = "articles.labels.txt"
+NUMBER_LABELS_FILE = "numbers.labels.txt"
+
+
+def assign_tiers(angles, min_sep, n_tiers=N_TIERS) -> np.ndarray:
+    """
+    Returns the radial tier (0 = innermost) of each label.
+
+    Args:
+        angles (array): Angle of each label (radians).
+        min_sep (float): Angular extent of a label (radians).
+        n_tiers (int): Number of radial tiers.
+    """
+    angles = np.mod(np.asarray(angles, dtype=float), 2 * np.pi)
+    n = angles.size
+    tiers = np.zeros(n, dtype=int)
+    if n == 0:
+        return tiers
+
+    order = np.argsort(angles, kind="stable")
+    sorted_angles = angles[order]
+
+    # Free angle after each label, up to the next one (circular)
+    gaps = np.diff(sorted_angles, append=sorted_angles[0] + 2 * np.pi)
+    if np.all(gaps >= min_sep):
+        return tiers
+
+    # Sweep the circle from the widest gap: no run of overlapping labels then
+    # crosses the start of the sweep (unless the whole circle is crowded)
+    start = (int(np.argmax(gaps)) + 1) % n
+    sweep = np.roll(order, -start)
+    sweep_angles = np.roll(sorted_angles, -start)
+    sweep_angles[n - start :] += 2 * np.pi  # Labels after the wraparound
+
+    # Runs of overlapping neighbours, and the position of each label in its run
+    new_run = np.concatenate(([True], np.diff(sweep_angles) >= min_sep))
+    run_starts = np.flatnonzero(new_run)
+    run_id = np.cumsum(new_run) - 1
+    position = np.arange(n) - run_starts[run_id]
+
+    # Tiers needed by a run: one more than the largest step k such that a label
+    # still overlaps the k-th next one (same run, since the angles are sorted)
+    needed = np.ones(n, dtype=int)
+    for k in range(1, n_tiers):
+        overlaps = sweep_angles[k:] - sweep_angles[:-k] < min_sep
+        needed[:-k][overlaps] = k + 1
+    run_tiers = np.maximum.reduceat(needed, run_starts)
+
+    tiers[sweep] = position % run_tiers[run_id]
+    return tiers
+
+
+def stagger_offsets(
+    angles, lengths, radius, font_size, n_tiers=N_TIERS, max_radius=IMAGE_RADIUS
+):
+    """
+    Returns the radial offset (pixels) of each label.
+
+    Args:
+        angles (array): Angle of each label (radians).
+        lengths (array): Number of characters of each label.
+        radius (float): Radius at which the labels start (pixels).
+        font_size (float): Label size (pixels), i.e. the angular footprint.
+        n_tiers (int): Number of radial tiers.
+        max_radius (float): No label may end beyond this radius (pixels).
+    """
+    tiers = assign_tiers(angles, font_size / radius, n_tiers)
+    if tiers.size == 0 or not tiers.any():
+        return tiers
+
+    widths = np.ceil(np.asarray(lengths, dtype=float) * CHAR_WIDTH * font_size)
+    step = int(widths.max()) + TIER_PADDING
+    room = np.maximum(max_radius - radius - widths, 0)
+    return np.minimum(tiers * step, room).astype(int)
+
+
+def write_label_layout(
+    output_dir, active_tracks, boundary_map, main_article_file="articles.data.txt"
+) -> List[Path]:
+    """
+    Computes the label layout and writes the explicit positions.
+
+    Returns:
+        list: The label files written (none if there is nothing to lay out).
+    """
+    out_dir = Path(output_dir)
+    valid_tracks = [t for t in active_tracks if t.subdir in boundary_map]
+
+    articles = read_karyotype(out_dir / main_article_file)
+    ideograms = list(articles)
+    for t in valid_tracks:
+        ideograms += read_karyotype(out_dir / f"{t.subdir}.data.txt")
+    if not ideograms:
+        return []
+
+    layout = ideogram_layout(ideograms, valid_tracks, boundary_map)
+
+    def mid_angle(chr_id: str, start: float, end: float) -> float:
+        a0, k = layout[chr_id]
+        return a0 + k * (start + end) / 2
+
+    # 1. Article labels (one per article, at the middle of its ideogram)
+    labels = []  # (chr, start, end, text)
+    for chr_id, label, size, _ in articles:
+        mid = size // 2
+        labels.append((chr_id, mid, mid, label))
+
+    # 2. Section totals (all tracks share the same text radius)
+    numbers = []
+    for t in valid_tracks:
+        path = out_dir / f"{t.subdir}.numbers.txt"
+        if not path.exists():
+            continue
+        with path.open(encoding="utf-8") as fr:
+            for line in fr:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) < 4 or parts[0] not in layout:
+                    continue
+                text = parts[3].split(" ")[0]
+                numbers.append((parts[0], parts[1], parts[2], text))
+
+    written = []
+    for file_name, group, radius, font_size in (
+        (ARTICLE_LABELS_FILE, labels, ARTICLE_LABEL_RADIUS, ARTICLE_LABEL_SIZE),
+        (NUMBER_LABELS_FILE, numbers, NUMBER_LABEL_RADIUS, NUMBER_LABEL_SIZE),
+    ):
+        if not group:
+            continue
+        angles = [mid_angle(c, float(a), float(b)) for c, a, b, _ in group]
+        offsets = stagger_offsets(angles, [len(x[3]) for x in group], radius, font_size)
+        path = out_dir / file_name
+        with path.open("w", encoding="utf-8", newline="") as fw:
+            for (chr_id, start, end, text), off in zip(group, offsets):
+                fw.write(f"{chr_id}\t{start}\t{end}\t{text}\trpadding={off}p\n")
+        written.append(path)
+
+    print(f"✅ Label layout computed: {len(labels) + len(numbers)} labels")
+    return written
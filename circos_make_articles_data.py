@@ -23,19 +23,209 @@ Key Features:
    appears before "art10" (standard alphabetical sorting would put "art10" first).
 4. Formatting: Outputs the specific space/tab-separated syntax required by
    Circos to define segments (`chr - ID LABEL START END COLOR`).
+5. Shared Article Index: `ArticleIndex` is built once from the ID column
+   and holds, for every row, the normalized label, the cleaned reference
+   label and the karyotype order, plus the first/last article boundaries
+   and an integer rank per article for the ordering inside tracks.
+   `main.py` builds it once per run and reuses it for the karyotype, the
+   boundaries and every track; no regex runs at sort time.
+6. Column-Wise Processing: Labels, references and sort numbers are computed
+   over whole columns (`art_labels`, `clean_refs`, `art_numbers`, with the
+   same results as the per-value functions), and the karyotype is written
+   in a single write.
 
 Output:
 An `articles.data.txt` file saved in the specified output directory.
 ================================================================================
 """
 
+import numpy as np
 import pandas as pd
 import re
 from pathlib import Path
+from typing import Callable, Dict, List
+
+ART_NUM_RE = re.compile(r"^art(\d+)")
+
+
+def normalize_ref(ref: str) -> str:
+    """Cleans and transforms the reference text."""
+    s = str(ref).strip()
+    if not s:
+        return s
+    # Replace special characters with dashes/underscores for Circos safety
+    # (Though labels can contain spaces, cleaner strings avoid parsing errors)
+    s = re.sub(r"[^\w\.,&]", "-", s)
+    s = re.sub(r"_+", "_", s)
+    return s
+
+
+def art_label_from(raw) -> str:
+    """Standardizes article label to 'artN'."""
+    if raw is None:
+        return ""
+    s = str(raw).strip()
+    if s == "":
+        return ""
+    # Matches 'Art 1', 'art1', '1', etc.
+    m = re.match(r"^[Aa]rt\s*([0-9]+)$", s) or re.match(r"^([0-9]+)$", s)
+    if m:
+        return f"art{m.group(1)}"
+    return s if s.lower().startswith("art") else f"art{s}"
+
+
+def art_number(raw) -> int:
+    """Extracts integer for correct sorting (1, 2, 10 instead of 1, 10, 2)."""
+    s = str(raw).strip()
+    m = re.search(r"(\d+)", s)
+    return int(m.group(1)) if m else 999999
+
+
+# --- Vectorized versions (whole columns, same results as the functions above) ---
+
+
+def _text(values) -> pd.Series:
+    """
+    str(v).strip() of every value (None -> "None", NaN -> "nan"). Kept as
+    object dtype so that `.str` uses Python's `re` (as the functions above),
+    whatever the default string storage of pandas is.
+    """
+    return pd.Series([str(v).strip() for v in values], dtype=object)
+
+
+def art_labels(values) -> pd.Series:
+    """art_label_from over a whole column."""
+    raw = pd.Series(values, dtype=object)
+    s = _text(values)
+    num = s.str.extract(r"^(?:[Aa]rt\s*)?([0-9]+)$", expand=False)
+    labels = s.where(s.str.lower().str.startswith("art"), "art" + s)
+    labels = labels.mask(num.notna(), "art" + num)
+    # None and blank cells have no label (NaN keeps its 'artnan' label)
+    return labels.mask((s == "") | (raw.isna() & (s == "None")), "")
+
+
+def clean_refs(values) -> pd.Series:
+    """
+    normalize_ref over a whole column. The texts are joined with NUL (which
+    Excel cells cannot hold) so that each regex runs once over the column.
+    """
+    texts = _text(values)
+    joined = "\0".join(texts)
+    if joined.count("\0") != len(texts) - 1:  # A text holds NUL: row by row
+        return texts.str.replace(r"[^\w\.,&]", "-", regex=True).str.replace(
+            r"_+", "_", regex=True
+        )
+    joined = re.sub(r"_+", "_", re.sub(r"[^\w\.,&\0]", "-", joined))
+    return pd.Series(joined.split("\0"), dtype=object)
+
+
+def art_numbers(values) -> np.ndarray:
+    """art_number over a whole column, as int64 sort keys."""
+    num = _text(values).str.extract(r"(\d+)", expand=False)
+    return np.array(num.map(int, na_action="ignore").fillna(999999), dtype=np.int64)
+
+
+def track_sort_key(label: str):
+    """Order inside a track section: numeric article IDs first, in numeric order."""
+    m = ART_NUM_RE.match(label)
+    return (0, int(m.group(1))) if m else (1, label.lower())
+
+
+def boundary_key(label: str) -> int:
+    """Order of the article boundaries (non-numeric IDs count as 0)."""
+    m = ART_NUM_RE.match(label)
+    return int(m.group(1)) if m else 0
+
+
+def boundary_keys(labels) -> np.ndarray:
+    """boundary_key over a whole column of labels, as int64 keys."""
+    num = pd.Series(labels, dtype=object).str.extract(r"^art(\d+)", expand=False)
+    return np.array(num.map(int, na_action="ignore").fillna(0), dtype=np.int64)
+
+
+def row_values(df: pd.DataFrame, col: str) -> np.ndarray:
+    """
+    Values of a column as `iterrows` returns them, i.e. converted to the
+    common dtype of the rows (in an all-numeric sheet, 12 becomes 12.0).
+    """
+    return df[col].to_numpy(dtype=df.iloc[:0].to_numpy().dtype)
+
+
+def map_distinct(values, func: Callable) -> list:
+    """
+    Applies func once per distinct value. Keys include the type, so that
+    0, 0.0 and False (equal for Python) are still told apart.
+    """
+    cache = {}
+    out = []
+    for v in values:
+        # All float NaNs share one key (NaN != NaN)
+        key = (v.__class__, None if isinstance(v, float) and v != v else v)
+        res = cache.get(key)
+        if res is None:
+            res = cache[key] = func(v)
+        out.append(res)
+    return out
+
+
+class ArticleIndex:
+    """
+    Articles of the main sheet, built once from the ID column (`col_art`).
+
+    Per row: `labels` (normalized 'artN', "" if empty) and `refs` (cleaned
+    reference label). `order` lists the rows in karyotype order, `first` /
+    `last` are the article boundaries and `rank` maps every label to an
+    integer giving its order inside a track section (equal IDs share a rank).
+    """
+
+    def __init__(self, df: pd.DataFrame, col_art: str, col_ref: str = "ref"):
+        n = len(df)
+        self.has_art_column = col_art in df.columns
+        self.has_ref_column = col_ref in df.columns
+        self.labels: List[str] = [""] * n
+        self.refs: List[str] = [""] * n
+        self.order: List[int] = list(range(n))
+        self.rank: Dict[str, int] = {}
+        self.first = self.last = None
+        if not self.has_art_column:
+            return
+
+        self.labels = art_labels(row_values(df, col_art)).tolist()
+        ref_col = col_ref if self.has_ref_column else col_art
+        self.refs = clean_refs(row_values(df, ref_col)).tolist()
+
+        # Karyotype: numeric sort of the raw IDs (same algorithm as sort_values)
+        nums = art_numbers(df[col_art].tolist())
+        self.order = np.argsort(nums, kind="quicksort").tolist()
+
+        # Tracks: one integer rank per distinct label
+        keys = {label: track_sort_key(label) for label in self.labels if label}
+        prev, rank = None, -1
+        for label in sorted(keys, key=keys.get):
+            if keys[label] != prev:
+                prev, rank = keys[label], rank + 1
+            self.rank[label] = rank
+
+        # Boundaries: first article of the smallest number, last article of
+        # the largest (non-numeric IDs count as 0). Labels are read from the
+        # column itself, as the original reading did: in an all-numeric sheet
+        # they are 'art12', where the rows give 'art12.0'.
+        col_labels = art_labels(df[col_art].tolist()).to_numpy()
+        col_labels = col_labels[col_labels != ""]
+        if col_labels.size:
+            bkeys = boundary_keys(col_labels)
+            self.first = col_labels[np.argmin(bkeys)]
+            self.last = col_labels[::-1][np.argmax(bkeys[::-1])]
 
 
 def generate_articles_karyotype(
-    excel_path, sheet_idx, output_dir, col_art, col_ref="ref", end_value=100
+    excel_path,
+    sheet_idx,
+    output_dir,
+    col_art,
+    col_ref="ref",
+    end_value=100,
+    index: ArticleIndex | None = None,
 ):
     """
     Generates the articles.data.txt (Karyotype) file from the Excel data.
@@ -47,83 +237,49 @@ def generate_articles_karyotype(
         col_art (str): Name of the Article ID column (e.g., 'ArtNb').
         col_ref (str): Name of the Reference column (e.g., 'ref').
         end_value (int): Visual size for each article segment (default: 100).
+        index (ArticleIndex): Article index already built from the sheet
+            (optional, the Excel file is read when it is not given).
     """
 
-    # --- Internal Helper Functions ---
-    def normalize_ref(ref: str) -> str:
-        """Cleans and transforms the reference text."""
-        s = str(ref).strip()
-        if not s:
-            return s
-        # Replace special characters with dashes/underscores for Circos safety
-        # (Though labels can contain spaces, cleaner strings avoid parsing errors)
-        s = re.sub(r"[^\w\.,&]", "-", s)
-        s = re.sub(r"_+", "_", s)
-        return s
-
-    def art_label_from(raw) -> str:
-        """Standardizes article label to 'artN'."""
-        if raw is None:
-            return ""
-        s = str(raw).strip()
-        if s == "":
-            return ""
-        # Matches 'Art 1', 'art1', '1', etc.
-        m = re.match(r"^[Aa]rt\s*([0-9]+)$", s) or re.match(r"^([0-9]+)$", s)
-        if m:
-            return f"art{m.group(1)}"
-        return s if s.lower().startswith("art") else f"art{s}"
-
-    def art_number(raw) -> int:
-        """Extracts integer for correct sorting (1, 2, 10 instead of 1, 10, 2)."""
-        s = str(raw).strip()
-        m = re.search(r"(\d+)", s)
-        return int(m.group(1)) if m else 999999
-
     # --- Main Logic ---
-    try:
-        df = pd.read_excel(excel_path, sheet_name=sheet_idx, engine="openpyxl")
-    except Exception as e:
-        print(f"[ERROR Articles] Cannot read Excel file: {e}")
-        return
+    if index is None:
+        try:
+            df = pd.read_excel(excel_path, sheet_name=sheet_idx, engine="openpyxl")
+        except Exception as e:
+            print(f"[ERROR Articles] Cannot read Excel file: {e}")
+            return
+        index = ArticleIndex(df, col_art, col_ref)
 
     # Check columns
-    if col_art not in df.columns:
+    if not index.has_art_column:
         print(f"[ERROR Articles] Column '{col_art}' not found in the Excel sheet.")
         return
 
-    if col_ref not in df.columns:
+    if not index.has_ref_column:
         print(
             f"[WARN Articles] Column '{col_ref}' not found. Using '{col_art}' as the label fallback."
         )
-        col_ref = col_art  # Fallback
-
-    # Sorting
-    # Create a temporary column to sort numerically
-    df["__num__"] = df[col_art].apply(art_number)
-    df = df.sort_values("__num__").drop(columns="__num__")
 
-    # Writing
+    # Writing (rows in numeric order of their IDs, see ArticleIndex)
     out_path = Path(output_dir) / "articles.data.txt"
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    count = 0
-    with out_path.open("w", encoding="utf-8", newline="") as fw:
-        for _, row in df.iterrows():
-            art_label = art_label_from(row.get(col_art))
-            ref_label = normalize_ref(row.get(col_ref, ""))
-
-            if not art_label:
-                continue
+    # Format: chr - art1 Label 0 100 black
+    # 'chr' indicates this is a chromosome definition in Circos
+    # '-' represents the parent (none here)
+    # art_label is the internal ID used for linking ribbons
+    # ref_label is the text visually displayed around the perimeter
+    labels, refs = index.labels, index.refs
+    lines = [
+        f"chr -\t{labels[i]}\t{refs[i]}\t0\t{end_value}\tblack\n"
+        for i in index.order
+        if labels[i]
+    ]
 
-            # Format: chr - art1 Label 0 100 black
-            # 'chr' indicates this is a chromosome definition in Circos
-            # '-' represents the parent (none here)
-            # art_label is the internal ID used for linking ribbons
-            # ref_label is the text visually displayed around the perimeter
-            fw.write(f"chr -\t{art_label}\t{ref_label}\t0\t{end_value}\tblack\n")
-            count += 1
+    # One write for the whole file (no CSV quoting: labels are written as is)
+    with out_path.open("w", encoding="utf-8", newline="") as fw:
+        fw.write("".join(lines))
 
     print(
-        f"✅ Articles file successfully generated: {out_path} ({count} articles processed)"
+        f"✅ Articles file successfully generated: {out_path} ({len(lines)} articles processed)"
     )
@@ -0,0 +1,312 @@
+"""
+================================================================================
+RUN METRICS (TIMING SPANS & COUNTERS)
+================================================================================
+
+Description:
+This script provides the instrumentation used by `main.py` to tell where the
+time of a run goes (Excel parsing, bucketing, sorting, file writing...) on a
+given dataset, instead of guessing from the phase banners.
+
+Key Features:
+1. Nested Timing Spans: `with METRICS.span("name"):` times a block of code.
+   Spans opened inside another span become its children, so a run is
+   recorded as a tree (Phase 2 > track > populate / sort / scale / write).
+   A span costs two `perf_counter` calls: it is always on.
+2. Counters: `METRICS.record(group, key=value, ...)` stores numbers per group
+   (e.g., rows read, links written and bytes written per track).
+3. Reports: An indented summary in the console (seconds and share of the
+   total run) and a JSON file with the span tree and the counters.
+4. Memory Mode (`start_memory()`, off by default): `tracemalloc` traces every
+   allocation. Each span then also records the peak of traced memory while it
+   ran and the memory it left behind. `snapshot(label)` (automatic at the end
+   of spans opened with `snapshot=True`) keeps the top allocation sites of
+   the live memory, and `retained(group, name=obj, ...)` records the deep
+   size of large structures (DataFrames, buckets of strings, error lists).
+   The memory used by the measurements themselves is excluded from the peaks.
+5. Resident Memory Mode (`start_rss()`, Linux only, off by default): each
+   span also records the peak resident set size (RSS) of the process while
+   it ran. The kernel high-water mark (`VmHWM`) is read and reset at every
+   span boundary (`/proc/self/clear_refs`), so the peak of a phase is not
+   hidden by an earlier, larger one. Unlike the memory mode, it does not slow
+   the run down (one small file read and write per span boundary).
+
+Output:
+A `run_metrics.json` file (written by `main.py`) and a console summary.
+================================================================================
+"""
+
+import contextlib
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+TOP_SITES = 10  # Allocation sites kept per snapshot
+
+
+@dataclass
+class Span:
+    name: str
+    seconds: float = 0.0
+    children: List["Span"] = field(default_factory=list)
+    peak_bytes: int | None = None  # Memory mode only
+    delta_bytes: int | None = None
+    peak_rss_bytes: int | None = None  # Resident memory mode only
+
+    def to_dict(self) -> Dict:
+        d = {"name": self.name, "seconds": round(self.seconds, 6)}
+        if self.peak_bytes is not None:
+            d["peak_bytes"] = self.peak_bytes
+            d["delta_bytes"] = self.delta_bytes
+        if self.peak_rss_bytes is not None:
+            d["peak_rss_bytes"] = self.peak_rss_bytes
+        if self.children:
+            d["children"] = [c.to_dict() for c in self.children]
+        return d
+
+
+def deep_size(obj, seen: set | None = None) -> int:
+    """Approximate retained size of an object and of everything it holds."""
+    if hasattr(obj, "memory_usage"):  # pandas DataFrame / Series
+        return int(obj.memory_usage(deep=True).sum())
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(x, seen) for x in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def _rss_high_water() -> int:
+    """Peak resident memory of the process since the last reset (bytes)."""
+    with open("/proc/self/status", encoding="ascii") as fr:
+        for line in fr:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    raise OSError("VmHWM not reported")
+
+
+def _reset_rss_high_water() -> None:
+    with open("/proc/self/clear_refs", "w", encoding="ascii") as fw:
+        fw.write("5")  # Resets VmHWM to the current RSS
+
+
+def _site(trace: tracemalloc.Statistic) -> str:
+    frame = trace.traceback[0]
+    return f"{'/'.join(Path(frame.filename).parts[-2:])}:{frame.lineno}"
+
+
+class RunMetrics:
+    """Tree of timing spans and per-group counters of one run."""
+
+    def __init__(self):
+        self.memory = False
+        self.rss = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.root = Span("run")
+        self.counters: Dict[str, Dict] = {}
+        self.snapshots: Dict[str, List[Dict]] = {}
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self._stack = [self.root]
+        # Memory mode: [traced memory at span start, peak seen] per open span
+        self._mem = [[self._traced(), 0]]
+        # Resident memory mode: [peak RSS seen] per open span
+        self._rss = [[0]]
+        if self.rss:
+            _reset_rss_high_water()
+
+    # --- Memory mode ---
+
+    def start_memory(self, frames: int = 1) -> None:
+        """Starts tracing allocations (slows the run down, use for reports)."""
+        tracemalloc.start(frames)
+        self.memory = True
+        self._mem = [[self._traced(), 0]]
+
+    def stop_memory(self) -> None:
+        self._fold_peak()
+        self.root.peak_bytes = self._mem[0][1]
+        self.memory = False
+        tracemalloc.stop()
+
+    def start_rss(self) -> bool:
+        """Starts recording the peak RSS of each span (False if unavailable)."""
+        try:
+            _reset_rss_high_water()
+            _rss_high_water()
+        except OSError:
+            return False
+        self.rss = True
+        self._rss = [[0]]
+        return True
+
+    def stop_rss(self) -> None:
+        self._fold_rss()
+        self.root.peak_rss_bytes = self._rss[0][0]
+        self.rss = False
+
+    def _fold_rss(self) -> None:
+        """Adds the RSS peak since the last reset to every open span, then resets."""
+        peak = _rss_high_water()
+        for frame in self._rss:
+            frame[0] = max(frame[0], peak)
+        _reset_rss_high_water()
+
+    def _traced(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.memory else 0
+
+    def _fold_peak(self) -> None:
+        """Adds the peak since the last reset to every open span, then resets."""
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._mem:
+            frame[1] = max(frame[1], peak)
+        tracemalloc.reset_peak()
+
+    def snapshot(self, label: str) -> None:
+        """Keeps the top allocation sites of the memory alive right now."""
+        if not self.memory:
+            return
+        self._fold_peak()
+        snap = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            ]
+        )
+        self.snapshots[label] = [
+            {"site": _site(st), "bytes": st.size, "blocks": st.count}
+            for st in snap.statistics("lineno")[:TOP_SITES]
+        ]
+        del snap
+        tracemalloc.reset_peak()  # The snapshot itself is not part of the run
+
+    def retained(self, group: str, **objects) -> None:
+        """Records the deep size of large structures (memory mode only)."""
+        if not self.memory:
+            return
+        self._fold_peak()
+        sizes = {name: deep_size(obj) for name, obj in objects.items()}
+        self.counters.setdefault(group, {}).setdefault("retained_bytes", {})
+        self.counters[group]["retained_bytes"].update(sizes)
+        tracemalloc.reset_peak()
+
+    # --- Spans & counters ---
+
+    @contextlib.contextmanager
+    def span(self, name: str, snapshot: bool = False):
+        """
+        Times the enclosed block as a child of the current span. With
+        snapshot=True, the top allocation sites are kept at its end.
+        """
+        s = Span(name)
+        self._stack[-1].children.append(s)
+        self._stack.append(s)
+        if self.memory:
+            self._fold_peak()
+            self._mem.append([self._traced(), 0])
+        if self.rss:
+            self._fold_rss()
+            self._rss.append([0])
+        t0 = time.perf_counter()
+        try:
+            yield s
+        finally:
+            s.seconds = time.perf_counter() - t0
+            if self.memory:
+                if snapshot:
+                    self.snapshot(name)
+                self._fold_peak()
+                start, s.peak_bytes = self._mem.pop()
+                s.delta_bytes = self._traced() - start
+            if self.rss:
+                self._fold_rss()
+                (s.peak_rss_bytes,) = self._rss.pop()
+            self._stack.pop()
+
+    def record(self, group: str, **values) -> None:
+        """Stores counters under a group (e.g. a track subdir)."""
+        self.counters.setdefault(group, {}).update(values)
+
+    def total(self) -> float:
+        return sum(c.seconds for c in self.root.children)
+
+    def to_dict(self) -> Dict:
+        self.root.seconds = self.total()
+        d = {
+            "started": self.started,
+            "total_seconds": round(self.root.seconds, 6),
+            "spans": self.root.to_dict().get("children", []),
+            "counters": self.counters,
+        }
+        if self.root.peak_bytes is not None:
+            d["peak_bytes"] = self.root.peak_bytes
+            d["top_sites"] = self.snapshots
+        if self.root.peak_rss_bytes is not None:
+            d["peak_rss_bytes"] = self.root.peak_rss_bytes
+        return d
+
+    def write_json(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as fw:
+            json.dump(self.to_dict(), fw, indent=2)
+        return path
+
+    def print_summary(self) -> None:
+        total = self.total() or 1e-12
+        memory = self.root.peak_bytes is not None
+
+        def walk(span: Span, depth: int):
+            label = "  " * depth + span.name
+            share = 100 * span.seconds / total
+            line = f"{label:<44} {span.seconds:>9.3f} s {share:>6.1f}%"
+            if memory and span.peak_bytes is not None:
+                line += (
+                    f" {_mb(span.peak_bytes):>10.1f} {_mb(span.delta_bytes):>+10.1f}"
+                )
+            print(line)
+            for child in span.children:
+                walk(child, depth + 1)
+
+        header = f"{'span':<44} {'time':>11} {'share':>7}"
+        if memory:
+            header += f" {'peak MB':>10} {'left MB':>10}"
+        print(header)
+        for child in self.root.children:
+            walk(child, 0)
+
+        if not memory:
+            return
+        print(f"\nPeak traced memory of the run: {_mb(self.root.peak_bytes):.1f} MB")
+        for group, values in self.counters.items():
+            if "retained_bytes" in values:
+                sizes = ", ".join(
+                    f"{k} {_mb(v):.1f} MB" for k, v in values["retained_bytes"].items()
+                )
+                print(f"Retained ({group}): {sizes}")
+        for label, sites in self.snapshots.items():
+            print(f"\nTop allocation sites ({label}):")
+            for site in sites[:5]:
+                print(
+                    f"  {_mb(site['bytes']):>8.1f} MB {site['blocks']:>9} blocks  {site['site']}"
+                )
+
+
+def _mb(n: int) -> float:
+    return n / (1024 * 1024)
@@ -0,0 +1,234 @@
+"""
+================================================================================
+HOT-PATH MICRO-BENCHMARKS
+================================================================================
+
+Description:
+This script measures the functions that run once per Excel cell, per link
+line or per BibTeX entry. On large sheets they dominate the run time, so any
+optimization of these functions should be proven here first (time per call
+and memory allocated per call), before and after the change.
+
+Key Features:
+1. Realistic Inputs: Each function is fed a fixed mix of the values found in
+   the real data: integers, floats read by pandas (12.0), "Art 12", "???",
+   "n/a", comma decimals ("0,0"), article labels, short references with
+   accents and punctuation, BibTeX entries with nested braces and LaTeX
+   accents. The mix is generated from a fixed seed, so runs are comparable.
+2. Timing: Best of `REPEAT` runs over the full mix, reported in ns/call.
+3. Allocations: The same mix is run once under `tracemalloc`; the peak of
+   memory allocated during the run is reported in bytes/call.
+
+Functions measured:
+- main.py: `as_art_label`, `is_zero_like`, `classify_cell`
+- circos_make_articles_data.py: `normalize_ref`, `art_label_from`,
+  `track_sort_key`
+- circos_extract_name_bibfile.py: `parse_fields`, `display_surname`
+
+Usage:
+    python circos_microbench.py                  # all functions
+    python circos_microbench.py is_zero_like classify_cell --json micro.json
+
+Output:
+A table in the console (and optionally a JSON file).
+================================================================================
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import circos_extract_name_bibfile as bib
+from circos_make_articles_data import art_label_from, normalize_ref, track_sort_key
+from main import as_art_label, classify_cell, is_zero_like
+
+# =================
+# TO CUSTOMIZE:
+# =================
+N_VALUES = 10_000  # Size of the input mix of each function
+REPEAT = 5  # Timing runs (the best one is kept)
+SEED = 0
+
+# =================================
+# Nothing to modify below this line
+# =================================
+
+SURNAMES = ["Smith", "Lee", 'M{\\"u}ller', "Garc{\\'i}a", "{de la Cruz}", "O'Neil"]
+
+
+def _mix(rng: random.Random, choices: List[Tuple[float, Callable]]) -> List:
+    """Draws N_VALUES values; choices are (weight, generator(rng)) pairs."""
+    weights = [w for w, _ in choices]
+    gens = [g for _, g in choices]
+    return [rng.choices(gens, weights)[0](rng) for _ in range(N_VALUES)]
+
+
+def art_id_values(rng: random.Random) -> List:
+    """Content of the ArtNb column, as returned by pandas."""
+    return _mix(
+        rng,
+        [
+            (0.35, lambda r: r.randint(1, 500)),
+            (0.15, lambda r: float(r.randint(1, 500))),
+            (0.25, lambda r: f"Art {r.randint(1, 500)}"),
+            (0.10, lambda r: f"art{r.randint(1, 500)}"),
+            (0.05, lambda r: str(r.randint(1, 500))),
+            (0.05, lambda r: None),
+            (0.05, lambda r: r.choice(["", " ", "Art 12b", "review"])),
+        ],
+    )
+
+
+def cell_values(rng: random.Random) -> List:
+    """Content of the section columns, as returned by pandas."""
+    return _mix(
+        rng,
+        [
+            (0.30, lambda r: r.choice([0, 1])),
+            (0.20, lambda r: r.choice([0.0, 1.0])),
+            (0.15, lambda r: r.choice(["0", "1", "x", "yes"])),
+            (0.10, lambda r: r.choice(["0,0", "1,0", "0.0"])),
+            (0.10, lambda r: "???"),
+            (0.10, lambda r: r.choice(["n/a", "NA", "-", " "])),
+            (0.05, lambda r: None),
+        ],
+    )
+
+
+def art_labels(rng: random.Random) -> List[str]:
+    """Normalized article labels, ranked once per run by track_sort_key."""
+    return _mix(
+        rng,
+        [
+            (0.90, lambda r: f"art{r.randint(1, 500)}"),
+            (0.05, lambda r: f"art{r.randint(1, 50)}b"),
+            (0.05, lambda r: r.choice(["artreview", "artArt 12x", "art12.0"])),
+        ],
+    )
+
+
+def ref_values(rng: random.Random) -> List:
+    """Content of the ref column."""
+    return _mix(
+        rng,
+        [
+            (0.5, lambda r: f"Smith et al. {r.randint(1990, 2024)}"),
+            (0.2, lambda r: f"Müller & Lee {r.randint(1990, 2024)}a"),
+            (0.2, lambda r: f"O'Neil (de la Cruz) {r.randint(1990, 2024)}"),
+            (0.1, lambda r: r.choice(["", None, 12.0])),
+        ],
+    )
+
+
+def bib_blocks(rng: random.Random) -> List[str]:
+    """Raw BibTeX entries, with nested braces and LaTeX accents."""
+
+    def block(r: random.Random) -> str:
+        authors = " and ".join(
+            f"{r.choice(SURNAMES)}, {chr(65 + r.randrange(26))}."
+            for _ in range(r.randint(1, 6))
+        )
+        return (
+            f"@article{{key{r.randint(1, 10**6)},\n"
+            f"  title = {{{{Gait}} in {{CP}}: a {{{{nested}} {{braces}}}} study}},\n"
+            f"  author = {{{authors}}},\n"
+            f'  journal = "Gait {{\\&}} Posture",\n'
+            f"  year = {r.randint(1990, 2024)},\n"
+            f"  abstract = {{Walking at {{{r.randint(1, 9)}}} km/h, GMFCS I--III.}},\n"
+            f"}}"
+        )
+
+    return [block(rng) for _ in range(N_VALUES)]
+
+
+def author_values(rng: random.Random) -> List[str]:
+    """Single authors as split by split_authors (LaTeX already decoded)."""
+    return _mix(
+        rng,
+        [
+            (0.6, lambda r: f"{r.choice(SURNAMES)}, {chr(65 + r.randrange(26))}."),
+            (0.3, lambda r: f"{chr(65 + r.randrange(26))}. {r.choice(SURNAMES)}"),
+            (0.1, lambda r: bib.decode_latex(f"{r.choice(SURNAMES)}, J.-P.")),
+        ],
+    )
+
+
+BENCHMARKS: Dict[str, Tuple[Callable, Callable]] = {
+    "as_art_label": (as_art_label, art_id_values),
+    "is_zero_like": (is_zero_like, cell_values),
+    "classify_cell": (classify_cell, cell_values),
+    "normalize_ref": (normalize_ref, ref_values),
+    "art_label_from": (art_label_from, art_id_values),
+    "track_sort_key": (track_sort_key, art_labels),
+    "parse_fields": (bib.parse_fields, bib_blocks),
+    "display_surname": (bib.display_surname, author_values),
+}
+
+
+def measure(func: Callable, values: List) -> Dict[str, float]:
+    """Returns ns/call (best of REPEAT) and peak bytes allocated per call."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter_ns()
+        for v in values:
+            func(v)
+        best = min(best, time.perf_counter_ns() - t0)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    results = [func(v) for v in values]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+
+    n = len(values)
+    return {
+        "ns_per_call": round(best / n, 1),
+        "bytes_per_call": round((peak - base) / n, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks the hot functions.")
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help=f"Functions to measure (default: all of {', '.join(BENCHMARKS)})",
+    )
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"[ERROR Micro] Unknown function(s): {', '.join(unknown)}")
+
+    results = {}
+    print(f"{'function':<18} {'ns/call':>10} {'bytes/call':>11}")
+    for name in args.names or BENCHMARKS:
+        func, make_values = BENCHMARKS[name]
+        values = make_values(random.Random(SEED))
+        results[name] = measure(func, values)
+        r = results[name]
+        print(f"{name:<18} {r['ns_per_call']:>10.1f} {r['bytes_per_call']:>11.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fw:
+            json.dump(
+                {
+                    "n_values": N_VALUES,
+                    "repeat": REPEAT,
+                    "seed": SEED,
+                    "results": results,
+                },
+                fw,
+                indent=2,
+            )
+        print(f"📄 Results written to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
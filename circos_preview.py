@@ -0,0 +1,303 @@
+"""
+================================================================================
+FAST SVG PREVIEW RENDERER
+================================================================================
+
+Description:
+This script draws an approximate version of the Circos figure directly in
+Python, without starting the Perl engine. It is meant for quick iterations on
+the track colors, the track order or `VISUAL_MIN_SIZE`/`VISUAL_MAX_SIZE`: the
+preview is produced in a fraction of a second, even for hundreds of articles,
+and the full-quality Circos render is only needed once the layout is settled.
+
+Key Features:
+1. Same Inputs as Circos: Reads the karyotype (`articles.data.txt` and every
+   `*.data.txt`), the section totals (`*.numbers.txt`) and the links
+   (`*.links.txt`) written by the pipeline, and the same pairwise spacing
+   rules as `circos_conf_builder.py`.
+2. Same Geometry: Counterclockwise layout starting at the top, default spacing
+   of 0.003 of the total length, 5x larger gaps between blocks, and the
+   `chromosomes_scale` rules read from the generated `circos.conf` (regexes
+   are searched anywhere in the ideogram id, as Circos does).
+3. Approximate Drawing: Ideograms as annular sectors, radial labels, section
+   totals, and links as quadratic bezier ribbons through the center.
+
+Output:
+A `preview.svg` file saved in the specified output directory.
+================================================================================
+"""
+
+import math
+import re
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from circos_conf_builder import CHROMOSOMES_SCALE, spacing_pairs
+
+# Geometry (pixels)
+IMAGE_SIZE = 1200
+IDEOGRAM_RADIUS = 380
+IDEOGRAM_THICKNESS = 18
+LINK_RADIUS = IDEOGRAM_RADIUS - 6
+LABEL_RADIUS = IDEOGRAM_RADIUS + IDEOGRAM_THICKNESS + 6
+NUMBER_RADIUS = IDEOGRAM_RADIUS + IDEOGRAM_THICKNESS + 4
+
+# Same rules as circos.conf
+DEFAULT_SPACING = 0.003  # Fraction of the total ideogram length
+PAIRWISE_SPACING = 5  # Multiple of the default spacing
+
+SCALE_RE = re.compile(r"^\s*chromosomes_scale\s*=\s*(.+?)\s*$")
+
+
+def _svg_color(color: str) -> str:
+    """'120,0,0' -> 'rgb(120,0,0)'; named colors are kept as is."""
+    return f"rgb({color})" if "," in color else color
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def read_karyotype(path: Path) -> List[Tuple[str, str, int, str]]:
+    """Reads 'chr - ID LABEL START END COLOR' lines -> (id, label, size, color)."""
+    chrs = []
+    if not path.exists():
+        return chrs
+    with path.open(encoding="utf-8") as fr:
+        for line in fr:
+            # Tab-separated after "chr -": IDs and labels may contain spaces
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 6 or parts[0].split() != ["chr", "-"]:
+                continue
+            start, end = int(parts[3]), int(parts[4])
+            chrs.append((parts[1], parts[2], end - start, parts[5]))
+    return chrs
+
+
+def read_links(path: Path) -> List[Tuple[str, int, int, str, int, int, str]]:
+    """Reads the ribbons of a .links.txt file (comments and errors are skipped)."""
+    links = []
+    if not path.exists():
+        return links
+    with path.open(encoding="utf-8") as fr:
+        for line in fr:
+            if line.startswith("#"):
+                continue
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 7 or not parts[6].startswith("color="):
+                continue
+            links.append(
+                (
+                    parts[0],
+                    int(parts[1]),
+                    int(parts[2]),
+                    parts[3],
+                    int(parts[4]),
+                    int(parts[5]),
+                    parts[6][len("color=") :],
+                )
+            )
+    return links
+
+
+def read_numbers(path: Path) -> Dict[str, str]:
+    """Reads the section totals of a .numbers.txt file -> {tlabel: text}."""
+    numbers = {}
+    if not path.exists():
+        return numbers
+    with path.open(encoding="utf-8") as fr:
+        for line in fr:
+            parts = line.split()
+            if len(parts) >= 4:
+                numbers[parts[0]] = parts[3]
+    return numbers
+
+
+def parse_chromosomes_scale(value: str) -> List[Tuple[re.Pattern, float]]:
+    """
+    Parses a chromosomes_scale value ('/art/:0.85,hs1=0.5') into (pattern,
+    factor) rules. '/regex/' entries are searched anywhere in the id, plain
+    ids must match exactly; relative factors ('rn') are ignored.
+    """
+    rules = []
+    for entry in value.split(","):
+        name, sep, factor = entry.strip().rpartition(":")
+        if not sep:
+            name, _, factor = entry.strip().rpartition("=")
+        try:
+            factor = float(factor)
+        except ValueError:
+            continue
+        if len(name) > 1 and name.startswith("/") and name.endswith("/"):
+            rules.append((re.compile(name[1:-1]), factor))
+        elif name:
+            rules.append((re.compile(f"^{re.escape(name)}$"), factor))
+    return rules
+
+
+def read_chromosomes_scale(conf_path: Path) -> List[Tuple[re.Pattern, float]]:
+    """Scale rules of a generated circos.conf (CHROMOSOMES_SCALE if absent)."""
+    if conf_path.exists():
+        with conf_path.open(encoding="utf-8") as fr:
+            for line in fr:
+                m = SCALE_RE.match(line)
+                if m:
+                    return parse_chromosomes_scale(m.group(1))
+    return parse_chromosomes_scale(CHROMOSOMES_SCALE)
+
+
+def ideogram_scale(chr_id: str, rules) -> float:
+    """Scale factor of an ideogram (the last matching rule wins)."""
+    scale = 1.0
+    for pattern, factor in rules:
+        if pattern.search(chr_id):
+            scale = factor
+    return scale
+
+
+def ideogram_layout(
+    ideograms, valid_tracks, boundary_map, scale_rules=None
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Computes the angular position of each ideogram, counterclockwise from the
+    top, with the same spacing and scaling rules as circos.conf.
+
+    Returns:
+        dict: chr id -> (start angle in radians, radians per data unit).
+    """
+    if scale_rules is None:
+        scale_rules = parse_chromosomes_scale(CHROMOSOMES_SCALE)
+    lengths = [
+        size * ideogram_scale(chr_id, scale_rules) for chr_id, _, size, _ in ideograms
+    ]
+    total_len = sum(lengths)
+    default_gap = DEFAULT_SPACING * total_len
+    wide = {
+        (cur["end"], nxt["start"])
+        for cur, nxt in spacing_pairs(valid_tracks, boundary_map)
+    }
+    n = len(ideograms)
+    gaps = [
+        default_gap
+        * (
+            PAIRWISE_SPACING
+            if (ideograms[i][0], ideograms[(i + 1) % n][0]) in wide
+            else 1
+        )
+        for i in range(n)
+    ]
+    rad_per_unit = 2 * math.pi / (total_len + sum(gaps))
+
+    layout: Dict[str, Tuple[float, float]] = {}
+    pos = 0.0
+    for (chr_id, _, size, _), length, gap in zip(ideograms, lengths, gaps):
+        layout[chr_id] = (pos * rad_per_unit, rad_per_unit * length / max(size, 1))
+        pos += length + gap
+    return layout
+
+
+def generate_preview_svg(
+    output_dir,
+    active_tracks,
+    boundary_map,
+    main_article_file="articles.data.txt",
+    out_name="preview.svg",
+    conf_name="circos.conf",
+):
+    """
+    Draws an approximate Circos figure from the files generated by the pipeline.
+
+    Args:
+        output_dir (str): Output directory (where the Circos files are).
+        active_tracks (list): TrackConfig objects, in display order.
+        boundary_map (dict): First/last labels of each block (see main.py).
+        main_article_file (str): Articles karyotype file name.
+        out_name (str): Name of the SVG file to write.
+        conf_name (str): Generated configuration (for chromosomes_scale).
+    """
+    out_dir = Path(output_dir)
+    valid_tracks = [t for t in active_tracks if t.subdir in boundary_map]
+
+    # 1. Karyotype (same order as in circos.conf)
+    ideograms = read_karyotype(out_dir / main_article_file)
+    numbers: Dict[str, str] = {}
+    links = []
+    for t in valid_tracks:
+        ideograms += read_karyotype(out_dir / f"{t.subdir}.data.txt")
+        numbers.update(read_numbers(out_dir / f"{t.subdir}.numbers.txt"))
+        links += read_links(out_dir / f"{t.subdir}.links.txt")
+
+    if not ideograms:
+        print(f"[WARN Preview] No karyotype found in {out_dir}")
+        return
+
+    # 2. Angular layout (counterclockwise from the top)
+    scale_rules = read_chromosomes_scale(out_dir / conf_name)
+    layout = ideogram_layout(ideograms, valid_tracks, boundary_map, scale_rules)
+    n = len(ideograms)
+
+    c = IMAGE_SIZE / 2
+
+    def pt(r: float, a: float) -> str:
+        return f"{c - r * math.sin(a):.1f},{c - r * math.cos(a):.1f}"
+
+    def angle(chr_id: str, x: float) -> float:
+        a0, k = layout[chr_id]
+        return a0 + x * k
+
+    # 3. Drawing
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{IMAGE_SIZE}" '
+        f'height="{IMAGE_SIZE}" viewBox="0 0 {IMAGE_SIZE} {IMAGE_SIZE}">',
+        f'<rect width="{IMAGE_SIZE}" height="{IMAGE_SIZE}" fill="white"/>',
+        '<g fill-opacity="0.35" stroke="none">',
+    ]
+
+    r = LINK_RADIUS
+    for art, s1, e1, tlabel, s2, e2, color in links:
+        if art not in layout or tlabel not in layout:
+            continue
+        a1, b1 = angle(art, s1), angle(art, e1)
+        a2, b2 = angle(tlabel, s2), angle(tlabel, e2)
+        out.append(
+            f'<path d="M{pt(r, a1)} A{r},{r} 0 {int(b1 - a1 > math.pi)} 0 {pt(r, b1)} '
+            f"Q{c},{c} {pt(r, a2)} A{r},{r} 0 {int(b2 - a2 > math.pi)} 0 {pt(r, b2)} "
+            f'Q{c},{c} {pt(r, a1)}Z" fill="{_svg_color(color)}"/>'
+        )
+    out.append("</g>")
+
+    r0, r1 = IDEOGRAM_RADIUS, IDEOGRAM_RADIUS + IDEOGRAM_THICKNESS
+    out.append('<g font-family="sans-serif">')
+    for chr_id, label, size, color in ideograms:
+        a, b = angle(chr_id, 0), angle(chr_id, size)
+        large = int(b - a > math.pi)
+        out.append(
+            f'<path d="M{pt(r1, a)} A{r1},{r1} 0 {large} 0 {pt(r1, b)} '
+            f'L{pt(r0, b)} A{r0},{r0} 0 {large} 1 {pt(r0, a)}Z" '
+            f'fill="{_svg_color(color)}"/>'
+        )
+
+        # Radial label, flipped on the left half to stay readable
+        mid = (a + b) / 2
+        rot = math.degrees(math.atan2(-math.cos(mid), -math.sin(mid)))
+        text = label if chr_id not in numbers else f"{label} ({numbers[chr_id]})"
+        radius = LABEL_RADIUS if chr_id not in numbers else NUMBER_RADIUS
+        if math.sin(mid) > 0:
+            rot += 180
+            anchor = "end"
+        else:
+            anchor = "start"
+        out.append(
+            f'<text transform="translate({pt(radius, mid)}) rotate({rot:.1f})" '
+            f'text-anchor="{anchor}" dominant-baseline="middle" font-size="9">'
+            f"{_escape(text)}</text>"
+        )
+    out.append("</g>")
+    out.append("</svg>")
+
+    out_path = out_dir / out_name
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8", newline="") as fw:
+        fw.write("\n".join(out) + "\n")
+
+    print(f"✅ Preview generated: {out_path} ({n} ideograms, {len(links)} links)")
@@ -0,0 +1,217 @@
+"""
+================================================================================
+BIBTEX REFERENCE JOIN
+================================================================================
+
+Description:
+This script fills the reference column (`COL_REF`) of the main Excel sheet
+automatically from a `.bib` export, instead of copying the short references
+produced by `circos_extract_name_bibfile.py` by hand. Each article row of the
+sheet is matched to a BibTeX entry, and the short reference of that entry
+(e.g. "Smith et al. 2020a") is written in the row.
+
+Key Features:
+1. Indexed Matching (no all-pairs comparison):
+   - DOI index: exact match on the normalized DOI, when the sheet has a DOI
+     column and the entry has a `doi` field.
+   - Title index: exact match on the normalized title (case, accents,
+     punctuation and spaces are ignored).
+   - Fuzzy fallback: titles are split into character trigrams and indexed in
+     an inverted index. Only the rarest trigrams of the sheet title are looked
+     up (prefix filtering: any entry reaching the Dice threshold must contain
+     at least one of them). Candidates are scored in order of their Dice upper
+     bound, until no remaining one can change the two best scores; the best
+     candidate is accepted if its Dice similarity is above `FUZZY_THRESHOLD`.
+2. Safe Filling: Existing references are kept (unless `OVERWRITE_EXISTING`),
+   ambiguous titles are not filled, and a `ref_match` column records how each
+   row was matched so the result can be reviewed.
+3. Formatting Preserved: The workbook is edited cell by cell with openpyxl
+   and saved under a new name; the original file is never modified.
+
+Output:
+A copy of the main Excel file with the `COL_REF` and `ref_match` columns
+filled.
+================================================================================
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from openpyxl import load_workbook
+
+import circos_extract_name_bibfile as bib
+from main import EXCEL_PATH, SHEET_IDX, COL_REF
+
+# =================
+# TO CUSTOMIZE:
+# =================
+BIB_PATHS = bib.BIB_PATHS  # Same exports as the extractor (same suffixes)
+OUT_XLSX = str(Path(EXCEL_PATH).with_name(Path(EXCEL_PATH).stem + "_with_refs.xlsx"))
+COL_TITLE = "title"  # Title column of the main sheet
+COL_DOI = "doi"  # DOI column of the main sheet (optional)
+COL_MATCH = "ref_match"  # Review column written next to the references
+
+OVERWRITE_EXISTING = False  # Replace references already present in the sheet
+FUZZY_THRESHOLD = 0.85  # Minimum Dice similarity on title trigrams
+FUZZY_MARGIN = 0.05  # The best candidate must beat the 2nd by this margin
+
+# =================================
+# Nothing to modify below this line
+# =================================
+
+
+def trigrams(norm_title: str) -> set:
+    s = f" {norm_title} "
+    return {s[i : i + 3] for i in range(len(s) - 2)}
+
+
+class RefIndex:
+    """Hash indexes (DOI, normalized title) and a trigram index over entries."""
+
+    def __init__(self, records: List[Tuple[str, str, str]]):
+        """records: (short ref, title, doi) of each BibTeX entry."""
+        self.refs = [r[0] for r in records]
+        self.by_doi: Dict[str, List[int]] = {}
+        self.by_title: Dict[str, List[int]] = {}
+        self.grams: List[set] = []
+        self.postings: Dict[str, List[int]] = {}
+
+        for i, (_, title, doi) in enumerate(records):
+            d = bib.normalize_doi(doi)
+            if d:
+                self.by_doi.setdefault(d, []).append(i)
+            t = bib.normalize_title(title)
+            if t:
+                self.by_title.setdefault(t, []).append(i)
+            g = trigrams(t) if t else set()
+            self.grams.append(g)
+            for gram in g:
+                self.postings.setdefault(gram, []).append(i)
+
+    def _unique(self, ids: List[int]) -> str | None:
+        refs = {self.refs[i] for i in ids}
+        return refs.pop() if len(refs) == 1 else None
+
+    def match(self, title, doi=None) -> Tuple[str | None, str]:
+        """Returns (short ref or None, match method)."""
+        d = bib.normalize_doi(doi)
+        if d and d in self.by_doi:
+            ref = self._unique(self.by_doi[d])
+            return (ref, "doi") if ref else (None, "ambiguous doi")
+
+        t = bib.normalize_title(title)
+        if not t:
+            return None, ""
+        if t in self.by_title:
+            ref = self._unique(self.by_title[t])
+            return (ref, "title") if ref else (None, "ambiguous title")
+
+        # Fuzzy fallback. Dice >= T implies at least ceil(T * n / (2 - T))
+        # shared trigrams, so a match contains one of the n - that + 1
+        # rarest trigrams of the title: only those posting lists are read.
+        g = trigrams(t)
+        need = -(-FUZZY_THRESHOLD * len(g) // (2 - FUZZY_THRESHOLD))
+        rarest = sorted(g, key=lambda x: len(self.postings.get(x, ())))
+        prefix = rarest[: len(g) - int(need) + 1]
+        shared = Counter()
+        for gram in prefix:
+            shared.update(self.postings.get(gram, ()))
+
+        # Upper bound of the Dice of each candidate: the trigrams outside the
+        # prefix are all assumed shared. Below THRESHOLD - MARGIN, a candidate
+        # can neither be accepted nor block the best one.
+        unseen = len(g) - len(prefix)
+        bounds = []
+        for i, n_shared in shared.items():
+            n_other = len(self.grams[i])
+            overlap = min(n_shared + unseen, len(g), n_other)
+            bound = 2 * overlap / (len(g) + n_other)
+            if bound >= FUZZY_THRESHOLD - FUZZY_MARGIN:
+                bounds.append((bound, i))
+        bounds.sort(reverse=True)
+
+        best, best_i, runner_up = 0.0, None, 0.0
+        for bound, i in bounds:
+            if bound <= runner_up:
+                break  # No remaining candidate can change the two best scores
+            other = self.grams[i]
+            score = 2 * len(g & other) / (len(g) + len(other))
+            if score > best:
+                best, best_i, runner_up = score, i, best
+            elif score > runner_up:
+                runner_up = score
+        if best >= FUZZY_THRESHOLD and best - runner_up >= FUZZY_MARGIN:
+            return self.refs[best_i], f"fuzzy ({best:.2f})"
+        return None, ""
+
+
+def load_bib_records(bib_paths: List[Path]) -> List[Tuple[str, str, str]]:
+    """
+    Parses the .bib files like the extractor (duplicates merged) and returns
+    (short ref with suffix, title, doi) rows.
+    """
+    rows = (bib.entry_row(f) for _, f in bib.iter_all_entries(bib_paths))
+    if bib.DEDUPLICATE:
+        rows = bib.drop_duplicates(rows)
+    return bib.assign_suffixes([(ref, title, doi) for ref, title, doi, _ in rows])
+
+
+def main():
+    bib_paths = [Path(p) for p in BIB_PATHS]
+    for bib_path in bib_paths:
+        if not bib_path.exists():
+            raise FileNotFoundError(f"Bib file not found: {bib_path}")
+
+    records = load_bib_records(bib_paths)
+    index = RefIndex(records)
+    print(f"📄 {len(records)} references indexed from the .bib")
+
+    wb = load_workbook(EXCEL_PATH)
+    ws = wb.worksheets[SHEET_IDX]
+    header = [c.value for c in next(ws.iter_rows(min_row=1, max_row=1))]
+
+    if COL_TITLE not in header:
+        raise SystemExit(f"[ERROR Join] Column '{COL_TITLE}' not found in the sheet.")
+
+    def column(name: str) -> int:
+        """1-based index of a column, created at the end if missing."""
+        if name not in header:
+            header.append(name)
+            ws.cell(row=1, column=len(header), value=name)
+        return header.index(name) + 1
+
+    c_title = header.index(COL_TITLE) + 1
+    c_doi = header.index(COL_DOI) + 1 if COL_DOI in header else None
+    c_ref = column(COL_REF)
+    c_match = column(COL_MATCH)
+
+    stats = Counter()
+    for r in range(2, ws.max_row + 1):
+        title = ws.cell(row=r, column=c_title).value
+        doi = ws.cell(row=r, column=c_doi).value if c_doi else None
+        if not title and not doi:
+            continue
+        current = ws.cell(row=r, column=c_ref).value
+        if current not in (None, "") and not OVERWRITE_EXISTING:
+            stats["kept"] += 1
+            continue
+
+        ref, method = index.match(title, doi)
+        ws.cell(row=r, column=c_match, value=method or "unmatched")
+        if ref:
+            ws.cell(row=r, column=c_ref, value=ref)
+            stats[method.split(" ")[0]] += 1
+        else:
+            stats[method or "unmatched"] += 1
+
+    out_path = Path(OUT_XLSX)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(str(out_path))
+
+    summary = ", ".join(f"{k}: {v}" for k, v in sorted(stats.items()))
+    print(f"✅ References joined ({summary}) -> {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+"""
+================================================================================
+REFERENCE GENERATION ENGINE (FROZEN COPY)
+================================================================================
+
+Description:
+This module is a frozen copy of the generation logic of `main.py` and
+`circos_make_articles_data.py` (article karyotype, article boundaries, global
+counts and `build_track`), as it was before any optimization of the ingest
+or writer paths. It is the "golden" implementation used by `circos_golden.py`:
+any faster engine must write exactly the same files as this one.
+
+Do not optimize or refactor this file. Only change it when the expected
+output itself changes on purpose (new file format, bug fix), in the same
+commit as the change of the real engine.
+
+Key Features:
+1. Same Behavior: Each Excel read, each `iterrows` loop and each string
+   helper is kept as it was, so the timings of this engine are also the
+   baseline of the speedups reported by the harness.
+2. Self-Contained: The linear scaling and the validation report are frozen
+   copies too, so a change of `circos_scaling.py` or `circos_validation.py`
+   shows up as a difference instead of changing both engines at once. Other
+   scaling strategies are refused.
+3. Same Settings: The Excel columns and the scaling limits are taken from
+   `main.py` at run time, so both engines always run with the same
+   configuration. Phase 3 (label layout, `circos.conf`) and the preview are
+   shared with `main.py`: they only read the files written by the engine.
+
+Output:
+The same `articles.data.txt`, track files, validation reports, `circos.conf`
+and `preview.svg` as `main.py` (rendering excluded).
+================================================================================
+"""
+
+import contextlib
+import io
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+
+import main
+from circos_conf_builder import generate_circos_conf
+from circos_label_layout import write_label_layout
+from circos_preview import generate_preview_svg
+
+# Set by run() from main.py
+EXCEL_PATH = None
+SHEET_IDX = 0
+COL_ART = "ArtNb"
+COL_REF = "ref"
+OUTPUT_DIR = None
+VISUAL_MIN_SIZE = 70
+VISUAL_MAX_SIZE = 400
+SCALING_STRATEGY = "linear"
+ERROR_SAMPLE_SIZE = 20
+MAX_LISTED_ARTICLES = 50
+
+NA_TOKENS = {"", "na", "n/a", "nan", "-", "--", "?", "??"}
+
+
+# ==========================================
+#           UTILITIES (main.py)
+# ==========================================
+
+
+def as_art_label(raw) -> str:
+    """Normalizes the article ID -> 'artNN'."""
+    s = "" if raw is None else str(raw).strip()
+    if s == "":
+        return ""
+    m = re.match(r"^[Aa]rt\s*([0-9]+)$", s) or re.match(r"^([0-9]+)$", s)
+    if m:
+        return f"art{m.group(1)}"
+    return s if s.lower().startswith("art") else f"art{s}"
+
+
+def is_zero_like(val) -> bool:
+    """Returns True if the value is 0 or empty."""
+    if val is None:
+        return False
+    try:
+        return float(str(val).strip().replace(",", ".")) == 0.0
+    except:
+        return False
+
+
+def art_key(line: str):
+    """Sort key of a link line: numeric article IDs first, in numeric order."""
+    parts = line.split("\t")
+    a = parts[0]
+    m = re.match(r"^art(\d+)", a)
+    return (0, int(m.group(1))) if m else (1, a.lower())
+
+
+# ==========================================
+#   ARTICLE KARYOTYPE (circos_make_articles_data.py)
+# ==========================================
+
+
+def normalize_ref(ref: str) -> str:
+    """Cleans and transforms the reference text."""
+    s = str(ref).strip()
+    if not s:
+        return s
+    s = re.sub(r"[^\w\.,&]", "-", s)
+    s = re.sub(r"_+", "_", s)
+    return s
+
+
+def art_label_from(raw) -> str:
+    """Standardizes article label to 'artN'."""
+    if raw is None:
+        return ""
+    s = str(raw).strip()
+    if s == "":
+        return ""
+    m = re.match(r"^[Aa]rt\s*([0-9]+)$", s) or re.match(r"^([0-9]+)$", s)
+    if m:
+        return f"art{m.group(1)}"
+    return s if s.lower().startswith("art") else f"art{s}"
+
+
+def art_number(raw) -> int:
+    """Extracts integer for correct sorting (1, 2, 10 instead of 1, 10, 2)."""
+    s = str(raw).strip()
+    m = re.search(r"(\d+)", s)
+    return int(m.group(1)) if m else 999999
+
+
+def generate_articles_karyotype(
+    excel_path, sheet_idx, output_dir, col_art, col_ref="ref", end_value=100
+):
+    """Generates the articles.data.txt (Karyotype) file from the Excel data."""
+    try:
+        df = pd.read_excel(excel_path, sheet_name=sheet_idx, engine="openpyxl")
+    except Exception as e:
+        print(f"[ERROR Articles] Cannot read Excel file: {e}")
+        return
+
+    if col_art not in df.columns:
+        print(f"[ERROR Articles] Column '{col_art}' not found in the Excel sheet.")
+        return
+
+    if col_ref not in df.columns:
+        print(
+            f"[WARN Articles] Column '{col_ref}' not found. Using '{col_art}' as the label fallback."
+        )
+        col_ref = col_art
+
+    df["__num__"] = df[col_art].apply(art_number)
+    df = df.sort_values("__num__").drop(columns="__num__")
+
+    out_path = Path(output_dir) / "articles.data.txt"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    with out_path.open("w", encoding="utf-8", newline="") as fw:
+        for _, row in df.iterrows():
+            art_label = art_label_from(row.get(col_art))
+            ref_label = normalize_ref(row.get(col_ref, ""))
+
+            if not art_label:
+                continue
+
+            fw.write(f"chr -\t{art_label}\t{ref_label}\t0\t{end_value}\tblack\n")
+            count += 1
+
+    print(
+        f"✅ Articles file successfully generated: {out_path} ({count} articles processed)"
+    )
+
+
+# ==========================================
+#           GENERATION ENGINE (main.py)
+# ==========================================
+
+
+def get_article_boundaries():
+    """Finds the first and last article (e.g., art1, art53)."""
+    try:
+        df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_IDX, engine="openpyxl")
+        valid_arts = []
+        for val in df[COL_ART]:
+            label = as_art_label(val)
+            if label:
+                valid_arts.append(label)
+
+        def sort_key(x):
+            m = re.match(r"^art(\d+)", x)
+            return int(m.group(1)) if m else 0
+
+        valid_arts.sort(key=sort_key)
+
+        if valid_arts:
+            return valid_arts[0], valid_arts[-1]
+        return None, None
+    except Exception as e:
+        print(f"[ERROR] Cannot read articles: {e}")
+        return None, None
+
+
+def get_counts_for_config(cfg) -> Dict[str, int]:
+    """Counts the number of articles per section to calculate the global min/max."""
+    section_map = {s.excel_col: s.tlabel for s in cfg.sections}
+    sections_order = [s.tlabel for s in cfg.sections]
+
+    tlabel_na = None
+    if cfg.special_na:
+        tlabel_na = cfg.special_na[0]
+        if tlabel_na not in sections_order:
+            sections_order.append(tlabel_na)
+
+    try:
+        df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_IDX, engine="openpyxl")
+    except Exception as e:
+        print(f"[ERROR] Excel reading ({cfg.name}): {e}")
+        return {}
+
+    cols_to_check = [s.excel_col for s in cfg.sections]
+    bucket = {t: [] for t in sections_order}
+
+    for _, row in df.iterrows():
+        art = as_art_label(row.get(COL_ART))
+        if not art:
+            continue
+
+        for col in cols_to_check:
+            val = row.get(col)
+            if val is None or (isinstance(val, float) and pd.isna(val)):
+                continue
+            sval = str(val).strip()
+            low = sval.lower()
+
+            if low == "???":
+                if cfg.special_na:
+                    bucket[tlabel_na].append(art)
+                continue
+
+            if isinstance(val, str) and low in NA_TOKENS:
+                continue
+            if is_zero_like(sval):
+                continue
+
+            tlabel = section_map[col]
+            bucket[tlabel].append(art)
+
+    counts = {}
+    for t in sections_order:
+        if cfg.dedup:
+            bucket[t] = list(dict.fromkeys(bucket[t]))
+        counts[t] = len(bucket[t])
+
+    return counts
+
+
+def write_validation_report(path, title, errors):
+    """Writes the validation report of a track (removes it if no error)."""
+    path = Path(path)
+    if not errors:
+        path.unlink(missing_ok=True)
+        return
+
+    by_column = Counter(col for _, col in errors)
+    by_article = Counter(art for art, _ in errors)
+    with path.open("w", encoding="utf-8", newline="") as fw:
+        fw.write(f"# Validation report: {title}\n")
+        fw.write(
+            f"# Empty or invalid cells: {len(errors)} "
+            f"(in {len(by_article)} articles)\n"
+        )
+
+        fw.write("\n# By column\n")
+        for col, n in by_column.most_common():
+            fw.write(f"{col}\t{n}\n")
+
+        listed = by_article.most_common(MAX_LISTED_ARTICLES)
+        fw.write(f"\n# By article (top {len(listed)})\n")
+        for art, n in listed:
+            fw.write(f"{art}\t{n}\n")
+        if len(by_article) > len(listed):
+            fw.write(f"# ... {len(by_article) - len(listed)} more articles\n")
+
+        sample = errors[:ERROR_SAMPLE_SIZE]
+        fw.write(f"\n# Sample (first {len(sample)} cells)\n")
+        for art, col in sample:
+            fw.write(f"{art}\t{col}\t<empty>\n")
+
+
+def build_track(cfg, start_line, end_line, global_min, global_max):
+    """Generates Circos files and returns boundaries (first, last label)."""
+
+    section_map = {s.excel_col: (s.tlabel, s.color) for s in cfg.sections}
+    sections_order = [s.tlabel for s in cfg.sections]
+
+    tlabel_na, color_na = (None, None)
+    if cfg.special_na:
+        tlabel_na, color_na = cfg.special_na
+        if tlabel_na not in sections_order:
+            sections_order.append(tlabel_na)
+
+    df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_IDX, engine="openpyxl")
+    cols_to_check = [s.excel_col for s in cfg.sections]
+
+    bucket = {t: [] for t in sections_order}
+    errors = []
+
+    # 1. Data population
+    for _, row in df.iterrows():
+        art = as_art_label(row.get(COL_ART))
+        if not art:
+            if cfg.treat_empty_as_error:
+                errors.append(("(empty art)", COL_ART))
+            continue
+
+        for col in cols_to_check:
+            val = row.get(col)
+            if val is None or (isinstance(val, float) and pd.isna(val)):
+                if cfg.treat_empty_as_error:
+                    errors.append((art, col))
+                continue
+
+            sval = str(val).strip()
+            low = sval.lower()
+
+            if low == "???":
+                if cfg.special_na:
+                    bucket[tlabel_na].append(
+                        f"{art}\t{start_line}\t{end_line}\t{tlabel_na}\t0\tSIZE_PLACEHOLDER\tcolor={color_na}"
+                    )
+                elif cfg.treat_empty_as_error:
+                    errors.append((art, col))
+                continue
+
+            if isinstance(val, str) and low in NA_TOKENS:
+                if cfg.treat_empty_as_error:
+                    errors.append((art, col))
+                continue
+            if is_zero_like(sval):
+                continue
+
+            tlabel, color = section_map[col]
+            bucket[tlabel].append(
+                f"{art}\t{start_line}\t{end_line}\t{tlabel}\t0\tSIZE_PLACEHOLDER\tcolor={color}"
+            )
+
+    # 2. Calculations & Sorting
+    real_counts = {}
+    for t in sections_order:
+        if cfg.dedup:
+            bucket[t] = list(dict.fromkeys(bucket[t]))
+        if cfg.sort_in_section:
+            bucket[t] = sorted(bucket[t], key=art_key)
+        real_counts[t] = len(bucket[t])
+
+    # 3. Scaling & Boundaries
+    scaled_sizes = {}
+    active_labels = []
+
+    for t in sections_order:
+        count = real_counts[t]
+        if count == 0:
+            scaled_sizes[t] = 0
+            continue
+
+        active_labels.append(t)
+
+        if global_max == global_min:
+            scaled_size = VISUAL_MAX_SIZE
+        else:
+            scaled_size = int(
+                VISUAL_MIN_SIZE
+                + (count - global_min)
+                * (VISUAL_MAX_SIZE - VISUAL_MIN_SIZE)
+                / (global_max - global_min)
+            )
+
+        scaled_sizes[t] = scaled_size
+
+        new_lines = []
+        for line in bucket[t]:
+            new_lines.append(line.replace("SIZE_PLACEHOLDER", str(scaled_size)))
+        bucket[t] = new_lines
+
+    # 4. Writing files
+    base_path = Path(OUTPUT_DIR) / cfg.subdir
+    base_path.parent.mkdir(parents=True, exist_ok=True)
+
+    f_links = base_path.with_name(f"{cfg.subdir}.links.txt")
+    f_nums = base_path.with_name(f"{cfg.subdir}.numbers.txt")
+    f_data = base_path.with_name(f"{cfg.subdir}.data.txt")
+    f_report = base_path.with_name(f"{cfg.subdir}.validation.txt")
+
+    with f_links.open("w", encoding="utf-8", newline="") as fw:
+        for t in sections_order:
+            if not bucket[t]:
+                continue
+            fw.write(f"# {t} (Real: {real_counts[t]}, Scaled: {scaled_sizes[t]})\n")
+            fw.writelines(line + "\n" for line in bucket[t])
+
+    with f_nums.open("w", encoding="utf-8", newline="") as fw:
+        for t in sections_order:
+            if scaled_sizes[t] > 0:
+                fw.write(f"{t}\t0\t{scaled_sizes[t]}\t{real_counts[t]} color=black\n")
+
+    with f_data.open("w", encoding="utf-8", newline="") as fw:
+        fw.write("# chr - CHRNAME CHRLABEL START END COLOR\n")
+        meta_info = {
+            s.tlabel: (s.tlabel.replace("type", ""), s.color) for s in cfg.sections
+        }
+        if cfg.special_na:
+            meta_info[tlabel_na] = (tlabel_na.replace("type", ""), color_na)
+
+        for t in sections_order:
+            if t not in meta_info or scaled_sizes[t] == 0:
+                continue
+            pretty, color = meta_info[t]
+            fw.write(f"chr -\t{t}\t{pretty}\t0\t{scaled_sizes[t]}\t{color}\n")
+
+    # Errors go to the validation report, not to the Circos files
+    write_validation_report(f_report, f"{cfg.name} ({cfg.subdir})", errors)
+
+    if active_labels:
+        return active_labels[0], active_labels[-1]
+    return None, None
+
+
+# ==========================================
+#           PIPELINE (main.py, Phases 0-3)
+# ==========================================
+
+
+def run(excel_path: str, output_dir: str, tracks) -> None:
+    """Runs Phases 0 to 3 of main.py (and the preview) with the frozen engine."""
+    global EXCEL_PATH, SHEET_IDX, COL_ART, COL_REF, OUTPUT_DIR
+    global VISUAL_MIN_SIZE, VISUAL_MAX_SIZE, SCALING_STRATEGY, ERROR_SAMPLE_SIZE
+    EXCEL_PATH, OUTPUT_DIR = excel_path, output_dir
+    SHEET_IDX, COL_ART, COL_REF = main.SHEET_IDX, main.COL_ART, main.COL_REF
+    VISUAL_MIN_SIZE, VISUAL_MAX_SIZE = main.VISUAL_MIN_SIZE, main.VISUAL_MAX_SIZE
+    SCALING_STRATEGY = main.SCALING_STRATEGY
+    ERROR_SAMPLE_SIZE = main.ERROR_SAMPLE_SIZE
+
+    strategies = {cfg.scaling or SCALING_STRATEGY for cfg in tracks}
+    if strategies - {"linear"}:
+        raise ValueError(
+            f"The reference engine only has the linear scaling "
+            f"(got: {', '.join(sorted(strategies))})"
+        )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_articles_karyotype(
+            excel_path=EXCEL_PATH,
+            sheet_idx=SHEET_IDX,
+            output_dir=OUTPUT_DIR,
+            col_art=COL_ART,
+            col_ref=COL_REF,
+            end_value=60,
+        )
+
+        all_counts = []
+        for cfg in tracks:
+            all_counts += [v for v in get_counts_for_config(cfg).values() if v > 0]
+
+        if not all_counts:
+            global_min, global_max = 0, 1
+        else:
+            global_min = min(all_counts)
+            global_max = max(all_counts)
+
+        boundary_map = {}
+        first_art, last_art = get_article_boundaries()
+        if first_art:
+            boundary_map["articles"] = (first_art, last_art)
+
+        start_line, end_line = 0, 9
+        for cfg in tracks:
+            first, last = build_track(cfg, start_line, end_line, global_min, global_max)
+            if first and last:
+                boundary_map[cfg.subdir] = (first, last)
+            start_line, end_line = end_line + 1, end_line + 10
+
+        # Phase 3 and preview: shared with main.py (they read the files above)
+        if main.PRECOMPUTE_LABELS:
+            write_label_layout(
+                output_dir=OUTPUT_DIR, active_tracks=tracks, boundary_map=boundary_map
+            )
+        generate_circos_conf(
+            output_dir=OUTPUT_DIR, active_tracks=tracks, boundary_map=boundary_map
+        )
+        if main.WRITE_PREVIEW:
+            generate_preview_svg(
+                output_dir=OUTPUT_DIR, active_tracks=tracks, boundary_map=boundary_map
+            )
@@ -0,0 +1,230 @@
+"""
+================================================================================
+CIRCOS RENDER ORCHESTRATOR
+================================================================================
+
+Description:
+This script launches the Circos executable over one or several generated
+output directories (each containing a `circos.conf`) and collects the results.
+It replaces the manual `perl circos -conf circos.conf` invocation that had to
+be typed for every figure (facets, palettes, orders...).
+
+Key Features:
+1. Configurable Command: The command line is a list of arguments in which the
+   placeholders `{conf}` (configuration file name) and `{dir}` (output
+   directory) are substituted. Any executable can be plugged in, which also
+   allows a local stub script to stand in for Circos.
+2. Bounded Worker Pool: Renders run in parallel with a fixed maximum number of
+   workers. Each render is a separate process, so threads are enough to keep
+   the pool busy.
+3. Per-Render Report: The wall time, return code and stderr of each render are
+   captured and printed as a summary table.
+4. Render Cache (optional): When a `RenderCache` is given, renders whose
+   inputs are identical to a previous run are restored from the cache
+   instead of launching Circos (see `circos_render_cache.py`).
+
+Output:
+The images written by Circos in each output directory, and a list of
+`RenderResult` objects (one per directory, in queue order).
+================================================================================
+"""
+
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Sequence
+
+from circos_render_cache import RenderCache, image_outputs, render_key
+
+# Default command (Windows installation described in the README).
+DEFAULT_COMMAND = [
+    "perl",
+    r"C:\Circos_project\circos-0.69-10\bin\circos",
+    "-conf",
+    "{conf}",
+]
+DEFAULT_WORKERS = 4
+
+
+@dataclass
+class RenderResult:
+    output_dir: str
+    command: List[str]
+    returncode: int | None  # None if the process could not be started
+    duration: float  # Wall time in seconds
+    stderr: str
+    cached: bool = False  # True if the images were restored from the cache
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+def build_command(command: Sequence[str], output_dir, conf_name="circos.conf"):
+    """Substitutes the {conf} and {dir} placeholders of the command line."""
+    return [str(arg).format(conf=conf_name, dir=str(output_dir)) for arg in command]
+
+
+def render_one(
+    output_dir,
+    command=DEFAULT_COMMAND,
+    conf_name="circos.conf",
+    timeout=None,
+    cache: RenderCache | None = None,
+):
+    """Runs one render inside `output_dir` and returns its RenderResult."""
+    cmd = build_command(command, output_dir, conf_name)
+    conf_path = Path(output_dir) / conf_name
+    if not conf_path.exists():
+        return RenderResult(str(output_dir), cmd, None, 0.0, f"Missing {conf_path}")
+
+    t0 = time.perf_counter()
+    key = outputs = None
+    if cache is not None:
+        key = render_key(output_dir, cmd, conf_name)
+        outputs = image_outputs(conf_path)
+        if cache.restore(key, output_dir, outputs):
+            return RenderResult(
+                str(output_dir), cmd, 0, time.perf_counter() - t0, "", cached=True
+            )
+
+    try:
+        proc = subprocess.run(
+            cmd,
+            cwd=str(output_dir),
+            capture_output=True,
+            text=True,
+            errors="replace",
+            timeout=timeout,
+        )
+    except OSError as e:  # Missing executable, permission denied, bad format...
+        return RenderResult(
+            str(output_dir), cmd, None, time.perf_counter() - t0, str(e)
+        )
+    except subprocess.TimeoutExpired:
+        return RenderResult(
+            str(output_dir),
+            cmd,
+            None,
+            time.perf_counter() - t0,
+            f"Timeout ({timeout}s)",
+        )
+
+    if cache is not None and proc.returncode == 0:
+        cache.store(key, output_dir, outputs)
+
+    return RenderResult(
+        str(output_dir), cmd, proc.returncode, time.perf_counter() - t0, proc.stderr
+    )
+
+
+def render_all(
+    output_dirs,
+    command=DEFAULT_COMMAND,
+    max_workers=DEFAULT_WORKERS,
+    conf_name="circos.conf",
+    timeout=None,
+    cache: RenderCache | None = None,
+) -> List[RenderResult]:
+    """
+    Renders every directory of the queue with a bounded worker pool.
+
+    Args:
+        output_dirs (list): Directories containing a generated circos.conf.
+        command (list): Command line, with {conf}/{dir} placeholders.
+        max_workers (int): Maximum number of simultaneous renders.
+        conf_name (str): Name of the configuration file in each directory.
+        timeout (float): Optional time limit per render, in seconds.
+        cache (RenderCache): Optional cache of previous renders.
+
+    Returns:
+        List[RenderResult]: One result per directory, in queue order.
+    """
+    queue = [str(d) for d in output_dirs]
+    if not queue:
+        return []
+
+    workers = max(1, min(max_workers, len(queue)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(
+            pool.map(
+                lambda d: render_one(d, command, conf_name, timeout, cache),
+                queue,
+            )
+        )
+
+
+def format_summary(results: List[RenderResult]) -> str:
+    """Formats the results as a plain text table."""
+    header = ("Status", "Time (s)", "Output directory", "Stderr (last line)")
+    rows = []
+    for r in results:
+        if r.cached:
+            status = "CACHED"
+        elif r.ok:
+            status = "OK"
+        else:
+            status = "FAILED" if r.returncode is not None else "ERROR"
+        lines = [ln for ln in r.stderr.splitlines() if ln.strip()]
+        rows.append(
+            (status, f"{r.duration:.2f}", r.output_dir, lines[-1] if lines else "")
+        )
+
+    widths = [
+        max(len(header[i]), *(len(row[i]) for row in rows)) if rows else len(header[i])
+        for i in range(len(header))
+    ]
+    sep = "  "
+    out = [sep.join(h.ljust(w) for h, w in zip(header, widths)).rstrip()]
+    out.append(sep.join("-" * w for w in widths))
+    for row in rows:
+        out.append(sep.join(c.ljust(w) for c, w in zip(row, widths)).rstrip())
+
+    n_ok = sum(r.ok for r in results)
+    n_cached = sum(r.cached for r in results)
+    total = sum(r.duration for r in results)
+    out.append(
+        f"\n{n_ok}/{len(results)} renders succeeded, {n_cached} from cache "
+        f"(cumulated time: {total:.2f}s)"
+    )
+    return "\n".join(out)
+
+
+def print_summary(results: List[RenderResult]) -> None:
+    print(format_summary(results))
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import shlex
+
+    parser = argparse.ArgumentParser(description="Render Circos output directories.")
+    parser.add_argument("dirs", nargs="+", help="Directories containing circos.conf")
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument(
+        "--command",
+        default=None,
+        help="Command line to run, as one string ({conf} and {dir} are substituted)",
+    )
+    parser.add_argument("--cache-dir", default=None, help="Render cache directory")
+    parser.add_argument(
+        "--cache-max-mb", type=float, default=500, help="Render cache size limit (MB)"
+    )
+    args = parser.parse_args()
+
+    cache = (
+        RenderCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+        if args.cache_dir
+        else None
+    )
+    command = (
+        shlex.split(args.command, posix=os.name != "nt")
+        if args.command
+        else DEFAULT_COMMAND
+    )
+    results = render_all(args.dirs, command=command, max_workers=args.jobs, cache=cache)
+    print_summary(results)
+    raise SystemExit(0 if all(r.ok for r in results) else 1)
@@ -0,0 +1,239 @@
+"""
+================================================================================
+CIRCOS RENDER CACHE
+================================================================================
+
+Description:
+This script provides a content-addressed cache for Circos renders. A render is
+by far the slowest step of the pipeline, yet most of the time the inputs are
+strictly identical to a previous run (same `circos.conf`, same karyotype and
+track files). In that case the images are restored from the cache instead of
+launching Circos again.
+
+Key Features:
+1. Content Addressing: The cache key is a SHA-256 hash of the command line,
+   the `circos.conf` and every input file it references (karyotype list,
+   `file = ...` entries of plots and links, local `<<include>>` files).
+   File names are hashed together with their content, so renaming a track
+   invalidates the key as well.
+2. Output Restoration: On a hit, the cached SVG/PNG files are copied back
+   into the output directory. Their names are read from the `<image>` block
+   of the configuration (`dir`, `file`, `png`, `svg`, with the defaults of
+   Circos for missing values), so a conf that renames or disables an image
+   is cached correctly.
+3. Size Limit & LRU Eviction: The cache directory is bounded in size. Every
+   hit refreshes the entry, and the least recently used entries are deleted
+   first when the limit is exceeded.
+
+Output:
+A cache directory with one sub-folder per render key, containing the images
+produced by Circos.
+================================================================================
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import List, Sequence
+
+# Defaults of Circos (etc/image.generic.conf) for the <image> parameters
+IMAGE_DEFAULTS = {"dir": ".", "file": "circos.png", "png": "yes", "svg": "yes"}
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024  # 500 MB
+
+KARYOTYPE_RE = re.compile(r"^\s*karyotype\s*=\s*(.+?)\s*$")
+FILE_RE = re.compile(r"^\s*file\*?\s*=\s*(.+?)\s*$")
+INCLUDE_RE = re.compile(r"^\s*<<include\s+(.+?)\s*>>\s*$")
+BLOCK_OPEN_RE = re.compile(r"^\s*<(\w+)[^/>]*>\s*$")
+BLOCK_CLOSE_RE = re.compile(r"^\s*</(\w+)>\s*$")
+IMAGE_PARAM_RE = re.compile(r"^\s*(dir|file|png|svg)(\*?)\s*=\s*(.+?)\s*$")
+
+_STAMP = ".last_used"
+
+
+def referenced_inputs(conf_path) -> List[Path]:
+    """
+    Lists the input files referenced by a circos.conf (karyotype, plot/link
+    files, local includes), in order of appearance and without duplicates.
+    Files declared inside the <image> block are outputs and are ignored.
+    """
+    conf_path = Path(conf_path)
+    base = conf_path.parent
+    found: List[Path] = []
+    seen = set()
+
+    def add(name: str):
+        p = base / name.strip()
+        if p not in seen:
+            seen.add(p)
+            found.append(p)
+
+    def scan(path: Path):
+        stack = []
+        for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+            line = line.split("#", 1)[0]  # Commented-out files are not inputs
+            m = BLOCK_CLOSE_RE.match(line)
+            if m:
+                if stack:
+                    stack.pop()
+                continue
+            m = BLOCK_OPEN_RE.match(line)
+            if m:
+                stack.append(m.group(1))
+                continue
+            if "image" in stack:
+                continue
+            m = KARYOTYPE_RE.match(line)
+            if m:
+                for name in m.group(1).split(","):
+                    if name.strip():
+                        add(name)
+                continue
+            m = FILE_RE.match(line)
+            if m:
+                add(m.group(1))
+                continue
+            m = INCLUDE_RE.match(line)
+            if m:
+                # Only local includes: etc/*.conf belong to the Circos install
+                inc = base / m.group(1)
+                if inc.is_file() and inc not in seen:
+                    add(m.group(1))
+                    scan(inc)
+
+    scan(conf_path)
+    return found
+
+
+def image_outputs(conf_path) -> List[Path]:
+    """
+    Lists the images Circos writes for a circos.conf, relative to its
+    directory, from the `dir`/`file`/`png`/`svg` parameters of the <image>
+    block (local includes followed). Overridden values (`dir* = ...`) take
+    precedence over plain ones, as in Circos.
+    """
+    conf_path = Path(conf_path)
+    base = conf_path.parent
+    values = {}  # name -> (overridden, value)
+
+    def scan(path: Path, stack: List[str]):
+        for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+            line = line.split("#", 1)[0]
+            m = BLOCK_CLOSE_RE.match(line)
+            if m:
+                if stack:
+                    stack.pop()
+                continue
+            m = BLOCK_OPEN_RE.match(line)
+            if m:
+                stack.append(m.group(1))
+                continue
+            m = INCLUDE_RE.match(line)
+            if m:
+                inc = base / m.group(1)
+                if inc.is_file():
+                    scan(inc, stack)
+                continue
+            m = IMAGE_PARAM_RE.match(line)
+            if m and stack and stack[-1] == "image":
+                name, star, value = m.groups()
+                if star or not values.get(name, (False,))[0]:
+                    values[name] = (bool(star), value)
+
+    scan(conf_path, [])
+    params = {**IMAGE_DEFAULTS, **{k: v for k, (_, v) in values.items()}}
+
+    stem = re.sub(r"\.(png|svg)$", "", params["file"], flags=re.IGNORECASE)
+    outputs = []
+    for ext in ("svg", "png"):
+        if params[ext].lower() in ("yes", "1", "true"):
+            outputs.append(Path(params["dir"]) / f"{stem}.{ext}")
+    return outputs
+
+
+def render_key(output_dir, command: Sequence[str], conf_name="circos.conf") -> str:
+    """Hashes the command line, the configuration and all its input files."""
+    base = Path(output_dir)
+    conf_path = base / conf_name
+    h = hashlib.sha256()
+    h.update("\0".join(command).encode("utf-8"))
+    for path in [conf_path] + referenced_inputs(conf_path):
+        h.update(b"\0file\0" + os.path.relpath(path, base).encode("utf-8") + b"\0")
+        try:
+            with path.open("rb") as fr:
+                for chunk in iter(lambda: fr.read(1 << 20), b""):
+                    h.update(chunk)
+        except FileNotFoundError:
+            h.update(b"<missing>")
+    return h.hexdigest()
+
+
+class RenderCache:
+    """Local cache directory of rendered images, bounded in size (LRU)."""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def restore(self, key: str, output_dir, outputs: Sequence[Path]) -> bool:
+        """
+        Copies the cached images of `key` to their paths (`outputs`, relative
+        to output_dir, see image_outputs). Returns True on hit.
+        """
+        entry = self._entry(key)
+        with self._lock:
+            if not outputs or not (entry / _STAMP).exists():
+                return False
+            cached = [entry / Path(p).name for p in outputs]
+            if not all(p.is_file() for p in cached):
+                return False
+            for src, dst in zip(cached, outputs):
+                dst = Path(output_dir) / dst
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(src, dst)
+            (entry / _STAMP).write_text(str(time.time()))
+        return True
+
+    def store(self, key: str, output_dir, outputs: Sequence[Path]) -> None:
+        """Saves the images produced in output_dir under `key`, then evicts."""
+        produced = [Path(output_dir) / p for p in outputs]
+        if not produced or not all(p.is_file() for p in produced):
+            return
+
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entry = self._entry(key)
+            tmp = self.cache_dir / f".{key}.tmp"
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir()
+            for p in produced:
+                shutil.copy2(p, tmp / p.name)
+            (tmp / _STAMP).write_text(str(time.time()))
+            shutil.rmtree(entry, ignore_errors=True)
+            tmp.rename(entry)
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for entry in self.cache_dir.iterdir():
+            stamp = entry / _STAMP
+            if not entry.is_dir() or not stamp.exists():
+                continue
+            size = sum(p.stat().st_size for p in entry.iterdir())
+            entries.append((stamp.stat().st_mtime, size, entry))
+            total += size
+
+        # Least recently used first
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
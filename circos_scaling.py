@@ -0,0 +1,101 @@
+"""
+================================================================================
+SECTION SIZE SCALING ENGINE
+================================================================================
+
+Description:
+This script converts article counts into visual section sizes (the length of
+each track segment on the Circos circle). All sizes are computed in a single
+NumPy call over the full vector of counts, using the counts of all tracks as
+the reference, so that the sizes stay comparable across tracks.
+
+Strategies:
+- "linear":   Current behaviour. Maps [global min, global max] linearly to
+              [vmin, vmax] (values truncated to integers).
+- "log":      Same mapping on log(1 + count). Keeps small categories visible
+              when the count range is large.
+- "sqrt":     Same mapping on sqrt(count). Intermediate compression.
+- "quantile": Uses the rank of the count among all reference counts, so the
+              sizes are evenly spread whatever the distribution.
+- "capped":   Linear, but counts above a quantile of the reference (95th by
+              default) are capped at vmax, so a few huge categories do not
+              squash all the others.
+
+Sections with a count of 0 always get a size of 0 (they are not displayed).
+================================================================================
+"""
+
+import numpy as np
+
+STRATEGIES = ("linear", "log", "sqrt", "quantile", "capped")
+DEFAULT_CAP_QUANTILE = 0.95
+
+
+def scale_sizes(
+    counts,
+    reference=None,
+    strategy="linear",
+    vmin=70,
+    vmax=400,
+    cap_quantile=DEFAULT_CAP_QUANTILE,
+) -> np.ndarray:
+    """
+    Computes the visual size of each count.
+
+    Args:
+        counts (array): Counts to scale (0 = section not displayed).
+        reference (array): Counts of all tracks defining the global range
+            (default: the non-zero values of `counts`).
+        strategy (str): One of STRATEGIES.
+        vmin (int): Visual size of the smallest reference count.
+        vmax (int): Visual size of the largest reference count.
+        cap_quantile (float): Quantile used as the maximum by "capped".
+
+    Returns:
+        np.ndarray: Integer sizes, same shape as `counts`.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown scaling strategy '{strategy}' (use {STRATEGIES})")
+
+    counts = np.asarray(counts, dtype=np.int64)
+    ref = counts if reference is None else np.asarray(reference, dtype=np.int64)
+    ref = ref[ref > 0]
+    sizes = np.zeros(counts.shape, dtype=np.int64)
+    active = counts > 0
+    if ref.size == 0 or not active.any():
+        return sizes
+
+    c = counts[active]
+    gmin, gmax = ref.min(), ref.max()
+
+    if strategy == "quantile":
+        ref = np.sort(ref)
+        if gmax == gmin:  # Constant reference: no rank, same as the others
+            scaled = np.full(c.shape, float(vmax))
+        else:
+            # Mid-rank of each count among the reference counts
+            lo = np.searchsorted(ref, c, side="left")
+            hi = np.searchsorted(ref, c, side="right")
+            rank = np.clip((lo + hi - 1) / 2 / (ref.size - 1), 0.0, 1.0)
+            scaled = vmin + rank * (vmax - vmin)
+        sizes[active] = scaled.astype(np.int64)
+        return sizes
+
+    if strategy == "capped":
+        gmax = max(gmin, int(np.floor(np.quantile(ref, cap_quantile))))
+        c = np.minimum(c, gmax)
+
+    if gmax == gmin:
+        sizes[active] = vmax
+        return sizes
+
+    if strategy in ("linear", "capped"):
+        # Same operation order as the historical formula (exact integer products)
+        scaled = vmin + (c - gmin) * (vmax - vmin) / (gmax - gmin)
+    else:
+        f = np.log1p if strategy == "log" else np.sqrt
+        t, t_min, t_max = f(c), f(gmin), f(gmax)
+        scaled = vmin + (t - t_min) * (vmax - vmin) / (t_max - t_min)
+
+    sizes[active] = scaled.astype(np.int64)
+    return sizes
@@ -0,0 +1,84 @@
+"""
+================================================================================
+TRACK VALIDATION REPORTS
+================================================================================
+
+Description:
+This script collects the empty or invalid cells found while a track is built
+(`TrackConfig.treat_empty_as_error`) and writes them to a validation report
+next to the track files. They used to be appended one line per cell under
+`# ERRORS` at the end of the `.links.txt` file: on sparse sheets that section
+could be longer than the links themselves, kept one tuple per cell in memory,
+and had to be parsed (and skipped) by Circos.
+
+Key Features:
+1. Bounded Memory: Cells are aggregated into counters per column and per
+   article; only the first `sample_size` cells are kept one by one. Memory
+   grows with the number of articles and columns, not with the number of
+   empty cells.
+2. Readable Report: Total, counts per column, the most affected articles
+   (`MAX_LISTED_ARTICLES`) and the sample of cells, as tab-separated lines.
+3. Clean Output Directory: The report of a track is only written when the
+   track has errors; a stale report from a previous run is removed.
+
+Output:
+A `<subdir>.validation.txt` file per track with errors.
+================================================================================
+"""
+
+from collections import Counter
+from pathlib import Path
+
+MAX_LISTED_ARTICLES = 50  # Articles listed in the report (most errors first)
+
+
+class ValidationErrors:
+    """Empty or invalid cells of a track: counters plus a capped sample."""
+
+    def __init__(self, sample_size: int = 20):
+        self.sample_size = sample_size
+        self.total = 0
+        self.by_column: Counter = Counter()
+        self.by_article: Counter = Counter()
+        self.sample = []  # First (article, column) pairs, in sheet order
+
+    def add(self, art: str, col: str) -> None:
+        self.total += 1
+        self.by_column[col] += 1
+        self.by_article[art] += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append((art, col))
+
+    def __len__(self) -> int:
+        return self.total
+
+    def write(self, path, title: str) -> Path | None:
+        """Writes the report (or removes a stale one if there is no error)."""
+        path = Path(path)
+        if not self.total:
+            path.unlink(missing_ok=True)
+            return None
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8", newline="") as fw:
+            fw.write(f"# Validation report: {title}\n")
+            fw.write(
+                f"# Empty or invalid cells: {self.total} "
+                f"(in {len(self.by_article)} articles)\n"
+            )
+
+            fw.write("\n# By column\n")
+            for col, n in self.by_column.most_common():
+                fw.write(f"{col}\t{n}\n")
+
+            listed = self.by_article.most_common(MAX_LISTED_ARTICLES)
+            fw.write(f"\n# By article (top {len(listed)})\n")
+            for art, n in listed:
+                fw.write(f"{art}\t{n}\n")
+            if len(self.by_article) > len(listed):
+                fw.write(f"# ... {len(self.by_article) - len(listed)} more articles\n")
+
+            fw.write(f"\n# Sample (first {len(self.sample)} cells)\n")
+            for art, col in self.sample:
+                fw.write(f"{art}\t{col}\t<empty>\n")
+        return path
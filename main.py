@@ -12,36 +12,79 @@ Key Steps Performed:
 1. Configuration Setup: Defines how Excel columns map to specific Circos tracks
    (e.g., GMFCS level, CP Type, Topography) and assigns specific RGB colors.
 2. Article Karyotype Generation (Phase 0): Calls an external script to define
-   the base "chromosomes" (the articles) of the Circos plot.
+   the base "chromosomes" (the articles) of the Circos plot. The article index
+   (labels, karyotype order, boundaries, in-track ranks) is built once with
+   the sheet and reused by Phase 2.
 3. Global Analysis (Phase 1): Scans the entire Excel dataset to find the global
    minimum and maximum number of articles across all categories. This ensures
    accurate relative scaling.
 4. Track Generation & Scaling (Phase 2):
-   - Reads the data for each configured track.
+   - Reads the data for each configured track. The sheet is read once per run
+     and each section column is coerced once into integer cell codes
+     (present / zero / NA / unspecified / empty, see `TypedSheet`), so the
+     per-row loops only compare integers.
    - Mathematically rescales the visual block sizes between a defined min/max
      visual size (`VISUAL_MIN_SIZE`, `VISUAL_MAX_SIZE`). This prevents categories
      with huge article counts from taking over the entire graph, while keeping
-     categories with few articles visible.
+     categories with few articles visible. The strategy (linear, log, sqrt,
+     quantile, capped) is set by `SCALING_STRATEGY` (see `circos_scaling.py`).
    - Generates the `.data.txt`, `.links.txt`, and `.numbers.txt` files for each track.
+   - Empty or invalid cells are aggregated (per column, per article, plus a
+     capped sample) into a `<track>.validation.txt` report, outside the
+     Circos input files (see `circos_validation.py`).
    - Records the start and end boundary labels for spacing purposes.
 5. Circos Configuration Generation (Phase 3): Passes the recorded boundaries
    to an external script to dynamically generate the `circos.conf` file with
-   correct automated spacing.
+   correct automated spacing. Label positions can also be precomputed into
+   separate label files (`PRECOMPUTE_LABELS`, off by default, not used by
+   `circos.conf` yet).
+6. Preview (optional): Draws an approximate `preview.svg` in pure Python for
+   quick iterations on colors, order and scaling, without starting Circos.
+7. Rendering (Phase 4, optional): Launches the Circos executable over the queue
+   of output directories with a bounded worker pool and prints a timing summary.
+8. Instrumentation: Every phase, and the read/populate/sort/scale/write steps
+   of each track, is timed as a nested span (see `circos_metrics.py`). The
+   span tree is printed at the end of the run and saved with per-track
+   counters (rows, links, errors, bytes written) to `METRICS_PATH` (relative
+   to `OUTPUT_DIR`). With `--profile`, the run is also profiled with cProfile
+   (`PROFILE_PATH`). With
+   `--memory-report`, allocations are traced with tracemalloc: peak memory per
+   phase, track and step, top allocation sites at each phase boundary and
+   after each track population, and retained size of the Excel frame, the
+   link buckets and the error list of each track.
 
 Outputs:
 - A set of directories corresponding to each track, containing formatted text
   files ready to be parsed by the Circos Perl engine.
 - A final `circos.conf` file at the root of the output directory.
+- `run_metrics.json` (timings and counters) and, with `--profile`, `main.prof`.
 ================================================================================
 """
 
 from dataclasses import dataclass
+from itertools import repeat
+from operator import itemgetter
 from typing import List, Dict, Tuple
 from pathlib import Path
+import argparse
+import cProfile
+import pstats
+import numpy as np
 import pandas as pd
 import re
-from circos_make_articles_data import generate_articles_karyotype
+from circos_make_articles_data import (
+    ArticleIndex,
+    generate_articles_karyotype,
+    map_distinct,
+)
 from circos_conf_builder import generate_circos_conf
+from circos_label_layout import write_label_layout
+from circos_metrics import RunMetrics
+from circos_preview import generate_preview_svg
+from circos_render import render_all, print_summary
+from circos_render_cache import RenderCache
+from circos_scaling import scale_sizes
+from circos_validation import ValidationErrors
 
 # ==========================================
 #              USER CONFIGURATION
@@ -60,6 +103,38 @@ OUTPUT_DIR = r"C:\Circos_project\Circos_review2"
 # Min/max visual size of sections (independent of the actual number of articles)
 VISUAL_MIN_SIZE = 70
 VISUAL_MAX_SIZE = 400
+# Scaling strategy: "linear", "log", "sqrt", "quantile" or "capped"
+# (can be overridden per track with TrackConfig.scaling)
+SCALING_STRATEGY = "linear"
+# Empty cells listed one by one in the validation report of each track
+# (all of them are still counted per column and per article)
+ERROR_SAMPLE_SIZE = 20
+
+# 5. PREVIEW & RENDER PARAMETERS (PHASE 4)
+WRITE_PREVIEW = True  # Fast approximate preview.svg (no Circos needed)
+# Write explicit radial offsets of crowded labels to *.labels.txt (experimental:
+# not used by circos.conf until compared with a real Circos render)
+PRECOMPUTE_LABELS = False
+RUN_RENDER = False  # Launch Circos automatically after generating circos.conf
+# Command line: {conf} -> configuration file name, {dir} -> output directory
+CIRCOS_COMMAND = [
+    "perl",
+    r"C:\Circos_project\circos-0.69-10\bin\circos",
+    "-conf",
+    "{conf}",
+]
+RENDER_WORKERS = 4  # Maximum number of simultaneous Circos processes
+RENDER_QUEUE = None  # Generated output directories to render (None: OUTPUT_DIR)
+# Renders with unchanged inputs are restored from this cache (None to disable).
+# A relative path is resolved next to OUTPUT_DIR when the run starts.
+RENDER_CACHE_DIR = ".circos_render_cache"
+RENDER_CACHE_MAX_MB = 500
+
+# 6. INSTRUMENTATION
+# Timing spans and per-track counters of the run (None to disable the file).
+# Relative paths are resolved in OUTPUT_DIR when the run starts.
+METRICS_PATH = "run_metrics.json"
+PROFILE_PATH = "main.prof"  # Written with --profile
 
 
 # ==========================================
@@ -91,6 +166,86 @@ def is_zero_like(val) -> bool:
 NA_TOKENS = {"", "na", "n/a", "nan", "-", "--", "?", "??"}
 
 
+# ==========================================
+#           TYPED INGEST
+# ==========================================
+# Each section column is a membership flag. Its cells are coerced once, when
+# the sheet is loaded, into one of these codes; the engine then only compares
+# integers instead of parsing strings cell by cell.
+
+CELL_PRESENT = 0  # Article belongs to the section
+CELL_ZERO = 1  # 0, "0", "0,0"... (not in the section)
+CELL_NA = 2  # NA token ("n/a", "-", "?"...)
+CELL_UNSPECIFIED = 3  # "???" (special_na section, if any)
+CELL_EMPTY = 4  # Empty cell (or column missing from the sheet)
+
+
+def classify_cell(val) -> int:
+    """Code of one cell (same rules as the original per-cell checks)."""
+    if val is None or (isinstance(val, float) and pd.isna(val)):
+        return CELL_EMPTY
+    sval = str(val).strip()
+    low = sval.lower()
+    if low == "???":
+        return CELL_UNSPECIFIED
+    if isinstance(val, str) and low in NA_TOKENS:
+        return CELL_NA
+    if is_zero_like(sval):
+        return CELL_ZERO
+    return CELL_PRESENT
+
+
+class TypedSheet:
+    """
+    The main sheet, read once, with its article index (label of each row,
+    karyotype order, boundaries, in-track ranks) and the cell codes of each
+    flag column (coerced on first use, then cached).
+    Values are taken with the dtype `iterrows` would give them (e.g. ints
+    become floats in an all-numeric sheet), so the codes are identical to a
+    cell-by-cell reading of the rows.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.n_rows = len(df)
+        self._row_dtype = df.iloc[:0].to_numpy().dtype
+        self._codes: Dict[str, List[int]] = {}
+        self.articles = ArticleIndex(df, COL_ART, COL_REF)
+        self.arts = self.articles.labels
+
+    def _values(self, col: str) -> np.ndarray:
+        return self.df[col].to_numpy(dtype=self._row_dtype)
+
+    def codes(self, col: str) -> List[int]:
+        if col not in self._codes:
+            if col not in self.df.columns:
+                self._codes[col] = [CELL_EMPTY] * self.n_rows
+            elif self._row_dtype.kind in "fiu":
+                # Numeric sheet: no string to parse
+                arr = self._values(col)
+                codes = np.where(arr == 0, CELL_ZERO, CELL_PRESENT)
+                if self._row_dtype.kind == "f":
+                    codes[np.isnan(arr)] = CELL_EMPTY
+                self._codes[col] = codes.tolist()
+            else:
+                self._codes[col] = map_distinct(self._values(col), classify_cell)
+        return self._codes[col]
+
+
+_SHEET_CACHE: Dict[tuple, TypedSheet] = {}
+
+
+def load_sheet() -> TypedSheet:
+    """Reads the main sheet once per run (reloaded if the file changes)."""
+    stat = Path(EXCEL_PATH).stat()
+    key = (str(EXCEL_PATH), SHEET_IDX, stat.st_mtime_ns, stat.st_size)
+    if key not in _SHEET_CACHE:
+        _SHEET_CACHE.clear()
+        df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_IDX, engine="openpyxl")
+        _SHEET_CACHE[key] = TypedSheet(df)
+    return _SHEET_CACHE[key]
+
+
 @dataclass
 class Section:
     excel_col: str  # Excel column name
@@ -108,6 +263,7 @@ class TrackConfig:
     dedup: bool = True
     sort_in_section: bool = True
     special_na: Tuple[str, str] | None = None  # ("label_na", "color_na")
+    scaling: str | None = None  # Scaling strategy (None: SCALING_STRATEGY)
 
     @property
     def out_prefix(self):
@@ -118,29 +274,19 @@ class TrackConfig:
 #           GENERATION ENGINE
 # ==========================================
 
+METRICS = RunMetrics()  # Timing spans & counters of the run (circos_metrics.py)
+
 
 def get_article_boundaries():
     """Finds the first and last article (e.g., art1, art53)."""
     try:
-        df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_IDX, engine="openpyxl")
-        valid_arts = []
-        for val in df[COL_ART]:
-            label = as_art_label(val)
-            if label:
-                valid_arts.append(label)
-
-        def sort_key(x):
-            m = re.match(r"^art(\d+)", x)
-            return int(m.group(1)) if m else 0
-
-        valid_arts.sort(key=sort_key)
-
-        if valid_arts:
-            return valid_arts[0], valid_arts[-1]
-        return None, None
+        articles = load_sheet().articles
     except Exception as e:
         print(f"[ERROR] Cannot read articles: {e}")
         return None, None
+    if not articles.has_art_column:
+        print(f"[ERROR] Cannot read articles: column '{COL_ART}' not found")
+    return articles.first, articles.last
 
 
 def get_counts_for_config(cfg: TrackConfig) -> Dict[str, int]:
@@ -155,7 +301,8 @@ def get_counts_for_config(cfg: TrackConfig) -> Dict[str, int]:
             sections_order.append(tlabel_na)
 
     try:
-        df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_IDX, engine="openpyxl")
+        with METRICS.span("load"):
+            sheet = load_sheet()
     except Exception as e:
         print(f"[ERROR] Excel reading ({cfg.name}): {e}")
         return {}
@@ -163,30 +310,17 @@ def get_counts_for_config(cfg: TrackConfig) -> Dict[str, int]:
     cols_to_check = [s.excel_col for s in cfg.sections]
     bucket = {t: [] for t in sections_order}
 
-    for _, row in df.iterrows():
-        art = as_art_label(row.get(COL_ART))
-        if not art:
-            continue
-
-        for col in cols_to_check:
-            val = row.get(col)
-            if val is None or (isinstance(val, float) and pd.isna(val)):
+    with METRICS.span("count"):
+        columns = [sheet.codes(col) for col in cols_to_check]
+        targets = [section_map[col] for col in cols_to_check]
+        for art, row_codes in zip(sheet.arts, zip(*columns)):
+            if not art:
                 continue
-            sval = str(val).strip()
-            low = sval.lower()
-
-            if low == "???":
-                if cfg.special_na:
+            for tlabel, code in zip(targets, row_codes):
+                if code == CELL_PRESENT:
+                    bucket[tlabel].append(art)
+                elif code == CELL_UNSPECIFIED and cfg.special_na:
                     bucket[tlabel_na].append(art)
-                continue
-
-            if isinstance(val, str) and low in NA_TOKENS:
-                continue
-            if is_zero_like(sval):
-                continue
-
-            tlabel = section_map[col]
-            bucket[tlabel].append(art)
 
     counts = {}
     for t in sections_order:
@@ -197,8 +331,11 @@ def get_counts_for_config(cfg: TrackConfig) -> Dict[str, int]:
     return counts
 
 
-def build_track(cfg: TrackConfig, start_line, end_line, global_min, global_max):
-    """Generates Circos files and returns boundaries (first, last label)."""
+def build_track(cfg: TrackConfig, start_line, end_line, global_counts):
+    """
+    Generates Circos files and returns boundaries (first, last label).
+    `global_counts` holds the non-zero counts of all tracks (scaling reference).
+    """
 
     section_map = {s.excel_col: (s.tlabel, s.color) for s in cfg.sections}
     sections_order = [s.tlabel for s in cfg.sections]
@@ -209,133 +346,133 @@ def build_track(cfg: TrackConfig, start_line, end_line, global_min, global_max):
         if tlabel_na not in sections_order:
             sections_order.append(tlabel_na)
 
-    df = pd.read_excel(EXCEL_PATH, sheet_name=SHEET_IDX, engine="openpyxl")
+    with METRICS.span("load"):
+        sheet = load_sheet()
     cols_to_check = [s.excel_col for s in cfg.sections]
 
     bucket = {t: [] for t in sections_order}
-    errors = []
-
-    # 1. Data population
-    for _, row in df.iterrows():
-        art = as_art_label(row.get(COL_ART))
-        if not art:
-            if cfg.treat_empty_as_error:
-                errors.append(("(empty art)", COL_ART))
-            continue
-
-        for col in cols_to_check:
-            val = row.get(col)
-            if val is None or (isinstance(val, float) and pd.isna(val)):
-                if cfg.treat_empty_as_error:
-                    errors.append((art, col))
-                continue
-
-            sval = str(val).strip()
-            low = sval.lower()
-
-            if low == "???":
-                if cfg.special_na:
-                    bucket[tlabel_na].append(
-                        f"{art}\t{start_line}\t{end_line}\t{tlabel_na}\t0\tSIZE_PLACEHOLDER\tcolor={color_na}"
-                    )
-                elif cfg.treat_empty_as_error:
-                    errors.append((art, col))
-                continue
+    errors = ValidationErrors(sample_size=ERROR_SAMPLE_SIZE)
+
+    # 1. Data population (cell codes, see TypedSheet)
+    with METRICS.span("populate"):
+        columns = [sheet.codes(col) for col in cols_to_check]
+        # Link line = article + fixed end of line of the column
+        targets = [
+            (
+                section_map[col][0],
+                f"\t{start_line}\t{end_line}\t{section_map[col][0]}\t0"
+                f"\tSIZE_PLACEHOLDER\tcolor={section_map[col][1]}",
+            )
+            for col in cols_to_check
+        ]
+        na_end = (
+            f"\t{start_line}\t{end_line}\t{tlabel_na}\t0"
+            f"\tSIZE_PLACEHOLDER\tcolor={color_na}"
+        )
+        rows = zip(*columns) if columns else repeat((), sheet.n_rows)
+        rank = sheet.articles.rank  # Order of the articles inside a section
 
-            if isinstance(val, str) and low in NA_TOKENS:
+        for art, row_codes in zip(sheet.arts, rows):
+            if not art:
                 if cfg.treat_empty_as_error:
-                    errors.append((art, col))
-                continue
-            if is_zero_like(sval):
+                    errors.add("(empty art)", COL_ART)
                 continue
 
-            tlabel, color = section_map[col]
-            bucket[tlabel].append(
-                f"{art}\t{start_line}\t{end_line}\t{tlabel}\t0\tSIZE_PLACEHOLDER\tcolor={color}"
-            )
-
-    # 2. Calculations & Sorting
-    real_counts = {}
-    for t in sections_order:
-        if cfg.dedup:
-            bucket[t] = list(dict.fromkeys(bucket[t]))
-        if cfg.sort_in_section:
+            for col, (tlabel, line_end), code in zip(cols_to_check, targets, row_codes):
+                if code == CELL_PRESENT:
+                    bucket[tlabel].append((rank[art], art + line_end))
+                elif code == CELL_ZERO:
+                    continue
+                elif code == CELL_UNSPECIFIED and cfg.special_na:
+                    bucket[tlabel_na].append((rank[art], art + na_end))
+                elif cfg.treat_empty_as_error:  # Empty, NA or "???" without special_na
+                    errors.add(art, col)
 
-            def art_key(line: str):
-                parts = line.split("\t")
-                a = parts[0]
-                m = re.match(r"^art(\d+)", a)
-                return (0, int(m.group(1))) if m else (1, a.lower())
+    METRICS.snapshot(f"{cfg.subdir}/populate")
+    METRICS.retained(cfg.subdir, df=sheet.df, bucket=bucket, errors=errors)
 
-            bucket[t] = sorted(bucket[t], key=art_key)
-        real_counts[t] = len(bucket[t])
+    # 2. Calculations & Sorting
+    with METRICS.span("sort"):
+        real_counts = {}
+        for t in sections_order:
+            if cfg.dedup:
+                bucket[t] = list(dict.fromkeys(bucket[t]))
+            if cfg.sort_in_section:
+                bucket[t].sort(key=itemgetter(0))  # Stable, by article rank
+            bucket[t] = [line for _, line in bucket[t]]
+            real_counts[t] = len(bucket[t])
 
     # 3. Scaling & Boundaries
-    scaled_sizes = {}
-    active_labels = []
-
-    for t in sections_order:
-        count = real_counts[t]
-        if count == 0:
-            scaled_sizes[t] = 0
-            continue
-
-        active_labels.append(t)
-
-        if global_max == global_min:
-            scaled_size = VISUAL_MAX_SIZE
-        else:
-            scaled_size = int(
-                VISUAL_MIN_SIZE
-                + (count - global_min)
-                * (VISUAL_MAX_SIZE - VISUAL_MIN_SIZE)
-                / (global_max - global_min)
-            )
-
-        scaled_sizes[t] = scaled_size
+    with METRICS.span("scale"):
+        sizes = scale_sizes(
+            [real_counts[t] for t in sections_order],
+            reference=global_counts,
+            strategy=cfg.scaling or SCALING_STRATEGY,
+            vmin=VISUAL_MIN_SIZE,
+            vmax=VISUAL_MAX_SIZE,
+        )
+        scaled_sizes = {t: int(size) for t, size in zip(sections_order, sizes)}
+        active_labels = [t for t in sections_order if real_counts[t] > 0]
 
-        new_lines = []
-        for line in bucket[t]:
-            new_lines.append(line.replace("SIZE_PLACEHOLDER", str(scaled_size)))
-        bucket[t] = new_lines
+        for t in active_labels:
+            size_str = str(scaled_sizes[t])
+            bucket[t] = [
+                line.replace("SIZE_PLACEHOLDER", size_str) for line in bucket[t]
+            ]
 
     # 4. Writing files
-    base_path = Path(OUTPUT_DIR) / cfg.subdir
-    base_path.parent.mkdir(parents=True, exist_ok=True)
-
-    f_links = base_path.with_name(f"{cfg.subdir}.links.txt")
-    f_nums = base_path.with_name(f"{cfg.subdir}.numbers.txt")
-    f_data = base_path.with_name(f"{cfg.subdir}.data.txt")
-
-    with f_links.open("w", encoding="utf-8", newline="") as fw:
-        for t in sections_order:
-            if not bucket[t]:
-                continue
-            fw.write(f"# {t} (Real: {real_counts[t]}, Scaled: {scaled_sizes[t]})\n")
-            fw.writelines(line + "\n" for line in bucket[t])
-        if errors:
-            fw.write("\n# ERRORS\n")
-            for art, col in errors:
-                fw.write(f"{art}\t{col}\t<empty>\n")
-
-    with f_nums.open("w", encoding="utf-8", newline="") as fw:
-        for t in sections_order:
-            if scaled_sizes[t] > 0:
-                fw.write(f"{t}\t0\t{scaled_sizes[t]}\t{real_counts[t]} color=black\n")
-
-    with f_data.open("w", encoding="utf-8", newline="") as fw:
-        fw.write("# chr - CHRNAME CHRLABEL START END COLOR\n")
-        meta_info = {
-            s.tlabel: (s.tlabel.replace("type", ""), s.color) for s in cfg.sections
-        }
-        if cfg.special_na:
-            meta_info[tlabel_na] = (tlabel_na.replace("type", ""), color_na)
+    with METRICS.span("write"):
+        base_path = Path(OUTPUT_DIR) / cfg.subdir
+        base_path.parent.mkdir(parents=True, exist_ok=True)
+
+        f_links = base_path.with_name(f"{cfg.subdir}.links.txt")
+        f_nums = base_path.with_name(f"{cfg.subdir}.numbers.txt")
+        f_data = base_path.with_name(f"{cfg.subdir}.data.txt")
+        f_report = base_path.with_name(f"{cfg.subdir}.validation.txt")
+
+        with f_links.open("w", encoding="utf-8", newline="") as fw:
+            for t in sections_order:
+                if not bucket[t]:
+                    continue
+                fw.write(f"# {t} (Real: {real_counts[t]}, Scaled: {scaled_sizes[t]})\n")
+                fw.writelines(line + "\n" for line in bucket[t])
+
+        with f_nums.open("w", encoding="utf-8", newline="") as fw:
+            for t in sections_order:
+                if scaled_sizes[t] > 0:
+                    fw.write(
+                        f"{t}\t0\t{scaled_sizes[t]}\t{real_counts[t]} color=black\n"
+                    )
 
-        for t in sections_order:
-            if t not in meta_info or scaled_sizes[t] == 0:
-                continue
-            pretty, color = meta_info[t]
-            fw.write(f"chr -\t{t}\t{pretty}\t0\t{scaled_sizes[t]}\t{color}\n")
+        with f_data.open("w", encoding="utf-8", newline="") as fw:
+            fw.write("# chr - CHRNAME CHRLABEL START END COLOR\n")
+            meta_info = {
+                s.tlabel: (s.tlabel.replace("type", ""), s.color) for s in cfg.sections
+            }
+            if cfg.special_na:
+                meta_info[tlabel_na] = (tlabel_na.replace("type", ""), color_na)
+
+            for t in sections_order:
+                if t not in meta_info or scaled_sizes[t] == 0:
+                    continue
+                pretty, color = meta_info[t]
+                fw.write(f"chr -\t{t}\t{pretty}\t0\t{scaled_sizes[t]}\t{color}\n")
+
+        if errors.write(f_report, title=f"{cfg.name} ({cfg.subdir})"):
+            print(f"⚠️  {len(errors)} empty cells reported (see {f_report.name})")
+
+    METRICS.record(
+        cfg.subdir,
+        rows=sheet.n_rows,
+        links={t: real_counts[t] for t in sections_order},
+        links_total=sum(real_counts.values()),
+        errors=len(errors),
+        bytes={
+            f.name: f.stat().st_size
+            for f in (f_links, f_nums, f_data, f_report)
+            if f.exists()
+        },
+    )
 
     # Returns the boundaries for the config file
     if active_labels:
@@ -453,75 +590,184 @@ tasks_config = TrackConfig(
 #           MAIN EXECUTION
 # ==========================================
 
-if __name__ == "__main__":
 
-    # 4. EXECUTION ORDER CHOICE (MODIFY ORDER HERE)
-    ACTIVE_TRACKS = [
-        gmfcs_config,
-        cp_type_config,
-        laterality_config,
-        tools_config,
-        assessment_type_config,
-        tasks_config,
-    ]
+def run_pipeline(active_tracks: List[TrackConfig]) -> None:
+    """Runs all phases for the active tracks, timed in METRICS."""
+    METRICS.reset()
+    METRICS.record("run", excel_path=EXCEL_PATH, tracks=len(active_tracks))
 
     print("\n=== PHASE 0: Generating Articles Karyotype ===")
-    generate_articles_karyotype(
-        excel_path=EXCEL_PATH,
-        sheet_idx=SHEET_IDX,
-        output_dir=OUTPUT_DIR,
-        col_art=COL_ART,
-        col_ref=COL_REF,
-        end_value=60,  # You can adjust default article size here
-    )
+    with METRICS.span("phase0_karyotype", snapshot=True):
+        with METRICS.span("load"):
+            sheet = load_sheet()  # Read once, reused by all phases
+        generate_articles_karyotype(
+            excel_path=EXCEL_PATH,
+            sheet_idx=SHEET_IDX,
+            output_dir=OUTPUT_DIR,
+            col_art=COL_ART,
+            col_ref=COL_REF,
+            end_value=60,  # You can adjust default article size here
+            index=sheet.articles,
+        )
 
     print("\n=== PHASE 1: Global Analysis (Min/Max Calculation) ===")
     all_counts = []
 
-    for cfg in ACTIVE_TRACKS:
-        print(f"Scanning: {cfg.name}...")
-        counts_dict = get_counts_for_config(cfg)
-        valid_vals = [v for v in counts_dict.values() if v > 0]
-        all_counts.extend(valid_vals)
+    with METRICS.span("phase1_counts", snapshot=True):
+        for cfg in active_tracks:
+            print(f"Scanning: {cfg.name}...")
+            with METRICS.span(cfg.subdir):
+                counts_dict = get_counts_for_config(cfg)
+            valid_vals = [v for v in counts_dict.values() if v > 0]
+            all_counts.extend(valid_vals)
 
     if not all_counts:
-        GLOBAL_MIN, GLOBAL_MAX = 0, 1
+        global_min, global_max = 0, 1
         print("[INFO] No data found.")
     else:
-        GLOBAL_MIN = min(all_counts)
-        GLOBAL_MAX = max(all_counts)
+        global_min = min(all_counts)
+        global_max = max(all_counts)
 
-    print(f"\n>>> GLOBAL BOUNDARIES: Min={GLOBAL_MIN}, Max={GLOBAL_MAX}")
-    print(f">>> VISUAL TARGET: [{VISUAL_MIN_SIZE} - {VISUAL_MAX_SIZE}]\n")
+    print(f"\n>>> GLOBAL BOUNDARIES: Min={global_min}, Max={global_max}")
+    print(f">>> VISUAL TARGET: [{VISUAL_MIN_SIZE} - {VISUAL_MAX_SIZE}]")
+    print(f">>> SCALING: {SCALING_STRATEGY}\n")
 
     print("=== PHASE 2: Generation & Boundary Extraction ===")
     boundary_map = {}
 
-    # Article Boundaries
-    first_art, last_art = get_article_boundaries()
-    if first_art:
-        print(f"Articles: {first_art} -> {last_art}")
-        boundary_map["articles"] = (first_art, last_art)
+    with METRICS.span("phase2_tracks", snapshot=True):
+        # Article Boundaries
+        with METRICS.span("article_boundaries"):
+            first_art, last_art = get_article_boundaries()
+        if first_art:
+            print(f"Articles: {first_art} -> {last_art}")
+            boundary_map["articles"] = (first_art, last_art)
 
-    # Track Boundaries
-    start_art_line = 0
-    end_art_line = 9
+        # Track Boundaries
+        start_art_line = 0
+        end_art_line = 9
 
-    for cfg in ACTIVE_TRACKS:
-        print(f"Processing: {cfg.name}")
-        first_lbl, last_lbl = build_track(
-            cfg, start_art_line, end_art_line, GLOBAL_MIN, GLOBAL_MAX
-        )
+        for cfg in active_tracks:
+            print(f"Processing: {cfg.name}")
+            with METRICS.span(cfg.subdir):
+                first_lbl, last_lbl = build_track(
+                    cfg, start_art_line, end_art_line, all_counts
+                )
 
-        if first_lbl and last_lbl:
-            boundary_map[cfg.subdir] = (first_lbl, last_lbl)
+            if first_lbl and last_lbl:
+                boundary_map[cfg.subdir] = (first_lbl, last_lbl)
 
-        start_art_line = end_art_line + 1
-        end_art_line = start_art_line + 9
+            start_art_line = end_art_line + 1
+            end_art_line = start_art_line + 9
 
     print("\n=== PHASE 3: Automatic creation of circos.conf ===")
-    generate_circos_conf(
-        output_dir=OUTPUT_DIR, active_tracks=ACTIVE_TRACKS, boundary_map=boundary_map
+    with METRICS.span("phase3_conf", snapshot=True):
+        if PRECOMPUTE_LABELS:
+            with METRICS.span("label_layout"):
+                write_label_layout(
+                    output_dir=OUTPUT_DIR,
+                    active_tracks=active_tracks,
+                    boundary_map=boundary_map,
+                )
+        generate_circos_conf(
+            output_dir=OUTPUT_DIR,
+            active_tracks=active_tracks,
+            boundary_map=boundary_map,
+        )
+
+    if WRITE_PREVIEW:
+        with METRICS.span("preview"):
+            generate_preview_svg(
+                output_dir=OUTPUT_DIR,
+                active_tracks=active_tracks,
+                boundary_map=boundary_map,
+            )
+
+    if RUN_RENDER:
+        print("\n=== PHASE 4: Circos rendering ===")
+        with METRICS.span("phase4_render"):
+            render_cache = (
+                RenderCache(
+                    Path(OUTPUT_DIR).parent / RENDER_CACHE_DIR,
+                    max_bytes=RENDER_CACHE_MAX_MB * 1024 * 1024,
+                )
+                if RENDER_CACHE_DIR
+                else None
+            )
+            render_results = render_all(
+                RENDER_QUEUE or [OUTPUT_DIR],
+                command=CIRCOS_COMMAND,
+                max_workers=RENDER_WORKERS,
+                cache=render_cache,
+            )
+        print_summary(render_results)
+
+
+def output_path(path) -> str | None:
+    """Resolves a relative output file in the current OUTPUT_DIR."""
+    return str(Path(OUTPUT_DIR) / path) if path else None
+
+
+def main(active_tracks: List[TrackConfig], argv=None) -> None:
+    profile_path = output_path(PROFILE_PATH)
+    parser = argparse.ArgumentParser(description="Generates the Circos input files.")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=profile_path,
+        metavar="PATH",
+        help=f"Profile the run with cProfile and dump the stats (default: {profile_path})",
+    )
+    parser.add_argument(
+        "--metrics",
+        default=output_path(METRICS_PATH),
+        metavar="PATH",
+        help="JSON file of timings and per-track counters",
     )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Trace allocations: peak memory per phase/track, top allocation sites",
+    )
+    args = parser.parse_args(argv)
+
+    if args.memory_report:
+        METRICS.start_memory()
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        run_pipeline(active_tracks)
+    finally:
+        if profiler:
+            profiler.disable()
+        if args.memory_report:
+            METRICS.stop_memory()
+
+    print("\n=== Timing ===")
+    METRICS.print_summary()
+    if args.metrics:
+        print(f"📄 Metrics written to: {METRICS.write_json(args.metrics)}")
+    if profiler:
+        Path(args.profile).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(args.profile)
+        print("\n=== Profile (top 15, cumulative) ===")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+        print(f"📄 Profile written to: {args.profile}")
 
     print("\n✅ Completed successfully.")
+
+
+if __name__ == "__main__":
+
+    # 4. EXECUTION ORDER CHOICE (MODIFY ORDER HERE)
+    ACTIVE_TRACKS = [
+        gmfcs_config,
+        cp_type_config,
+        laterality_config,
+        tools_config,
+        assessment_type_config,
+        tasks_config,
+    ]
+
+    main(ACTIVE_TRACKS)
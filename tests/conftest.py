@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scripts live at the root of the repository (no package)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,59 @@
+from circos_autocode import AUTOCODE_TRACKS, build_matcher, section_columns
+
+COLUMNS = section_columns(AUTOCODE_TRACKS)
+
+
+def coded(text):
+    return {COLUMNS[i] for i in build_matcher(COLUMNS).labels(text)}
+
+
+def test_specific_names_and_synonyms_are_found():
+    text = "Surface EMG and force-plate data during stair climbing in spastic diplegia"
+    assert {"EMG", "Force-plate", "Stair-negotiation", "Spastic", "Diplegic"} <= coded(
+        text
+    )
+
+
+def test_generic_column_names_are_not_searched():
+    text = (
+        "A mixed model was used. The score of the game was stable; stability "
+        "and metabolic rate were reported in a mixed cohort."
+    )
+    found = coded(text)
+    for col in ("Mixed", "Score", "Game", "Stability", "Metabolic"):
+        assert col not in found
+
+
+def test_generic_columns_are_found_through_their_synonyms():
+    found = coded("Postural sway, energy cost and the GMFM during an exergame")
+    assert {"Stability", "Metabolic", "Score", "Game"} <= found
+
+
+def test_common_words_of_prose_are_not_coded():
+    text = (
+        "A run of trials struck a balance between cost and power; each jump "
+        "in the data was checked, with a tug on the cable and a short hop."
+    )
+    found = coded(text)
+    for col in ("Running", "Stability", "Jumping", "Time-Up-and-Go", "Hopping"):
+        assert col not in found
+
+
+def test_qualified_phrases_are_coded():
+    found = coded(
+        "Timed Up and Go, single-leg hop, countermovement jump, a running "
+        "test and standing balance were assessed"
+    )
+    assert {"Time-Up-and-Go", "Hopping", "Jumping", "Running", "Stability"} <= found
+
+
+def test_gmfcs_ranges_code_every_level_they_cover():
+    assert coded("Children at GMFCS I-III were included") >= {
+        "GMFCS-I",
+        "GMFCS-II",
+        "GMFCS-III",
+    }
+    found = coded("GMFCS levels II to IV")
+    assert {"GMFCS-II", "GMFCS-III", "GMFCS-IV"} <= found
+    assert "GMFCS-I" not in found
+    assert coded("GMFCS level III") & {"GMFCS-I", "GMFCS-II", "GMFCS-IV"} == set()
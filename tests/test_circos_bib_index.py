@@ -0,0 +1,72 @@
+import csv
+
+import pytest
+
+import circos_bib_index as index
+import circos_extract_name_bibfile as bib
+
+ENTRY = """
+@article{smith,
+  title = {Treadmill gait in cerebral palsy},
+  author = {Smith, J.},
+  year = {2020}
+}
+"""
+OTHER = """
+@article{lee,
+  title = {Balance training},
+  author = {Lee, K.},
+  year = {2021},
+  abstract = {Treadmill and IMU.}
+}
+"""
+
+
+def extractor_refs(bib_path, out, *flags):
+    bib.main([str(bib_path), "-o", str(out), "--no-cache", *flags])
+    with out.open(encoding="utf-8", newline="") as fr:
+        return sorted(row[0] for row in list(csv.reader(fr))[1:])
+
+
+def index_refs(conn):
+    rows = conn.execute("SELECT ref FROM entries WHERE dup = 0 AND ref != ''")
+    return sorted(ref for (ref,) in rows)
+
+
+@pytest.mark.parametrize("deduplicate", [True, False])
+def test_index_has_the_rows_of_the_extractor(tmp_path, deduplicate):
+    # The same block exported twice (e.g. two overlapping exports)
+    bib_path = tmp_path / "export.bib"
+    bib_path.write_text(ENTRY + OTHER + ENTRY, encoding="utf-8")
+    flags = [] if deduplicate else ["--keep-duplicates"]
+    expected = extractor_refs(bib_path, tmp_path / "refs.csv", *flags)
+
+    conn = index.open_index(tmp_path / "index.sqlite")
+    try:
+        index.ensure_fresh(conn, [bib_path], deduplicate)
+        assert index_refs(conn) == expected
+        n = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        assert n == 3  # One entry per exported block, duplicates flagged
+        found = [ref for ref, _ in index.search(conn, "treadmill")]
+        assert sorted(found) == expected
+    finally:
+        conn.close()
+
+    assert expected == (
+        ["Lee 2021", "Smith 2020"]
+        if deduplicate
+        else ["Lee 2021", "Smith 2020a", "Smith 2020b"]
+    )
+
+
+def test_changing_the_duplicate_setting_refreshes_the_index(tmp_path):
+    bib_path = tmp_path / "export.bib"
+    bib_path.write_text(ENTRY + ENTRY, encoding="utf-8")
+    conn = index.open_index(tmp_path / "index.sqlite")
+    try:
+        index.ensure_fresh(conn, [bib_path], True)
+        assert index_refs(conn) == ["Smith 2020"]
+        index.ensure_fresh(conn, [bib_path], False)
+        assert index_refs(conn) == ["Smith 2020a", "Smith 2020b"]
+    finally:
+        conn.close()
@@ -0,0 +1,234 @@
+import csv
+
+import pandas as pd
+import pytest
+
+import circos_extract_name_bibfile as bib
+
+BIB = """
+@article{a1,
+  title = {Gait in cerebral palsy},
+  author = {Smith, J.},
+  year = {2020},
+  doi = {10.1000/a1}
+}
+@article{a2,
+  title = {Balance training},
+  author = {Lee, K. and Park, S.},
+  year = {2021}
+}
+"""
+
+
+def read_csv(path):
+    with path.open(encoding="utf-8", newline="") as fr:
+        return list(csv.reader(fr))
+
+
+def test_parse_cache_follows_the_output_path(tmp_path):
+    bib_path = tmp_path / "export.bib"
+    bib_path.write_text(BIB, encoding="utf-8")
+    out = tmp_path / "other" / "refs.csv"
+    out.parent.mkdir()
+
+    bib.main([str(bib_path), "-o", str(out)])
+
+    assert (tmp_path / "other" / "refs.parse_cache.json").is_file()
+    assert [row[0] for row in read_csv(out)[1:]] == ["Lee & Park 2021", "Smith 2020"]
+
+
+def row(ref, doi, key="gait in cp|2020|smith"):
+    return (ref, "Gait in CP", doi, key)
+
+
+def test_same_title_with_different_dois_is_kept():
+    rows = [row("Smith 2020", "10.1000/editorial"), row("Smith 2020", "10.1000/paper")]
+    assert list(bib.drop_duplicates(rows)) == rows
+
+
+def test_same_title_is_merged_when_a_doi_is_missing_or_equal():
+    first = row("Smith 2020", "10.1000/paper")
+    rows = [first, row("Smith 2020", ""), row("Smith 2020", "10.1000/paper")]
+    assert list(bib.drop_duplicates(rows)) == [first]
+
+    no_doi = row("Smith 2020", "")
+    assert list(bib.drop_duplicates([no_doi, first])) == [no_doi]
+
+
+def test_same_doi_with_another_title_is_merged():
+    first = row("Smith 2020", "10.1000/paper")
+    other = row("Smith 2020", "10.1000/paper", key="gait in children|2020|smith")
+    assert list(bib.drop_duplicates([first, other])) == [first]
+
+
+NON_ASCII_BIB = (
+    "@é{k1, title = {Entry type with an accent}}\n"
+    "@ article{k2, title = {NBSP after the at sign}, year = {2020}}\n"
+    "@article {k3, title = {NBSP before the brace}}\n"
+    "@artïcle{Müller2021, title = {Ünïcode key}, author = {Müller, A.}}\n"
+    "@misc{k5, note = {Contact: test@é.org, or @ x{y,}}, title = {Mail}}\n"
+    "@book{k6, title = {Last}}\n"
+)
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "cp1252"])
+def test_mmap_and_text_paths_agree_on_non_ascii_headers(tmp_path, encoding):
+    path = tmp_path / "export.bib"
+    path.write_text(NON_ASCII_BIB, encoding=encoding)
+    text = bib.read_text_smart(path)
+
+    assert list(bib.iter_entries_mmap(path)) == list(bib.iter_entries(text))
+    assert list(bib.iter_blocks_mmap(path)) == list(bib.iter_blocks(text))
+    assert len(list(bib.iter_blocks(text))) == 6
+
+
+@pytest.mark.parametrize(
+    "latex, text",
+    [
+        ('M{\\"u}ller', "M{ü}ller"),
+        ("\\'\\i ndex", "índex"),
+        ("\\'{\\i}ndex", "índex"),
+        ("\\'\\i{}ndex", "índex"),
+        ("Andr\\'{}e", "André"),
+        ("\\c c", "ç"),
+        ("\\ss e", "ße"),
+    ],
+)
+def test_decode_latex(latex, text):
+    assert bib.decode_latex(latex) == text
+
+
+def test_identifiers_are_not_decoded():
+    block = (
+        "@article{k, title = {Andr\\'e}, doi = {10.1000/a\\_b~c},\n"
+        "  url = {https://example.org/~smith/\\_x}, file = {C:\\\\o\\ss.pdf}}"
+    )
+    ((_, fields),) = bib.iter_entries(block)
+    assert fields["title"] == "André"
+    assert fields["doi"] == "10.1000/a\\_b~c"
+    assert fields["url"] == "https://example.org/~smith/\\_x"
+    assert fields["file"] == "C:\\\\o\\ss.pdf"
+
+
+def test_same_key_without_dois_is_merged():
+    first = row("Smith 2020", "")
+    other = row("Smith 2020", "")
+    distinct = row("Smith 2020", "", key="balance in cp|2020|smith")
+    assert list(bib.drop_duplicates([first, other, distinct])) == [first, distinct]
+
+
+def test_rows_without_keys_are_never_merged():
+    rows = [row("Smith 2020", "", key=""), row("Smith 2020", "", key="")]
+    assert list(bib.drop_duplicates(rows)) == rows
+
+
+def test_copy_without_doi_links_the_versions_seen_after_it():
+    paper = row("Smith 2020", "10.1000/paper")
+    rows = [paper, row("Smith 2020", ""), row("Smith 2020", "10.1000/editorial")]
+    assert list(bib.drop_duplicates(rows)) == [paper]
+
+
+def test_duplicates_are_merged_across_exports(tmp_path):
+    pubmed, scopus = tmp_path / "pubmed.bib", tmp_path / "scopus.bib"
+    pubmed.write_text(BIB, encoding="utf-8")
+    scopus.write_text(
+        "@article{s1, title = {Gait in Cerebral Palsy.}, author = {Smith, John},"
+        " year = {2020}, doi = {https://doi.org/10.1000/A1}}\n"
+        "@article{s2, title = {Balance Training}, author = {Lee, K. and Park, S.},"
+        " year = {2021}}\n",
+        encoding="utf-8",
+    )
+    out = tmp_path / "refs.csv"
+
+    bib.main([str(pubmed), str(scopus), "-o", str(out), "--no-cache"])
+    assert [r[0] for r in read_csv(out)[1:]] == ["Lee & Park 2021", "Smith 2020"]
+
+    bib.main(
+        [str(pubmed), str(scopus), "-o", str(out), "--no-cache", "--keep-duplicates"]
+    )
+    assert [r[0] for r in read_csv(out)[1:]] == [
+        "Lee & Park 2021a",
+        "Lee & Park 2021b",
+        "Smith 2020a",
+        "Smith 2020b",
+    ]
+
+
+def test_suffixes_for_the_same_author_and_year():
+    rows = [
+        ("Smith 2020", "A"),
+        ("Lee 2021", "B"),
+        ("Smith 2020", "C"),
+        ("", "D"),
+        ("Smith 2020", "E"),
+    ]
+    assert bib.assign_suffixes(rows) == [
+        ("Smith 2020a", "A"),
+        ("Lee 2021", "B"),
+        ("Smith 2020b", "C"),
+        ("Smith 2020c", "E"),
+    ]
+
+
+def test_suffixes_beyond_z():
+    refs = [ref for ref, _ in bib.assign_suffixes([("Smith 2020", "t")] * 28)]
+    assert refs[:2] == ["Smith 2020a", "Smith 2020b"]
+    assert refs[25:] == ["Smith 2020z", "Smith 2020aa", "Smith 2020ab"]
+
+
+def test_suffixes_carry_the_other_items():
+    rows = [("Smith 2020", "A", "10.1/a"), ("Smith 2020", "B", "10.1/b")]
+    assert bib.assign_suffixes(rows) == [
+        ("Smith 2020a", "A", "10.1/a"),
+        ("Smith 2020b", "B", "10.1/b"),
+    ]
+
+
+SINK_ROWS = [
+    ("Müller et al. 2020a", 'Gait, "crouch" and balance'),
+    ("Lee & Park 2021", "Multi-line\ntitle"),
+    ("1e5 2022", "0012"),
+    ("Ørsted 2019", ""),
+]
+
+
+def read_sink(path, fmt):
+    if fmt == "csv":
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    elif fmt == "jsonl":
+        df = pd.read_json(path, lines=True, dtype=False)
+    elif fmt == "xlsx":
+        df = pd.read_excel(path, dtype=str, keep_default_na=False)
+    else:
+        df = pd.read_parquet(path)
+    assert list(df.columns) == list(bib.HEADER)
+    return [tuple(r) for r in df.itertuples(index=False)]
+
+
+@pytest.mark.parametrize("fmt", sorted(bib.SINKS))
+def test_sink_round_trip(tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / f"refs.{fmt}"
+
+    bib.sink_for(path)(SINK_ROWS, path)
+
+    assert read_sink(path, fmt) == SINK_ROWS
+
+
+def test_parquet_is_written_in_row_groups(tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(bib, "PARQUET_ROW_GROUP", 3)
+    path = tmp_path / "refs.parquet"
+
+    bib.write_parquet(iter(SINK_ROWS * 2), path)
+
+    assert pq.ParquetFile(path).num_row_groups == 3
+    assert read_sink(path, "parquet") == SINK_ROWS * 2
+
+
+def test_sink_for_uses_the_format_then_the_extension(tmp_path):
+    assert bib.sink_for(tmp_path / "refs.CSV") is bib.write_csv
+    assert bib.sink_for(tmp_path / "refs.xlsx", "jsonl") is bib.write_jsonl
+    with pytest.raises(SystemExit):
+        bib.sink_for(tmp_path / "refs.txt")
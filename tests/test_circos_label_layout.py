@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+
+from circos_label_layout import CHAR_WIDTH, N_TIERS, assign_tiers, stagger_offsets
+
+RADIUS = 760
+FONT = 17
+MIN_SEP = FONT / RADIUS
+
+
+def test_labels_without_overlap_stay_on_the_first_tier():
+    angles = np.arange(20) * 2 * MIN_SEP
+    assert not stagger_offsets(angles, [5] * 20, RADIUS, FONT).any()
+
+
+def test_only_overlapping_labels_are_moved():
+    angles = [0.0, 0.5 * MIN_SEP, 1.0, 2.0]
+    offsets = stagger_offsets(angles, [5] * 4, RADIUS, FONT)
+    assert offsets[0] == 0 and offsets[1] > 0
+    assert offsets[2] == offsets[3] == 0
+
+
+def test_tier_is_reused_as_soon_as_it_is_free():
+    # Each label overlaps its neighbours but not the labels two steps away
+    angles = np.arange(6) * 0.6 * MIN_SEP
+    offsets = stagger_offsets(angles, [5] * 6, RADIUS, FONT)
+    assert len(set(offsets[::2])) == 1 and len(set(offsets[1::2])) == 1
+    assert offsets[0] != offsets[1]
+
+
+def test_wraparound_across_360_degrees():
+    angles = [2 * math.pi - 0.3 * MIN_SEP, 0.3 * MIN_SEP, math.pi]
+    offsets = stagger_offsets(angles, [5] * 3, RADIUS, FONT)
+    assert offsets[0] != offsets[1]
+    assert offsets[2] == 0
+
+
+def test_offsets_keep_labels_inside_the_image():
+    angles = np.arange(30) * 0.2 * MIN_SEP
+    lengths = [40] * 30
+    offsets = stagger_offsets(angles, lengths, RADIUS, FONT, max_radius=1500)
+    width = math.ceil(40 * CHAR_WIDTH * FONT)
+    assert offsets.max() > 0
+    assert (RADIUS + offsets + width <= 1500).all()
+
+
+def test_no_two_labels_of_a_tier_overlap():
+    # Clusters of up to N_TIERS overlapping labels, one across 0/360 degrees
+    rng = np.random.default_rng(0)
+    angles = []
+    for start in np.arange(-0.05, 2 * math.pi - 0.1, 4 * N_TIERS * MIN_SEP):
+        steps = rng.uniform(0.2, 0.9, rng.integers(0, N_TIERS)) * MIN_SEP
+        angles += list(start + np.concatenate(([0.0], np.cumsum(steps))))
+    rng.shuffle(angles)
+
+    tiers = assign_tiers(angles, MIN_SEP)
+    assert tiers.max() == N_TIERS - 1
+    angles = np.mod(angles, 2 * math.pi)
+    for t in range(N_TIERS):
+        same = np.sort(angles[tiers == t])
+        gaps = np.diff(same, append=same[0] + 2 * math.pi)
+        assert (gaps >= MIN_SEP).all()
@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from circos_make_articles_data import (
+    ArticleIndex,
+    art_label_from,
+    boundary_key,
+    boundary_keys,
+)
+
+
+def index_of(ids, **columns) -> ArticleIndex:
+    return ArticleIndex(pd.DataFrame({"ArtNb": ids, **columns}), "ArtNb")
+
+
+def test_rank_orders_numeric_ids_first_then_names():
+    idx = index_of(["Art 10", 2, "art3", "foo", "Bar"])
+
+    ranked = sorted(idx.rank, key=idx.rank.get)
+    assert ranked == ["art2", "art3", "art10", "artBar", "artfoo"]
+    assert sorted(idx.rank.values()) == list(range(5))
+
+
+def test_equal_keys_share_a_rank():
+    idx = index_of(["art05", 5, "Art 5", "artFoo", "foo", 1])
+
+    assert idx.rank["art05"] == idx.rank["art5"] == 1
+    assert idx.rank["artFoo"] == idx.rank["artfoo"] == 2
+    assert idx.rank["art1"] == 0
+
+
+def test_boundaries_on_mixed_int_and_art_labels():
+    # Ties: first occurrence of the smallest, last occurrence of the largest
+    idx = index_of([None, 3, "Art 1", "art07", "art01", "Art 7", ""])
+
+    assert (idx.first, idx.last) == ("art1", "art7")
+
+
+def test_boundaries_when_first_and_last_are_the_end_rows():
+    idx = index_of([1, "Art 4", 2, "Art 9"])
+    assert (idx.first, idx.last) == ("art1", "art9")
+
+    idx = index_of(["Art 9", 4, 2, "art1"])
+    assert (idx.first, idx.last) == ("art1", "art9")
+
+
+def test_non_numeric_ids_count_as_zero():
+    idx = index_of([2, "intro", 5, "extra"])
+    assert (idx.first, idx.last) == ("artintro", "art5")
+
+
+def test_boundaries_of_an_all_numeric_sheet_use_the_column_labels():
+    idx = index_of([3, 1, 12], EMG=[1.0, 0.0, 1.0])
+
+    assert idx.labels == ["art3.0", "art1.0", "art12.0"]  # Rows give floats
+    assert (idx.first, idx.last) == ("art1", "art12")
+
+
+def test_no_article():
+    idx = index_of([" ", ""])
+    assert (idx.first, idx.last) == (None, None)
+    assert ArticleIndex(pd.DataFrame({"ref": ["a"]}), "ArtNb").first is None
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_boundaries_match_a_stable_sort(seed):
+    rng = random.Random(seed)
+    ids = [
+        rng.choice([rng.randint(1, 30), f"Art {rng.randint(1, 30)}", "x", None])
+        for _ in range(60)
+    ]
+    labels = [art_label_from(v) for v in ids]
+    labels = sorted((label for label in labels if label), key=boundary_key)
+
+    idx = index_of(ids)
+    assert (idx.first, idx.last) == (labels[0], labels[-1])
+
+
+def test_boundary_keys_match_boundary_key():
+    labels = ["art12", "art012", "art3.0", "artfoo", "art", "Art5", "art99x"]
+    expected = [boundary_key(label) for label in labels]
+    assert boundary_keys(labels).tolist() == expected
+    assert boundary_keys(np.array(labels, dtype=object)).dtype == np.int64
@@ -0,0 +1,29 @@
+import pytest
+
+from circos_metrics import RunMetrics
+
+MB = 1024 * 1024
+
+
+def test_peak_rss_is_recorded_per_span():
+    metrics = RunMetrics()
+    if not metrics.start_rss():
+        pytest.skip("Resident memory mode needs /proc/self/clear_refs (Linux)")
+    with metrics.span("big"):
+        block = b"x" * (200 * MB)
+        del block
+    with metrics.span("small"):
+        pass
+    metrics.stop_rss()
+
+    big, small = metrics.root.children
+    assert big.peak_rss_bytes - small.peak_rss_bytes > 150 * MB
+    assert metrics.root.peak_rss_bytes >= big.peak_rss_bytes
+    assert metrics.to_dict()["spans"][0]["peak_rss_bytes"] == big.peak_rss_bytes
+
+
+def test_spans_have_no_memory_fields_by_default():
+    metrics = RunMetrics()
+    with metrics.span("phase"):
+        pass
+    assert set(metrics.to_dict()["spans"][0]) == {"name", "seconds"}
@@ -0,0 +1,50 @@
+from circos_preview import (
+    ideogram_layout,
+    ideogram_scale,
+    parse_chromosomes_scale,
+    read_chromosomes_scale,
+    read_karyotype,
+)
+
+
+def test_regex_is_searched_anywhere_in_the_id():
+    rules = parse_chromosomes_scale("/art/:0.85")
+    assert ideogram_scale("art12", rules) == 0.85
+    assert ideogram_scale("typeHeart-rate-monitor", rules) == 0.85
+    assert ideogram_scale("GMFCS_I", rules) == 1.0
+
+
+def test_plain_ids_and_last_rule_wins():
+    rules = parse_chromosomes_scale("/art/:0.85, art1=2, hs1:rn")
+    assert ideogram_scale("art1", rules) == 2.0
+    assert ideogram_scale("art10", rules) == 0.85
+    assert ideogram_scale("hs1", rules) == 1.0
+
+
+def test_rules_are_read_from_the_generated_conf(tmp_path):
+    conf = tmp_path / "circos.conf"
+    conf.write_text("karyotype = a.txt\nchromosomes_scale = /^GM/:0.5\n")
+    rules = read_chromosomes_scale(conf)
+    assert ideogram_scale("GMFCS_I", rules) == 0.5
+    assert ideogram_scale("art1", rules) == 1.0
+    # No conf yet: same rules as circos_conf_builder
+    assert ideogram_scale("art1", read_chromosomes_scale(tmp_path / "none")) == 0.85
+
+
+def test_layout_shrinks_every_matching_ideogram():
+    ideograms = [("art1", "A", 100, "black"), ("typeHeart", "H", 100, "black")]
+    layout = ideogram_layout(ideograms, [], {})
+    assert layout["art1"][1] == layout["typeHeart"][1]
+
+
+def test_karyotype_ids_and_labels_may_contain_spaces(tmp_path):
+    path = tmp_path / "articles.data.txt"
+    path.write_text(
+        "chr -\tart1\tSmith-2020\t0\t60\tblack\n"
+        "chr -\tArt 12b\tReview--2018-\t0\t60\tblack\n",
+        encoding="utf-8",
+    )
+    assert read_karyotype(path) == [
+        ("art1", "Smith-2020", 60, "black"),
+        ("Art 12b", "Review--2018-", 60, "black"),
+    ]
@@ -0,0 +1,62 @@
+from circos_ref_join import FUZZY_THRESHOLD, RefIndex
+
+TITLE = "Treadmill training improves gait speed in children with cerebral palsy"
+RECORDS = [
+    ("Smith 2020", TITLE, "10.1000/ABC"),
+    ("Lee 2021", "Balance control during stair descent", ""),
+    ("Park 2019a", "Energy cost of walking", "10.1000/dup"),
+    ("Park 2019b", "Energy cost of walking", "10.1000/dup"),
+]
+
+
+def test_doi_hit():
+    index = RefIndex(RECORDS)
+    assert index.match("Another title", "https://doi.org/10.1000/abc") == (
+        "Smith 2020",
+        "doi",
+    )
+
+
+def test_exact_normalized_title_hit():
+    index = RefIndex(RECORDS)
+    assert index.match("BALANCE control, during stair-descent!") == (
+        "Lee 2021",
+        "title",
+    )
+
+
+def test_fuzzy_hit_above_the_threshold():
+    ref, method = RefIndex(RECORDS).match(TITLE.replace("improves", "improve"))
+    assert ref == "Smith 2020"
+    assert method.startswith("fuzzy") and float(method[7:11]) >= FUZZY_THRESHOLD
+
+
+def test_fuzzy_below_the_threshold_is_not_filled():
+    index = RefIndex(RECORDS)
+    assert index.match("Treadmill training in adults after stroke") == (None, "")
+
+
+def test_ambiguous_doi_and_title_are_not_filled():
+    index = RefIndex(RECORDS)
+    assert index.match("", "10.1000/dup") == (None, "ambiguous doi")
+    assert index.match("Energy cost of walking") == (None, "ambiguous title")
+
+
+def test_fuzzy_tie_is_not_filled():
+    records = [
+        ("A 2001", TITLE + " a", ""),
+        ("B 2002", TITLE + " b", ""),
+    ]
+    assert RefIndex(records).match(TITLE) == (None, "")
+
+
+def test_best_match_is_found_among_many_partial_candidates():
+    # Long titles containing the whole query share more of its rare trigrams
+    # than the real (misspelled) match, but have a much lower Dice
+    decoys = [
+        (f"Decoy {i}", f"{TITLE} and {i:03d} other very long unrelated words", "")
+        for i in range(80)
+    ]
+    records = decoys + [("Smith 2020", TITLE.replace("palsy", "pasly"), "")]
+    ref, method = RefIndex(records).match(TITLE)
+    assert (ref, method[:5]) == ("Smith 2020", "fuzzy")
@@ -0,0 +1,65 @@
+import os
+import stat
+
+import pytest
+
+from circos_render import format_summary, render_all, render_one
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="Uses a POSIX shell script")
+
+
+def make_stub(tmp_path, body: str, executable: bool = True):
+    """Shell script standing in for Circos (used as CIRCOS_COMMAND)."""
+    script = tmp_path / "circos_stub.sh"
+    script.write_text(f"#!/bin/sh\n{body}\n", encoding="utf-8")
+    if executable:
+        script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return [str(script), "-conf", "{conf}"]
+
+
+def make_output_dir(tmp_path, name="out"):
+    out = tmp_path / name
+    out.mkdir()
+    (out / "circos.conf").write_text("<image>\n</image>\n", encoding="utf-8")
+    return out
+
+
+def test_success(tmp_path):
+    out = make_output_dir(tmp_path)
+    command = make_stub(tmp_path, 'test "$2" = circos.conf && echo png > circos.png')
+    result = render_one(out, command)
+    assert result.ok
+    assert result.command[-1] == "circos.conf"
+    assert (out / "circos.png").read_text().strip() == "png"
+
+
+def test_failure(tmp_path):
+    out = make_output_dir(tmp_path)
+    command = make_stub(tmp_path, "echo 'bad conf' >&2; exit 3")
+    result = render_one(out, command)
+    assert not result.ok
+    assert result.returncode == 3
+    assert "bad conf" in result.stderr
+
+
+def test_timeout(tmp_path):
+    out = make_output_dir(tmp_path)
+    command = make_stub(tmp_path, "exec sleep 5")
+    result = render_one(out, command, timeout=0.2)
+    assert result.returncode is None
+    assert "Timeout" in result.stderr
+
+
+def test_os_errors_are_failed_renders(tmp_path):
+    ok_dir = make_output_dir(tmp_path, "ok")
+    bad_dir = make_output_dir(tmp_path, "bad")
+    not_executable = make_stub(tmp_path, "exit 0", executable=False)
+    missing = [str(tmp_path / "no_such_circos"), "-conf", "{conf}"]
+
+    results = render_all([bad_dir, ok_dir], command=not_executable)
+    assert [r.returncode for r in results] == [None, None]
+    assert all(r.stderr for r in results)  # PermissionError message
+
+    result = render_one(ok_dir, missing)
+    assert result.returncode is None and not result.ok
+    assert "0/2 renders succeeded" in format_summary(results)
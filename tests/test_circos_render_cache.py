@@ -0,0 +1,86 @@
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from circos_render import render_one
+from circos_render_cache import RenderCache, image_outputs, referenced_inputs
+
+GENERATED_IMAGE_BLOCK = """
+<image>
+    dir* = .
+    radius* = 1500p
+    svg* = yes
+    <<include etc/image.conf>>
+</image>
+"""
+
+
+def write_conf(directory: Path, image_block: str) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    conf = directory / "circos.conf"
+    conf.write_text(f"karyotype = articles.data.txt\n{image_block}\n", encoding="utf-8")
+    (directory / "articles.data.txt").write_text("chr -\tart1\tA\t0\t1\tblack\n")
+    return conf
+
+
+def test_generated_conf_uses_circos_defaults(tmp_path):
+    conf = write_conf(tmp_path, GENERATED_IMAGE_BLOCK)
+    assert image_outputs(conf) == [Path("circos.svg"), Path("circos.png")]
+
+
+def test_image_block_parameters(tmp_path):
+    conf = write_conf(
+        tmp_path,
+        "<image>\n  dir = figs\n  file = review.png\n  file* = final.png\n"
+        "  png = no # SVG only\n</image>\n",
+    )
+    assert image_outputs(conf) == [Path("figs/final.svg")]
+
+
+def test_local_include_inside_image_block(tmp_path):
+    (tmp_path / "image_local.conf").write_text("file = poster\nsvg = no\n")
+    conf = write_conf(tmp_path, "<image>\n<<include image_local.conf>>\n</image>\n")
+    assert image_outputs(conf) == [Path("poster.png")]
+
+
+def test_file_outside_image_block_is_ignored(tmp_path):
+    conf = write_conf(tmp_path, "<plots>\n<plot>\nfile = a.txt\n</plot>\n</plots>\n")
+    assert image_outputs(conf) == [Path("circos.svg"), Path("circos.png")]
+
+
+def test_commented_out_inputs_are_ignored(tmp_path):
+    (tmp_path / "local.conf").write_text("<plot>\nfile = kept.txt\n</plot>\n")
+    conf = write_conf(
+        tmp_path,
+        "<plots>\n<plot>\n# file = old.txt\nfile = a.txt # current data\n</plot>\n"
+        "</plots>\n#<<include missing.conf>>\n<<include local.conf>>\n",
+    )
+    assert referenced_inputs(conf) == [
+        tmp_path / "articles.data.txt",
+        tmp_path / "a.txt",
+        tmp_path / "local.conf",
+        tmp_path / "kept.txt",
+    ]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Uses a POSIX shell script")
+def test_render_is_restored_under_configured_names(tmp_path):
+    out = tmp_path / "out"
+    write_conf(
+        out, "<image>\n  dir = figs\n  file = review.png\n  svg = no\n</image>\n"
+    )
+    stub = tmp_path / "circos_stub.sh"
+    stub.write_text("#!/bin/sh\nmkdir -p figs && echo img > figs/review.png\n")
+    stub.chmod(stub.stat().st_mode | stat.S_IXUSR)
+    cache = RenderCache(tmp_path / "cache")
+
+    first = render_one(out, [str(stub)], cache=cache)
+    assert first.ok and not first.cached
+
+    (out / "figs" / "review.png").unlink()
+    second = render_one(out, [str(stub)], cache=cache)
+    assert second.cached
+    assert (out / "figs" / "review.png").read_text().strip() == "img"
+    assert not (out / "circos.png").exists()
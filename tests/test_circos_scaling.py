@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from circos_scaling import STRATEGIES, scale_sizes
+
+VMIN, VMAX = 70, 400
+REFERENCE = [1, 2, 3, 5, 8, 13, 21, 34, 53]
+
+
+def sizes(counts, strategy, reference=REFERENCE):
+    return scale_sizes(
+        counts, reference=reference, strategy=strategy, vmin=VMIN, vmax=VMAX
+    ).tolist()
+
+
+def test_linear_matches_the_historical_formula():
+    old_min, old_max = 1, 53
+    counts = list(range(old_min, old_max + 1))
+    expected = [
+        int(VMIN + (x - old_min) * (VMAX - VMIN) / (old_max - old_min)) for x in counts
+    ]
+    assert sizes(counts, "linear", reference=[old_min, old_max]) == expected
+
+
+def test_reference_bounds_the_scaling_not_the_counts():
+    # Same count, same size, whatever the other counts of the list
+    assert sizes([10], "linear")[0] == sizes([10, 53], "linear")[0]
+    assert sizes([10], "linear", reference=None) == [VMAX]
+
+
+@pytest.mark.parametrize("strategy", ["linear", "log", "sqrt", "capped"])
+def test_reference_ends_map_to_vmin_and_vmax(strategy):
+    out = sizes([1, 53], strategy, reference=[1, 53])
+    assert out == [VMIN, VMAX]
+
+
+@pytest.mark.parametrize("strategy", ["log", "sqrt"])
+def test_compressing_strategies_are_monotonic_and_above_linear(strategy):
+    out = sizes(REFERENCE, strategy)
+    assert out == sorted(out)
+    assert all(c >= l for c, l in zip(out, sizes(REFERENCE, "linear")))
+
+
+def test_quantile_spreads_ranks_evenly():
+    out = sizes(REFERENCE, "quantile")
+    step = (VMAX - VMIN) / (len(REFERENCE) - 1)
+    assert out == [int(VMIN + i * step) for i in range(len(REFERENCE))]
+
+
+def test_capped_saturates_above_the_quantile():
+    reference = list(range(1, 21)) + [1000]
+    out = sizes([20, 1000], "capped", reference=reference)
+    assert out == [VMAX, VMAX]
+    assert sizes([1], "capped", reference=reference) == [VMIN]
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_constant_input_and_single_value_give_vmax(strategy):
+    assert sizes([7, 7, 7], strategy, reference=None) == [VMAX] * 3
+    assert sizes([7], strategy, reference=[7]) == [VMAX]
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_zero_counts_are_not_displayed(strategy):
+    assert sizes([0, 5, 0], strategy)[0::2] == [0, 0]
+    assert sizes([0, 0], strategy, reference=[]) == [0, 0]
+
+
+def test_out_of_reference_counts():
+    # Linear extrapolates like the historical formula; quantile and capped
+    # stay within [vmin, vmax]
+    assert sizes([106], "linear", reference=[1, 53])[0] > VMAX
+    assert sizes([106], "quantile") == [VMAX]
+    assert sizes([106], "capped") == [VMAX]
+    assert sizes([0, 106], "log")[1] > VMAX
+
+
+def test_unknown_strategy_is_refused():
+    with pytest.raises(ValueError):
+        scale_sizes([1], strategy="cubic")
+
+
+def test_integer_output():
+    out = scale_sizes(np.array([1, 2, 3]), strategy="sqrt")
+    assert out.dtype == np.int64
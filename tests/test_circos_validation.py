@@ -0,0 +1,100 @@
+import main
+from circos_golden import write_edge_workbook
+from circos_metrics import RunMetrics
+from circos_validation import ValidationErrors
+
+TRACK = main.TrackConfig(
+    name="Tools",
+    subdir="tools",
+    sections=[
+        main.Section("EMG", "typeEMG", "0,0,255"),
+        main.Section("IMU", "typeIMU", "0,255,0"),
+    ],
+)
+
+
+def test_counters_per_column_and_article():
+    errors = ValidationErrors()
+    for art, col in [("1", "EMG"), ("1", "IMU"), ("2", "EMG")]:
+        errors.add(art, col)
+
+    assert len(errors) == 3
+    assert errors.by_column == {"EMG": 2, "IMU": 1}
+    assert errors.by_article == {"1": 2, "2": 1}
+
+
+def test_sample_is_capped_but_counts_are_not():
+    errors = ValidationErrors(sample_size=3)
+    for i in range(10):
+        errors.add(str(i), "EMG")
+
+    assert errors.sample == [("0", "EMG"), ("1", "EMG"), ("2", "EMG")]
+    assert len(errors) == 10
+    assert len(errors.by_article) == 10
+
+
+def test_report_content(tmp_path):
+    errors = ValidationErrors(sample_size=2)
+    for art, col in [("1", "EMG"), ("1", "IMU"), ("2", "EMG")]:
+        errors.add(art, col)
+
+    path = errors.write(tmp_path / "tools.validation.txt", title="Tools (tools)")
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "# Validation report: Tools (tools)",
+        "# Empty or invalid cells: 3 (in 2 articles)",
+        "",
+        "# By column",
+        "EMG\t2",
+        "IMU\t1",
+        "",
+        "# By article (top 2)",
+        "1\t2",
+        "2\t1",
+        "",
+        "# Sample (first 2 cells)",
+        "1\tEMG\t<empty>",
+        "1\tIMU\t<empty>",
+    ]
+
+
+def test_listed_articles_are_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr("circos_validation.MAX_LISTED_ARTICLES", 2)
+    errors = ValidationErrors()
+    for i in range(5):
+        errors.add(str(i), "EMG")
+
+    text = errors.write(tmp_path / "r.txt", title="t").read_text(encoding="utf-8")
+    assert "# By article (top 2)\n0\t1\n1\t1\n# ... 3 more articles\n" in text
+
+
+def test_stale_report_is_removed(tmp_path):
+    path = tmp_path / "tools.validation.txt"
+    path.write_text("old", encoding="utf-8")
+
+    assert ValidationErrors().write(path, title="t") is None
+    assert not path.exists()
+
+
+def test_build_track_reports_empty_cells(tmp_path, monkeypatch):
+    rows = [
+        {"ArtNb": 1, "ref": "Smith 2020", "EMG": 1, "IMU": None},
+        {"ArtNb": "Art 2", "ref": "Lee 2021", "EMG": "n/a", "IMU": "???"},
+        {"ArtNb": " ", "ref": "Kim 2022", "EMG": 1, "IMU": 1},
+        {"ArtNb": 3, "ref": "Park 2023", "EMG": 0, "IMU": 1},
+    ]
+    write_edge_workbook(tmp_path / "sheet.xlsx", rows, [TRACK])
+    monkeypatch.setattr(main, "EXCEL_PATH", str(tmp_path / "sheet.xlsx"))
+    monkeypatch.setattr(main, "OUTPUT_DIR", str(tmp_path / "out"))
+    monkeypatch.setattr(main, "METRICS", RunMetrics())
+    monkeypatch.setattr(main, "ERROR_SAMPLE_SIZE", 2)
+
+    main.build_track(TRACK, 0, 1, [1, 2])
+
+    assert main.METRICS.counters["tools"]["errors"] == 4
+    report = (tmp_path / "out" / "tools.validation.txt").read_text(encoding="utf-8")
+    assert "# Empty or invalid cells: 4 (in 3 articles)\n" in report
+    assert "# By column\nIMU\t2\nEMG\t1\nArtNb\t1\n" in report
+    assert report.endswith(
+        "# Sample (first 2 cells)\nart1\tIMU\t<empty>\nart2\tEMG\t<empty>\n"
+    )
+    assert "tools.validation.txt" in main.METRICS.counters["tools"]["bytes"]
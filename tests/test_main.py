@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from circos_benchmark import bench_tracks
+from circos_golden import write_edge_workbook
+
+ROWS = [
+    {"ArtNb": 1, "ref": "Smith 2020", "GMFCS-I": 1, "EMG": 1},
+    {"ArtNb": 2, "ref": "Lee 2021", "GMFCS-II": 1, "IMU": 1},
+]
+
+
+@pytest.fixture
+def sheet(tmp_path):
+    path = tmp_path / "sheet.xlsx"
+    write_edge_workbook(path, ROWS, bench_tracks())
+    return path
+
+
+def test_render_paths_follow_the_output_dir_set_at_run_time(
+    tmp_path, sheet, monkeypatch
+):
+    out_dir = tmp_path / "run" / "out"
+    calls = {}
+
+    def fake_render_all(queue, command, max_workers, cache):
+        calls["queue"], calls["cache"] = queue, cache
+        return []
+
+    monkeypatch.setattr(main, "EXCEL_PATH", str(sheet))
+    monkeypatch.setattr(main, "OUTPUT_DIR", str(out_dir))
+    monkeypatch.setattr(main, "RUN_RENDER", True)
+    monkeypatch.setattr(main, "WRITE_PREVIEW", False)
+    monkeypatch.setattr(main, "render_all", fake_render_all)
+    main.run_pipeline(bench_tracks())
+
+    assert calls["queue"] == [str(out_dir)]
+    assert calls["cache"].cache_dir == out_dir.parent / ".circos_render_cache"
+    assert (out_dir / "circos.conf").is_file()
+
+
+@pytest.mark.parametrize(
+    "val, code",
+    [
+        (None, main.CELL_EMPTY),
+        (float("nan"), main.CELL_EMPTY),
+        (np.nan, main.CELL_EMPTY),
+        ("n/a", main.CELL_NA),
+        (" N/A ", main.CELL_NA),
+        ("-", main.CELL_NA),
+        ("?", main.CELL_NA),
+        ("", main.CELL_NA),
+        ("nan", main.CELL_NA),
+        ("???", main.CELL_UNSPECIFIED),
+        (" ??? ", main.CELL_UNSPECIFIED),
+        (0, main.CELL_ZERO),
+        (0.0, main.CELL_ZERO),
+        ("0", main.CELL_ZERO),
+        (" 0 ", main.CELL_ZERO),
+        ("0,0", main.CELL_ZERO),
+        ("0.00", main.CELL_ZERO),
+        ("0,5", main.CELL_PRESENT),
+        ("1,0", main.CELL_PRESENT),
+        (1, main.CELL_PRESENT),
+        (2.5, main.CELL_PRESENT),
+        ("1", main.CELL_PRESENT),
+        ("12.5", main.CELL_PRESENT),
+        ("x", main.CELL_PRESENT),
+    ],
+)
+def test_classify_cell(val, code):
+    assert main.classify_cell(val) == code
+
+
+def test_typed_sheet_codes_match_the_cell_rules():
+    values = [1, "0,0", "n/a", "???", None, "0,5", 0, "x"]
+    sheet = main.TypedSheet(pd.DataFrame({"ArtNb": range(8), "EMG": values}))
+
+    assert sheet.codes("EMG") == [main.classify_cell(v) for v in values]
+    assert sheet.codes("IMU") == [main.CELL_EMPTY] * 8  # Missing column
+
+
+def test_typed_sheet_codes_of_a_numeric_sheet():
+    df = pd.DataFrame({"ArtNb": [1, 2, 3], "EMG": [1.0, 0.0, np.nan]})
+    sheet = main.TypedSheet(df)
+
+    assert sheet.codes("EMG") == [main.CELL_PRESENT, main.CELL_ZERO, main.CELL_EMPTY]
+
+
+def test_load_sheet_is_cached_until_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "sheet.xlsx"
+    write_edge_workbook(path, ROWS, bench_tracks())
+    monkeypatch.setattr(main, "EXCEL_PATH", str(path))
+    monkeypatch.setattr(main, "_SHEET_CACHE", {})
+
+    first = main.load_sheet()
+    assert main.load_sheet() is first
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert main.load_sheet() is not first  # Same size, newer mtime
+
+    write_edge_workbook(path, ROWS[:1], bench_tracks())
+    second = main.load_sheet()
+
+    assert second is not first
+    assert second.n_rows == 1
+    assert len(main._SHEET_CACHE) == 1